@@ -9,10 +9,18 @@ from .config import config
 from .error_handlers import register_error_handlers
 from .shared.logging_config import setup_logging
 from .shared.error_tracking import init_sentry, add_request_id
+from .shared.background import register_job, start_workers
+from .shared.cache import init_response_cache
+from .shared.db_pool import init_db_pool
+from .shared.sql_profiler import init_sql_profiler
+from .shared.metrics import init_metrics
+from .shared.password_hashing import init_password_hasher
+from .shared.json_provider import FastJSONProvider
 
 def create_app(config_name=None):
     """Application factory with centralized configuration"""
     app = Flask(__name__, template_folder='../templates', static_folder='../static')
+    app.json = FastJSONProvider(app)
     
     # Load configuration
     config_name = config_name or os.getenv('FLASK_ENV', 'default')
@@ -24,6 +32,16 @@ def create_app(config_name=None):
     JWTManager(app)
     Migrate(app, db)
     
+    # Pool telemetry and per-transaction session settings
+    with app.app_context():
+        init_db_pool(app, db.engine)
+        init_sql_profiler(app, db.engine)
+        init_metrics(app, db.engine)
+    
+    # Soft-deleted projects and tasks stay hidden until purged
+    from .purge import init_soft_delete
+    init_soft_delete(app)
+    
     # Register blueprints
     from .auth import auth_bp
     from .projects import projects_bp
@@ -32,6 +50,11 @@ def create_app(config_name=None):
     from .notifications import notifications_bp
     from .dashboard import dashboard_bp
     from .client_errors import client_errors_bp
+    from .stream import stream_bp, init_stream_broker
+    from .export import export_bp
+    from .importer import imports_bp
+    from .search import search_bp
+    from .purge import purge_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(projects_bp)
@@ -40,21 +63,54 @@ def create_app(config_name=None):
     app.register_blueprint(notifications_bp)
     app.register_blueprint(dashboard_bp)
     app.register_blueprint(client_errors_bp)
+    app.register_blueprint(stream_bp)
+    app.register_blueprint(export_bp)
+    app.register_blueprint(imports_bp)
+    app.register_blueprint(search_bp)
+    app.register_blueprint(purge_bp)
+    
+    # Event broker for the message/notification stream
+    init_stream_broker(app)
+    
+    # Server-side response cache
+    init_response_cache(app)
+    
+    # Bounded bcrypt pool for register/login
+    init_password_hasher(app)
     
     # Register routes
     from . import routes
     routes.register_routes(app)
     
+    # Register CLI commands
+    from .commands import register_commands
+    register_commands(app)
+    
     # Setup structured logging
     setup_logging(app)
     
     # Initialize error tracking
     init_sentry(app)
     
+    # Background jobs (started lazily so CLI commands don't spawn workers).
+    # Without workers (serverless), the outbox drains inline after each write
+    # and GET /api/jobs/run, called by the Vercel cron, runs every job
+    from .notifications import dispatch_notification_outbox
+    register_job(app, 'notification_outbox', dispatch_notification_outbox, app.config.get('OUTBOX_DISPATCH_INTERVAL', 2),
+                 enabled=app.config.get('OUTBOX_DISPATCHER_ENABLED', True), inline=app.config.get('OUTBOX_INLINE_DRAIN', False))
+    from .user_stats import run_unread_reconciliation
+    register_job(app, 'unread_reconcile', run_unread_reconciliation, app.config.get('UNREAD_RECONCILE_INTERVAL', 300),
+                 enabled=app.config.get('UNREAD_RECONCILE_ENABLED', True))
+    from .purge import purge_next_batch
+    register_job(app, 'purge', purge_next_batch, app.config.get('PURGE_INTERVAL', 10),
+                 enabled=app.config.get('PURGE_WORKER_ENABLED', True))
+    
     # Add request ID middleware
     @app.before_request
     def before_request():
         add_request_id()
+        if 'background_workers' not in app.extensions:
+            start_workers(app)
     
     # Register error handlers
     register_error_handlers(app)
@@ -1,13 +1,32 @@
 from flask import Blueprint, request
-import bcrypt
-from flask_jwt_extended import create_access_token
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from .models import db, User
 from .validation import validate_json
 from .shared.db_operations import safe_db_operation
+from .shared.password_hashing import get_password_hasher, HashingOverloaded
 from .shared.response_helpers import success_response, error_response, validation_error_response
 
 auth_bp = Blueprint('auth', __name__)
 
+def _busy_response():
+    """503 telling clients to back off while the hashing queue is full"""
+    response, status = error_response('Server is busy, please try again shortly', 503, error_code='BUSY')
+    response.headers['Retry-After'] = '1'
+    return response, status
+
+def _auth_payload(user):
+    """Access and refresh tokens plus the public user fields"""
+    return {
+        'token': create_access_token(identity=user.id),
+        'refresh_token': create_refresh_token(identity=user.id),
+        'user': {
+            'id': user.id,
+            'name': user.name,
+            'email': user.email,
+            'role': user.role
+        }
+    }
+
 @auth_bp.route('/api/auth/register', methods=['POST'])
 @safe_db_operation("user registration")
 def register():
@@ -36,7 +55,10 @@ def register():
     if field_errors:
         return validation_error_response(field_errors)
     
-    password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    try:
+        password_hash = get_password_hasher().hash(password)
+    except HashingOverloaded:
+        return _busy_response()
     
     user = User(
         name=data['name'].strip(),
@@ -48,16 +70,7 @@ def register():
     db.session.add(user)
     db.session.commit()
     
-    token = create_access_token(identity=user.id)
-    return success_response({
-        'token': token, 
-        'user': {
-            'id': user.id, 
-            'name': user.name, 
-            'email': user.email,
-            'role': user.role
-        }
-    })
+    return success_response(_auth_payload(user))
 
 @auth_bp.route('/api/auth/login', methods=['POST'])
 @safe_db_operation("user login")
@@ -81,17 +94,28 @@ def login():
         return validation_error_response(field_errors)
     
     user = User.query.filter_by(email=email.lower()).first()
-    
-    if not user or not bcrypt.checkpw(password.encode('utf-8'), user.password_hash.encode('utf-8')):
-        return error_response('Invalid email or password', 401, error_code='INVALID_CREDENTIALS')
-    
-    token = create_access_token(identity=user.id)
-    return success_response({
-        'token': token, 
-        'user': {
-            'id': user.id, 
-            'name': user.name, 
-            'email': user.email,
-            'role': user.role
-        }
-    })
\ No newline at end of file
+    hasher = get_password_hasher()
+    
+    try:
+        if not user or not hasher.verify(password, user.password_hash):
+            return error_response('Invalid email or password', 401, error_code='INVALID_CREDENTIALS')
+        
+        # Upgrade hashes made with an old work factor while the password is at hand
+        if hasher.needs_rehash(user.password_hash):
+            user.password_hash = hasher.hash(password)
+            db.session.commit()
+    except HashingOverloaded:
+        return _busy_response()
+    
+    return success_response(_auth_payload(user))
+
+@auth_bp.route('/api/auth/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+@safe_db_operation("token refresh")
+def refresh():
+    """Issue a new access token from a refresh token without a password check"""
+    user = User.query.get(get_jwt_identity())
+    if not user:
+        return error_response('User no longer exists', 401, error_code='INVALID_TOKEN')
+    
+    return success_response({'token': create_access_token(identity=user.id)})
\ No newline at end of file
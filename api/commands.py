@@ -0,0 +1,154 @@
+import os
+import click
+from flask.cli import AppGroup
+
+summaries_cli = AppGroup('summaries', help='Maintain denormalized project summaries.')
+
+@summaries_cli.command('rebuild')
+@click.option('--verify-only', is_flag=True, help='Report drift without repairing it.')
+@click.option('--project-id', type=int, multiple=True, help='Limit to specific projects.')
+def rebuild_summaries(verify_only, project_id):
+    """Recompute project summary counters and repair drift"""
+    from .project_summary import rebuild_project_summaries
+
+    drifted = rebuild_project_summaries(list(project_id) or None, repair=not verify_only)
+
+    if not drifted:
+        click.echo('✅ All project summaries are consistent')
+    elif verify_only:
+        click.echo(f"❌ {len(drifted)} project summaries drifted: {', '.join(map(str, drifted))}")
+        raise SystemExit(1)
+    else:
+        click.echo(f"✅ Repaired {len(drifted)} project summaries: {', '.join(map(str, drifted))}")
+
+notifications_cli = AppGroup('notifications', help='Notification maintenance.')
+
+@notifications_cli.command('drain-outbox')
+@click.option('--batch-size', type=int, default=None, help='Intents per batch.')
+def drain_outbox(batch_size):
+    """Dispatch every pending notification intent"""
+    from .notifications import dispatch_notification_outbox
+
+    total = 0
+    while True:
+        processed = dispatch_notification_outbox(batch_size)
+        if not processed:
+            break
+        total += processed
+    click.echo(f'✅ Dispatched {total} notification intents')
+
+@notifications_cli.command('reconcile-unread')
+@click.option('--batch-size', type=int, default=500, help='Users per batch.')
+def reconcile_unread(batch_size):
+    """Repair every drifted unread notification counter"""
+    from .user_stats import reconcile_unread_counters
+
+    checked = repaired = 0
+    last_user_id = 0
+    while last_user_id is not None:
+        batch_checked, batch_repaired, last_user_id = reconcile_unread_counters(last_user_id, batch_size)
+        checked += batch_checked
+        repaired += batch_repaired
+    click.echo(f'✅ Checked {checked} users, repaired {repaired} unread counters')
+
+import_cli = AppGroup('import', help='Bulk import tasks and messages.')
+
+def _echo_import_job(job):
+    icon = '✅' if job.status == 'completed' else '❌'
+    click.echo(f"{icon} Import job {job.id} {job.status}: {job.rows_imported} imported, "
+               f"{job.rows_rejected} rejected of {job.rows_processed} rows")
+
+def _run_import_job(job, source, chunk_size):
+    from .importer import run_import, ImportRejected
+
+    try:
+        job = run_import(job, source, chunk_size)
+    except ImportRejected as e:
+        click.echo(f"❌ Import job {job.id} failed: {e} (resume with `flask import resume {job.id}`)")
+        raise SystemExit(1)
+    _echo_import_job(job)
+
+@import_cli.command('run')
+@click.argument('source', type=click.File('rb'))
+@click.option('--project-id', type=int, required=True, help='Project to import into.')
+@click.option('--kind', type=click.Choice(['tasks', 'messages']), required=True)
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default=None,
+              help='Defaults to the file extension.')
+@click.option('--chunk-size', type=int, default=None, help='Rows per transaction.')
+def run_import_command(source, project_id, kind, fmt, chunk_size):
+    """Import a CSV or NDJSON file of tasks or messages"""
+    from .models import db, Project
+    from .importer import create_import_job, infer_format
+
+    project = db.session.get(Project, project_id)
+    if not project:
+        raise click.BadParameter(f'Project {project_id} not found', param_hint='--project-id')
+    fmt = fmt or infer_format(source.name)
+    if not fmt:
+        raise click.BadParameter('Cannot infer the format from the file name', param_hint='--format')
+
+    job = create_import_job(project_id, project.owner_id, kind, fmt, os.path.basename(source.name))
+    click.echo(f'Started import job {job.id}')
+    _run_import_job(job, source, chunk_size)
+
+@import_cli.command('resume')
+@click.argument('job_id', type=int)
+@click.argument('source', type=click.File('rb'))
+@click.option('--chunk-size', type=int, default=None, help='Rows per transaction.')
+def resume_import_command(job_id, source, chunk_size):
+    """Continue an interrupted import from its checkpoint"""
+    from .models import db, ImportJob
+
+    job = db.session.get(ImportJob, job_id)
+    if not job:
+        raise click.BadParameter(f'Import job {job_id} not found', param_hint='JOB_ID')
+    if job.status == 'completed':
+        _echo_import_job(job)
+        return
+    click.echo(f'Resuming import job {job.id} after row {job.rows_processed}')
+    _run_import_job(job, source, chunk_size)
+
+search_cli = AppGroup('search', help='Maintain the full-text search index.')
+
+@search_cli.command('rebuild')
+def rebuild_search():
+    """Create missing search indexes and rebuild them from tasks and messages"""
+    from .search import rebuild_search_index
+
+    rebuild_search_index()
+    click.echo('✅ Search index rebuilt')
+
+activity_cli = AppGroup('activity', help='Maintain daily project activity rollups.')
+
+@activity_cli.command('backfill')
+@click.option('--days', type=int, default=365, help='Days back from today to rebuild.')
+@click.option('--project-id', type=int, multiple=True, help='Limit to specific projects.')
+def backfill_activity(days, project_id):
+    """Rebuild daily activity rollups from tasks and messages"""
+    from .project_activity import backfill_daily_activity
+
+    written = backfill_daily_activity(list(project_id) or None, days)
+    click.echo(f'✅ Wrote {written} daily activity rows')
+
+purge_cli = AppGroup('purge', help='Remove soft-deleted projects and tasks.')
+
+@purge_cli.command('run')
+@click.option('--batch-size', type=int, default=None, help='Rows per transaction.')
+def run_purge(batch_size):
+    """Finish every pending purge job"""
+    from .models import PurgeJob
+    from .purge import purge_next_batch
+
+    pending = PurgeJob.query.filter(PurgeJob.status != 'completed').count()
+    while purge_next_batch(batch_size):
+        pass
+    click.echo(f'✅ Finished {pending} purge jobs')
+
+def register_commands(app):
+    """Register Flask CLI commands"""
+    app.cli.add_command(summaries_cli)
+    app.cli.add_command(notifications_cli)
+    app.cli.add_command(import_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(activity_cli)
+    app.cli.add_command(purge_cli)
@@ -1,4 +1,11 @@
 import os
+from datetime import timedelta
+from .shared.db_pool import InstrumentedQueuePool, InstrumentedNullPool
+
+# Vercel freezes functions between invocations: background threads (workers,
+# the async log listener) would stall there, so they default to off
+SERVERLESS = bool(os.getenv('VERCEL'))
+WORKERS_DEFAULT = 'false' if SERVERLESS else 'true'
 
 class Config:
     """Base configuration"""
@@ -6,6 +13,170 @@ class Config:
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Short-lived access tokens renewed through /api/auth/refresh
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.getenv('JWT_ACCESS_TOKEN_MINUTES', '15')))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.getenv('JWT_REFRESH_TOKEN_DAYS', '30')))
+    
+    # Password hashing: bcrypt work factor and the bounded hashing pool;
+    # stored hashes with another work factor are upgraded on login
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', '12'))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '4'))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', '32'))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', '10'))
+    
+    # Per-process membership index behind project access checks
+    MEMBERSHIP_CACHE_SIZE = int(os.getenv('MEMBERSHIP_CACHE_SIZE', '10000'))
+    MEMBERSHIP_CACHE_TTL = int(os.getenv('MEMBERSHIP_CACHE_TTL', '60'))
+    
+    # Cached counts backing ?count=estimate where planner statistics are unavailable
+    PAGINATION_COUNT_CACHE_TTL = int(os.getenv('PAGINATION_COUNT_CACHE_TTL', '30'))
+    
+    # Server-side response cache: 'memory' (per process), 'redis' (shared) or 'none'
+    RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_REDIS_URL = os.getenv('RESPONSE_CACHE_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '2048'))
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '30'))
+    RESPONSE_CACHE_LOCK_TIMEOUT = float(os.getenv('RESPONSE_CACHE_LOCK_TIMEOUT', '5'))
+    
+    # Bulk task endpoints: items accepted per request
+    BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', '500'))
+    
+    # Project export: rows per server-side cursor fetch, bytes per streamed chunk,
+    # and how long (ms) the export transaction may idle behind a slow client
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+    EXPORT_CHUNK_BYTES = int(os.getenv('EXPORT_CHUNK_BYTES', '65536'))
+    EXPORT_IDLE_TIMEOUT_MS = int(os.getenv('EXPORT_IDLE_TIMEOUT_MS', '600000'))
+    
+    # Message threads: reply levels walked (and at most returned) and messages returned
+    THREAD_MAX_DEPTH = int(os.getenv('THREAD_MAX_DEPTH', '100'))
+    THREAD_MAX_MESSAGES = int(os.getenv('THREAD_MAX_MESSAGES', '1000'))
+    
+    # Bulk import: source rows validated, written and checkpointed per transaction
+    IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', '2000'))
+    
+    # Server-push stream: 'memory' (single process) or 'redis' (cross-process)
+    STREAM_BACKEND = os.getenv('STREAM_BACKEND', 'memory')
+    STREAM_REDIS_URL = os.getenv('STREAM_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    STREAM_QUEUE_SIZE = int(os.getenv('STREAM_QUEUE_SIZE', '100'))
+    STREAM_HISTORY_SIZE = int(os.getenv('STREAM_HISTORY_SIZE', '1000'))
+    STREAM_HEARTBEAT_SECONDS = int(os.getenv('STREAM_HEARTBEAT_SECONDS', '15'))
+    STREAM_MAX_DURATION = int(os.getenv('STREAM_MAX_DURATION', '300'))
+    STREAM_POLL_TIMEOUT = int(os.getenv('STREAM_POLL_TIMEOUT', '25'))
+    
+    # Notification outbox dispatcher; without it, each write drains one batch
+    # inline (OUTBOX_INLINE_DRAIN, on by default on Vercel), or run
+    # `flask notifications drain-outbox` / GET /api/jobs/run
+    OUTBOX_DISPATCHER_ENABLED = os.getenv('OUTBOX_DISPATCHER_ENABLED', WORKERS_DEFAULT).lower() == 'true'
+    OUTBOX_INLINE_DRAIN = os.getenv('OUTBOX_INLINE_DRAIN', str(SERVERLESS)).lower() == 'true'
+    OUTBOX_DISPATCH_INTERVAL = float(os.getenv('OUTBOX_DISPATCH_INTERVAL', '2'))
+    OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '500'))
+    
+    # Unread counter reconciliation: users checked per pass and seconds between passes
+    UNREAD_RECONCILE_ENABLED = os.getenv('UNREAD_RECONCILE_ENABLED', WORKERS_DEFAULT).lower() == 'true'
+    UNREAD_RECONCILE_INTERVAL = float(os.getenv('UNREAD_RECONCILE_INTERVAL', '300'))
+    UNREAD_RECONCILE_BATCH_SIZE = int(os.getenv('UNREAD_RECONCILE_BATCH_SIZE', '500'))
+    
+    # Background purge of deleted projects and tasks: rows removed per transaction;
+    # without the worker, run `flask purge run` or GET /api/jobs/run instead
+    PURGE_WORKER_ENABLED = os.getenv('PURGE_WORKER_ENABLED', WORKERS_DEFAULT).lower() == 'true'
+    PURGE_INTERVAL = float(os.getenv('PURGE_INTERVAL', '10'))
+    PURGE_BATCH_SIZE = int(os.getenv('PURGE_BATCH_SIZE', '1000'))
+    
+    # GET /api/jobs/run drains every background job within a time budget (seconds);
+    # it needs CRON_SECRET as a bearer token, which Vercel cron sends
+    CRON_SECRET = os.getenv('CRON_SECRET')
+    JOBS_TIME_BUDGET = float(os.getenv('JOBS_TIME_BUDGET', '20'))
+    
+    # Logging: 'async' formats and writes on a background thread ('sync' inline,
+    # the default on Vercel, where queued records could be lost when it freezes);
+    # INFO operation logs are sampled (LOG_SAMPLE_RATES as "operation=rate,...")
+    # and errors logged from one call site are capped per window (seconds)
+    LOG_MODE = os.getenv('LOG_MODE', 'sync' if SERVERLESS else 'async')
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '1.0'))
+    LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')
+    LOG_ERROR_BURST = int(os.getenv('LOG_ERROR_BURST', '10'))
+    LOG_ERROR_WINDOW = float(os.getenv('LOG_ERROR_WINDOW', '60'))
+    
+    # /api/metrics: off by default, and served only with METRICS_TOKEN as a bearer
+    # token (which also guards /api/stream/stats); with a shared directory, every
+    # worker process publishes a snapshot there (every interval seconds) and
+    # scrapes sum them
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR')
+    METRICS_SNAPSHOT_INTERVAL = float(os.getenv('METRICS_SNAPSHOT_INTERVAL', '5'))
+    
+    # Per-request SQL profiling: Server-Timing headers, N+1 warnings for statements
+    # repeated this often in one request, and /api/debug/sql-profile; off by default.
+    # The debug endpoint needs SQL_PROFILER_TOKEN as a bearer token and is hidden without it
+    SQL_PROFILER_ENABLED = os.getenv('SQL_PROFILER_ENABLED', 'false').lower() == 'true'
+    SQL_PROFILER_TOKEN = os.getenv('SQL_PROFILER_TOKEN')
+    SQL_PROFILER_REPEAT_THRESHOLD = int(os.getenv('SQL_PROFILER_REPEAT_THRESHOLD', '5'))
+    
+    # Connection pooling profile: 'worker' (QueuePool for long-lived processes),
+    # 'external' (NullPool behind pgbouncer/serverless) or 'auto' (external on Vercel)
+    DB_POOL_PROFILE = os.getenv('DB_POOL_PROFILE', 'auto')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', '10'))
+    
+    # Postgres session settings in milliseconds; 0 disables
+    DB_SESSION_SETTINGS = {
+        'statement_timeout': int(os.getenv('DB_STATEMENT_TIMEOUT', '30000')),
+        'lock_timeout': int(os.getenv('DB_LOCK_TIMEOUT', '10000')),
+        'idle_in_transaction_session_timeout': int(os.getenv('DB_IDLE_IN_TRANSACTION_TIMEOUT', '60000'))
+    }
+    
+    @classmethod
+    def get_pool_profile(cls):
+        if cls.DB_POOL_PROFILE == 'auto':
+            return 'external' if SERVERLESS else 'worker'
+        return cls.DB_POOL_PROFILE
+    
+    @classmethod
+    def get_engine_options(cls, database_uri):
+        """SQLAlchemy engine options for the selected pooling profile"""
+        if not database_uri.startswith('postgresql'):
+            # SQLite keeps SQLAlchemy's defaults
+            return {}
+        
+        connect_args = {
+            'connect_timeout': cls.DB_CONNECT_TIMEOUT,
+            'application_name': os.getenv('DB_APPLICATION_NAME', 'synergysphere')
+        }
+        
+        if cls.get_pool_profile() == 'external':
+            # One connection per checkout; the external pooler owns reuse.
+            # Settings are applied per transaction (see DB_TRANSACTION_SETTINGS)
+            # since poolers reject or leak startup options.
+            return {
+                'poolclass': InstrumentedNullPool,
+                'connect_args': connect_args
+            }
+        
+        options = ' '.join(f'-c {name}={value}' for name, value in cls.DB_SESSION_SETTINGS.items() if value)
+        if options:
+            connect_args['options'] = options
+        return {
+            'poolclass': InstrumentedQueuePool,
+            'pool_size': cls.DB_POOL_SIZE,
+            'max_overflow': cls.DB_MAX_OVERFLOW,
+            'pool_timeout': cls.DB_POOL_TIMEOUT,
+            'pool_recycle': cls.DB_POOL_RECYCLE,
+            'pool_pre_ping': True,
+            # LIFO lets idle connections past pool_size age out under light load
+            'pool_use_lifo': True,
+            'connect_args': connect_args
+        }
+    
+    @classmethod
+    def get_transaction_settings(cls):
+        """Settings applied with SET LOCAL per transaction under the external profile"""
+        return cls.DB_SESSION_SETTINGS if cls.get_pool_profile() == 'external' else None
+    
     @staticmethod
     def get_database_uri():
         # Check for Vercel PostgreSQL URL first
@@ -29,10 +200,14 @@ class Config:
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = Config.get_database_uri()
+    SQLALCHEMY_ENGINE_OPTIONS = Config.get_engine_options(SQLALCHEMY_DATABASE_URI)
+    DB_TRANSACTION_SETTINGS = Config.get_transaction_settings()
 
 class ProductionConfig(Config):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = Config.get_database_uri()
+    SQLALCHEMY_ENGINE_OPTIONS = Config.get_engine_options(SQLALCHEMY_DATABASE_URI)
+    DB_TRANSACTION_SETTINGS = Config.get_transaction_settings()
 
 config = {
     'development': DevelopmentConfig,
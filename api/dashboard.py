@@ -2,102 +2,44 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy import func, and_
 from datetime import datetime, timedelta
-from .models import db, Project, Task, ProjectMember, User, Message, Notification
+from .models import db, Project, Task, ProjectMember, ProjectSummary, User, Message, Notification
 from .utils import utc_now
+from .dashboard_stats import compute_dashboard_stats, get_upcoming_deadlines, dashboard_version
+from .membership import get_accessible_project_ids, has_project_access, user_cache_namespaces
+from .permissions import require_project_access
+from .project_summary import summary_payload
+from .project_activity import activity_window, read_daily_activity
+from .shared.cache import cached_view, project_namespace
 from .shared.db_operations import safe_db_operation
-from .shared.response_helpers import success_response
+from .shared.response_helpers import success_response, make_etag, etag_matches, not_modified_response
 import logging
 
 logger = logging.getLogger(__name__)
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
+def _dashboard_namespaces():
+    """Dashboards read the user's notifications and every accessible project"""
+    return user_cache_namespaces(get_jwt_identity())
+
 @dashboard_bp.route('/api/dashboard/stats', methods=['GET'])
 @jwt_required()
+@cached_view(_dashboard_namespaces)
 @safe_db_operation("fetch dashboard statistics")
 def get_dashboard_stats():
     user_id = get_jwt_identity()
+    project_ids = get_accessible_project_ids(user_id)
     
-    # Get projects where user is owner or member
-    owned_projects = Project.query.filter_by(owner_id=user_id).all()
-    member_projects = db.session.query(Project).join(ProjectMember).filter(
-        ProjectMember.user_id == user_id
-    ).all()
-    
-    all_project_ids = [p.id for p in owned_projects] + [p.id for p in member_projects]
-    unique_project_ids = list(set(all_project_ids))
-    
-    # Calculate statistics
-    total_projects = len(unique_project_ids)
-    
-    # Task statistics
-    total_tasks = Task.query.filter(Task.project_id.in_(unique_project_ids)).count() if unique_project_ids else 0
-    
-    my_tasks = Task.query.filter_by(assignee_id=user_id).all()
-    my_total_tasks = len(my_tasks)
-    my_pending_tasks = len([t for t in my_tasks if t.status != 'done'])
-    my_completed_tasks = len([t for t in my_tasks if t.status == 'done'])
-    
-    # Tasks by status
-    tasks_by_status = db.session.query(
-        Task.status, func.count(Task.id)
-    ).filter(
-        Task.project_id.in_(unique_project_ids) if unique_project_ids else False
-    ).group_by(Task.status).all()
-    
-    status_dict = {'todo': 0, 'in_progress': 0, 'done': 0}
-    for status, count in tasks_by_status:
-        status_dict[status] = count
-    
-    # Recent activity (last 7 days)
-    week_ago = utc_now() - timedelta(days=7)
-    recent_tasks = Task.query.filter(
-        and_(
-            Task.project_id.in_(unique_project_ids) if unique_project_ids else False,
-            Task.created_at >= week_ago
-        )
-    ).count()
-    
-    recent_messages = Message.query.filter(
-        and_(
-            Message.project_id.in_(unique_project_ids) if unique_project_ids else False,
-            Message.created_at >= week_ago
-        )
-    ).count()
-    
-    # Upcoming deadlines
-    upcoming_deadlines = Task.query.filter(
-        and_(
-            Task.assignee_id == user_id,
-            Task.due_date != None,
-            Task.due_date >= utc_now(),
-            Task.due_date <= utc_now() + timedelta(days=7),
-            Task.status != 'done'
-        )
-    ).order_by(Task.due_date).limit(5).all()
+    etag = make_etag(user_id, *dashboard_version(user_id, project_ids))
+    if etag_matches(etag):
+        return not_modified_response(etag)
     
-    # Unread notifications
-    unread_notifications = Notification.query.filter_by(
-        user_id=user_id, 
-        is_read=False
-    ).count()
+    # Aggregate counters come from conditional-aggregate SQL, not loaded rows
+    statistics = compute_dashboard_stats(user_id, project_ids)
+    upcoming_deadlines = get_upcoming_deadlines(user_id)
     
     return success_response({
-        'statistics': {
-            'total_projects': total_projects,
-            'total_tasks': total_tasks,
-            'my_tasks': {
-                'total': my_total_tasks,
-                'pending': my_pending_tasks,
-                'completed': my_completed_tasks
-            },
-            'tasks_by_status': status_dict,
-            'recent_activity': {
-                'tasks_created': recent_tasks,
-                'messages_sent': recent_messages
-            },
-            'unread_notifications': unread_notifications
-        },
+        'statistics': statistics,
         'upcoming_deadlines': [{
             'id': task.id,
             'title': task.title,
@@ -105,98 +47,97 @@ def get_dashboard_stats():
             'due_date': task.due_date.isoformat(),
             'priority': task.priority
         } for task in upcoming_deadlines]
-    })
+    }, etag=etag)
 
 @dashboard_bp.route('/api/dashboard/recent-projects', methods=['GET'])
 @jwt_required()
+@cached_view(_dashboard_namespaces)
 @safe_db_operation("fetch recent projects")
 def get_recent_projects():
     user_id = get_jwt_identity()
+    project_ids = get_accessible_project_ids(user_id)
     
-    # Get projects with recent activity
-    owned_projects = db.session.query(Project).filter_by(owner_id=user_id).all()
-    member_projects = db.session.query(Project).join(ProjectMember).filter(
-        ProjectMember.user_id == user_id
-    ).all()
+    etag = make_etag(user_id, *dashboard_version(user_id, project_ids))
+    if etag_matches(etag):
+        return not_modified_response(etag)
     
-    all_projects = owned_projects + member_projects
-    unique_projects = {p.id: p for p in all_projects}.values()
-    
-    # Sort by creation date and get top 6
-    recent_projects = sorted(unique_projects, key=lambda x: x.created_at, reverse=True)[:6]
+    # Newest six accessible projects with their maintained counters
+    recent_projects = db.session.query(Project, ProjectSummary).outerjoin(
+        ProjectSummary, ProjectSummary.project_id == Project.id
+    ).filter(
+        Project.id.in_(project_ids)
+    ).order_by(Project.created_at.desc()).limit(6).all()
     
     project_data = []
-    for project in recent_projects:
-        task_counts = db.session.query(
-            Task.status, func.count(Task.id)
-        ).filter_by(project_id=project.id).group_by(Task.status).all()
-        
-        task_stats = {'todo': 0, 'in_progress': 0, 'done': 0}
-        for status, count in task_counts:
-            task_stats[status] = count
-        
-        member_count = ProjectMember.query.filter_by(project_id=project.id).count()
-        
+    for project, summary in recent_projects:
         project_data.append({
             'id': project.id,
             'name': project.name,
             'description': project.description,
             'created_at': project.created_at.isoformat(),
-            'task_stats': task_stats,
-            'member_count': member_count + 1,  # +1 for owner
+            **summary_payload(summary),
             'is_owner': project.owner_id == user_id
         })
     
-    return success_response({'projects': project_data})
+    return success_response({'projects': project_data}, etag=etag)
 
 @dashboard_bp.route('/api/dashboard/activity-timeline', methods=['GET'])
 @jwt_required()
+@cached_view(_dashboard_namespaces)
 @safe_db_operation("fetch activity timeline")
 def get_activity_timeline():
     user_id = get_jwt_identity()
-    days = int(request.args.get('days', 7))
-    
-    # Get date range
-    end_date = utc_now()
-    start_date = end_date - timedelta(days=days)
+    days = request.args.get('days', 7, type=int)
     
     # Get user's project IDs
-    owned_projects = Project.query.filter_by(owner_id=user_id).all()
-    member_projects = db.session.query(Project).join(ProjectMember).filter(
-        ProjectMember.user_id == user_id
-    ).all()
+    unique_project_ids = get_accessible_project_ids(user_id)
     
-    all_project_ids = [p.id for p in owned_projects] + [p.id for p in member_projects]
-    unique_project_ids = list(set(all_project_ids))
+    etag = make_etag(user_id, *dashboard_version(user_id, unique_project_ids))
+    if etag_matches(etag):
+        return not_modified_response(etag)
     
     if not unique_project_ids:
-        return success_response({'timeline': []})
-    
-    # Get tasks created per day
-    tasks_timeline = db.session.query(
-        func.date(Task.created_at).label('date'),
-        func.count(Task.id).label('count')
-    ).filter(
-        and_(
-            Task.project_id.in_(unique_project_ids),
-            Task.created_at >= start_date,
-            Task.created_at <= end_date
-        )
-    ).group_by(func.date(Task.created_at)).all()
-    
-    # Convert to dictionary
-    timeline_dict = {}
-    for date, count in tasks_timeline:
-        timeline_dict[str(date)] = count
-    
-    # Fill in missing dates with 0
-    timeline = []
-    current_date = start_date.date()
-    while current_date <= end_date.date():
-        timeline.append({
-            'date': str(current_date),
-            'tasks_created': timeline_dict.get(str(current_date), 0)
+        return success_response({'timeline': []}, etag=etag)
+    
+    # Daily rollups: at most days x projects small rows, capped at MAX_DAYS
+    start_date, end_date = activity_window(days)
+    timeline = [{
+        'date': str(entry['date']),
+        'tasks_created': entry['tasks_created'],
+        'tasks_completed': entry['tasks_completed'],
+        'messages_posted': entry['messages_posted']
+    } for entry in read_daily_activity(unique_project_ids, start_date, end_date)]
+    
+    return success_response({'timeline': timeline}, etag=etag)
+
+def _project_flow_namespaces(project_id):
+    """Flow charts are shared by every member; non-members bypass the cache"""
+    if not has_project_access(project_id, get_jwt_identity()):
+        return None
+    return [project_namespace(project_id)]
+
+@dashboard_bp.route('/api/projects/<int:project_id>/flow', methods=['GET'])
+@jwt_required()
+@cached_view(_project_flow_namespaces, vary_on_user=False)
+@safe_db_operation("fetch project flow")
+def get_project_flow(project_id):
+    """Daily status snapshots and activity for burndown and cumulative-flow charts"""
+    access_error = require_project_access(project_id, get_jwt_identity())
+    if access_error:
+        return access_error
+    
+    start_date, end_date = activity_window(request.args.get('days', 30, type=int))
+    flow = []
+    for entry in read_daily_activity([project_id], start_date, end_date):
+        flow.append({
+            'date': str(entry['date']),
+            'todo': entry['todo_count'],
+            'in_progress': entry['in_progress_count'],
+            'done': entry['done_count'],
+            # Remaining work for burndown
+            'open': entry['todo_count'] + entry['in_progress_count'],
+            'tasks_created': entry['tasks_created'],
+            'tasks_completed': entry['tasks_completed']
         })
-        current_date += timedelta(days=1)
     
-    return success_response({'timeline': timeline})
+    return success_response({'flow': flow})
@@ -0,0 +1,99 @@
+from datetime import timedelta
+from sqlalchemy import select, func, case, and_, or_
+from .models import db, Task, Message, ProjectSummary, UserStats
+from .utils import utc_now
+from .user_stats import assigned_tasks_changed_at
+
+TASK_STATUSES = ('todo', 'in_progress', 'done')
+
+def _count_if(condition):
+    """Conditional aggregate that counts rows matching condition"""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+def compute_dashboard_stats(user_id, project_ids):
+    """Compute dashboard statistics with two aggregate statements and no ORM objects"""
+    week_ago = utc_now() - timedelta(days=7)
+    in_projects = Task.project_id.in_(project_ids)
+    is_mine = Task.assignee_id == user_id
+
+    # Statement 1: every task counter in a single pass over task
+    task_columns = [
+        _count_if(in_projects).label('total'),
+        _count_if(and_(in_projects, Task.created_at >= week_ago)).label('recent'),
+        _count_if(is_mine).label('my_total'),
+        _count_if(and_(is_mine, Task.status == 'done')).label('my_completed'),
+    ]
+    task_columns += [
+        _count_if(and_(in_projects, Task.status == status)).label(status)
+        for status in TASK_STATUSES
+    ]
+    tasks = db.session.execute(
+        select(*task_columns).where(or_(in_projects, is_mine))
+    ).one()
+
+    # Statement 2: remaining counters as scalar subqueries
+    recent_messages = select(func.count(Message.id)).where(
+        Message.project_id.in_(project_ids),
+        Message.created_at >= week_ago
+    ).scalar_subquery()
+    unread_notifications = func.coalesce(
+        select(UserStats.unread_notifications).where(UserStats.user_id == user_id).scalar_subquery(), 0
+    )
+    counts = db.session.execute(
+        select(recent_messages, unread_notifications)
+    ).one()
+
+    return {
+        'total_projects': len(project_ids),
+        'total_tasks': tasks.total,
+        'my_tasks': {
+            'total': tasks.my_total,
+            'pending': tasks.my_total - tasks.my_completed,
+            'completed': tasks.my_completed
+        },
+        'tasks_by_status': {status: getattr(tasks, status) for status in TASK_STATUSES},
+        'recent_activity': {
+            'tasks_created': tasks.recent,
+            'messages_sent': counts[0]
+        },
+        'unread_notifications': counts[1]
+    }
+
+def dashboard_version(user_id, project_ids):
+    """Version token for dashboard views from maintained summaries in one statement
+
+    Every task, message, member and project write touches its summary row, so
+    the newest activity plus the counter totals change whenever a dashboard
+    figure can. The hour bucket rolls the relative date windows forward.
+    """
+    in_projects = ProjectSummary.project_id.in_(project_ids)
+    activity = select(
+        func.max(ProjectSummary.last_activity_at),
+        func.coalesce(func.sum(
+            ProjectSummary.todo_count + ProjectSummary.in_progress_count
+            + ProjectSummary.done_count + ProjectSummary.member_count
+        ), 0)
+    ).where(in_projects).subquery()
+    notifications = [
+        select(column).where(UserStats.user_id == user_id).scalar_subquery()
+        for column in (UserStats.unread_notifications, UserStats.notifications_version)
+    ]
+
+    # Soft-deleted tasks count: a delete bumps updated_at and must change the version
+    row = db.session.execute(
+        select(activity, assigned_tasks_changed_at(user_id), *notifications).execution_options(include_deleted=True)
+    ).one()
+    return (tuple(sorted(project_ids)), utc_now().strftime('%Y%m%d%H')) + tuple(row)
+
+def get_upcoming_deadlines(user_id, days=7, limit=5):
+    """Fetch upcoming deadline rows for the user's open tasks"""
+    now = utc_now()
+    return db.session.execute(
+        select(Task.id, Task.title, Task.project_id, Task.due_date, Task.priority).where(
+            Task.assignee_id == user_id,
+            Task.due_date != None,
+            Task.due_date >= now,
+            Task.due_date <= now + timedelta(days=days),
+            Task.status != 'done'
+        ).order_by(Task.due_date).limit(limit)
+    ).all()
@@ -0,0 +1,132 @@
+import logging
+import zlib
+from functools import partial
+from flask import Blueprint, Response, current_app, request, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select
+from .models import db, Project, ProjectMember, User, Task, Message, Notification
+from .permissions import check_project_ownership
+from .utils import utc_now
+from .shared.response_helpers import not_found_response, access_denied_response, error_response
+
+logger = logging.getLogger(__name__)
+
+export_bp = Blueprint('export', __name__)
+
+EXPORT_FORMAT_VERSION = 1
+
+def _export_statements(project_id):
+    """(record type, Core select) pairs in export order"""
+    return [
+        ('member', select(
+            ProjectMember.user_id, ProjectMember.role, ProjectMember.created_at, User.name, User.email
+        ).join(User, User.id == ProjectMember.user_id).where(
+            ProjectMember.project_id == project_id
+        ).order_by(ProjectMember.id)),
+        # Connection-level reads bypass the session's soft-delete criteria
+        ('task', select(*Task.__table__.columns).where(
+            Task.project_id == project_id, Task.deleted_at.is_(None)
+        ).order_by(Task.id)),
+        ('message', select(*Message.__table__.columns).where(Message.project_id == project_id).order_by(Message.id)),
+        ('notification', select(*Notification.__table__.columns).where(
+            Notification.related_project_id == project_id
+        ).order_by(Notification.id)),
+    ]
+
+def _begin_snapshot(connection):
+    """Open a read-only transaction that sees one consistent snapshot"""
+    if connection.dialect.name == 'postgresql':
+        connection = connection.execution_options(isolation_level='REPEATABLE READ', postgresql_readonly=True)
+        transaction = connection.begin()
+        # The transaction stays open while the client downloads
+        idle_timeout = current_app.config.get('EXPORT_IDLE_TIMEOUT_MS', 600000)
+        connection.exec_driver_sql(f'SET LOCAL idle_in_transaction_session_timeout = {int(idle_timeout)}')
+        return connection, transaction
+    return connection, connection.begin()
+
+def _ndjson_records(project_id, header):
+    """Yield encoded NDJSON lines from server-side cursors, batch by batch"""
+    # One record per line, so never indented even in debug
+    dumps = partial(current_app.json.dumps_bytes, indent=False)
+    batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+
+    with db.engine.connect() as connection:
+        connection, transaction = _begin_snapshot(connection)
+        with transaction:
+            yield dumps({'type': 'project', 'data': header}) + b'\n'
+            counts = {}
+            for record_type, statement in _export_statements(project_id):
+                # yield_per streams rows through a server-side cursor in fixed-size partitions
+                result = connection.execution_options(yield_per=batch_size).execute(statement)
+                count = 0
+                for partition in result.partitions():
+                    yield b''.join(dumps({'type': record_type, 'data': dict(row._mapping)}) + b'\n' for row in partition)
+                    count += len(partition)
+                counts[record_type] = count
+            yield dumps({'type': 'end', 'data': {'counts': counts}}) + b'\n'
+
+def _chunked(lines, chunk_size):
+    """Coalesce small writes into chunks of roughly chunk_size bytes"""
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+def _gzipped(chunks):
+    """Incrementally gzip a byte stream"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+@export_bp.route('/api/projects/<int:project_id>/export', methods=['GET'])
+@jwt_required()
+def export_project(project_id):
+    """Stream a project's members, tasks, messages and notifications as NDJSON"""
+    user_id = get_jwt_identity()
+    project = db.session.get(Project, project_id)
+    if not project:
+        return not_found_response("Project")
+    if not check_project_ownership(project_id, user_id):
+        return access_denied_response()
+
+    compress = request.args.get('compress')
+    if compress not in (None, 'gzip'):
+        return error_response("compress must be 'gzip'")
+
+    header = {
+        'format_version': EXPORT_FORMAT_VERSION,
+        'exported_at': utc_now(),
+        'id': project.id,
+        'name': project.name,
+        'description': project.description,
+        'owner_id': project.owner_id,
+        'created_at': project.created_at
+    }
+
+    # The export reads on its own connection; return the session's to the pool
+    db.session.close()
+    logger.info(f"Project {project_id} export started by user {user_id}")
+
+    chunks = _chunked(_ndjson_records(project_id, header), current_app.config.get('EXPORT_CHUNK_BYTES', 65536))
+    filename = f'project-{project_id}-export.ndjson'
+    if compress == 'gzip':
+        chunks = _gzipped(chunks)
+        filename += '.gz'
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype='application/gzip' if compress else 'application/x-ndjson',
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no'
+        }
+    )
@@ -0,0 +1,53 @@
+from flask import request
+from sqlalchemy.orm import load_only, joinedload, lazyload
+from .shared.response_helpers import validation_error_response
+
+def get_requested_fields(spec, default=None):
+    """Parse ?fields=a,b against the names in spec into (fields, error)
+
+    fields falls back to default, where None means every field.
+    """
+    raw = request.args.get('fields')
+    if not raw:
+        return (set(default) if default is not None else None), None
+
+    fields = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = fields.difference(spec)
+    if unknown:
+        return None, validation_error_response({
+            'fields': f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(spec)}"
+        })
+    return fields, None
+
+def serialize_fields(obj, spec, fields=None):
+    """Build a payload from the spec's getters, limited to fields"""
+    if fields is None:
+        return {name: getter(obj) for name, (getter, _, _) in spec.items()}
+    return {name: getter(obj) for name, (getter, _, _) in spec.items() if name in fields}
+
+def load_options(model, spec, relations, fields=None, always=()):
+    """Loader options fetching only the columns and joins the fields need
+
+    spec maps field -> (getter, column, relationship); relations maps each
+    relationship to the related columns its fields read. Unrequested columns
+    raise on access so a serializer can't silently trigger per-row loads.
+    """
+    selected = spec.keys() if fields is None else fields
+    columns = {getattr(model, name) for name in always}
+    needed = set()
+    for name in selected:
+        _, column, relation = spec[name]
+        if column:
+            columns.add(getattr(model, column))
+        if relation:
+            needed.add(relation)
+
+    # Cancel default eager loads (e.g. lazy='joined') the fields don't use
+    options = [lazyload('*')]
+    if fields is not None:
+        options.append(load_only(*columns, raiseload=True))
+    for relation in needed:
+        attribute = getattr(model, relation)
+        related = attribute.property.mapper.class_
+        options.append(joinedload(attribute).load_only(*(getattr(related, name) for name in relations[relation])))
+    return options
@@ -0,0 +1,392 @@
+import csv
+import io
+import json
+import logging
+from itertools import islice
+from flask import Blueprint, current_app, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select, update, insert, func, or_
+from .models import db, Project, ProjectMember, User, Task, Message, ImportJob
+from .permissions import check_project_ownership
+from .project_summary import record_project_updated, rebuild_project_summaries
+from .project_activity import backfill_daily_activity
+from .tasks import _validate_task_item
+from .utils import utc_now, parse_datetime
+from .shared.error_tracking import track_performance
+from .shared.response_helpers import (
+    success_response, created_response, error_response, not_found_response, access_denied_response
+)
+
+logger = logging.getLogger(__name__)
+
+imports_bp = Blueprint('imports', __name__)
+
+IMPORT_KINDS = ('tasks', 'messages')
+IMPORT_FORMATS = ('csv', 'ndjson')
+# Columns a CSV header must name for each kind
+REQUIRED_COLUMNS = {'tasks': ('title',), 'messages': ('content', 'author_email')}
+# Export record type accepted for each kind, so exports import back in; their
+# user_id/assignee_id stand in for emails and must belong to project members
+EXPORT_RECORD_TYPES = {'tasks': 'task', 'messages': 'message'}
+MAX_RECORDED_ERRORS = 100
+
+TASK_COLUMNS = ('project_id', 'title', 'description', 'assignee_id', 'due_date', 'status', 'priority', 'created_at', 'updated_at')
+MESSAGE_COLUMNS = ('project_id', 'user_id', 'content', 'created_at')
+
+class ImportRejected(Exception):
+    """Raised when an import source can't be read at all"""
+
+class ImportConflict(ImportRejected):
+    """Raised when another run of the same job moved its checkpoint"""
+
+def infer_format(filename):
+    """Pick the import format from a file extension, if it names one"""
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return None
+
+def iter_records(stream, fmt, kind):
+    """Yield (record, error) per source row, reading the stream incrementally
+
+    Undecodable bytes and malformed CSV reject the rest of the file.
+    """
+    try:
+        yield from _read_records(stream, fmt, kind)
+    except UnicodeDecodeError as e:
+        raise ImportRejected("File is not valid UTF-8") from e
+    except csv.Error as e:
+        raise ImportRejected(f"Malformed CSV: {e}") from e
+
+def _read_records(stream, fmt, kind):
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        header = {name.strip().lower() for name in reader.fieldnames or () if name}
+        missing = [name for name in REQUIRED_COLUMNS[kind] if name not in header]
+        if missing:
+            raise ImportRejected(f"CSV header is missing: {', '.join(missing)}")
+        for row in reader:
+            yield {key.strip().lower(): value.strip() for key, value in row.items()
+                   if key and isinstance(value, str) and value.strip()}, None
+        return
+
+    record_type = EXPORT_RECORD_TYPES[kind]
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield None, {'record': 'Invalid JSON'}
+            continue
+        if not isinstance(record, dict):
+            yield None, {'record': 'Must be an object'}
+            continue
+        if isinstance(record.get('data'), dict) and 'type' in record:
+            # Export envelope: keep only the records for this kind
+            if record['type'] != record_type:
+                continue
+            record = record['data']
+        yield record, None
+
+def _project_users(project, emails, user_ids):
+    """Resolve lowercased emails and user ids among the project's owner and members, in one query
+
+    Returns {email or id: user id}; an id maps to itself once it is a member.
+    """
+    if not emails and not user_ids:
+        return {}
+    is_member = select(ProjectMember.id).where(
+        ProjectMember.project_id == project.id, ProjectMember.user_id == User.id
+    ).exists()
+    rows = db.session.execute(
+        select(User.id, func.lower(User.email)).where(
+            or_(func.lower(User.email).in_(emails), User.id.in_(user_ids)),
+            or_(User.id == project.owner_id, is_member)
+        )
+    )
+    users = {}
+    for user_id, email in rows:
+        users[email] = user_id
+        users[user_id] = user_id
+    return users
+
+def _email(record, field):
+    value = record.get(field)
+    return value.strip().lower() if isinstance(value, str) and value.strip() else None
+
+def _user_id(record, field):
+    """An integer id from an export record (or a digits-only CSV cell)"""
+    value = record.get(field)
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return value if type(value) is int else None
+
+def _person(record, email_field, id_field):
+    """The key naming a user: the email when given, else the exported user id"""
+    email = _email(record, email_field)
+    return email if email else _user_id(record, id_field)
+
+def _task_row(record, project_id, users, now):
+    """Validate a task record into an insert row, returning (row, errors)"""
+    item = {field: record[field] for field in ('title', 'description', 'status', 'priority', 'due_date')
+            if record.get(field) not in (None, '')}
+    values, errors = _validate_task_item(item, creating=True)
+    assignee = _person(record, 'assignee_email', 'assignee_id')
+    if assignee is not None and assignee not in users:
+        errors['assignee_email' if isinstance(assignee, str) else 'assignee_id'] = 'Not a member of this project'
+    if errors:
+        return None, errors
+    return {
+        'project_id': project_id,
+        'title': values['title'].strip(),
+        'description': values['description'],
+        'assignee_id': users.get(assignee),
+        'due_date': values.get('due_date'),
+        'status': values['status'],
+        'priority': values['priority'],
+        'created_at': now,
+        'updated_at': now
+    }, None
+
+def _message_row(record, project_id, users, now):
+    """Validate a message record into an insert row, returning (row, errors)"""
+    errors = {}
+    content = record.get('content')
+    if not isinstance(content, str) or not content.strip():
+        errors['content'] = 'Content is required'
+    author = _person(record, 'author_email', 'user_id')
+    if author is None:
+        errors['author_email'] = 'Author email (or exported user_id) is required'
+    elif author not in users:
+        errors['author_email' if isinstance(author, str) else 'user_id'] = 'Not a member of this project'
+    created_at = now
+    if record.get('created_at'):
+        try:
+            created_at = parse_datetime(record['created_at'])
+        except (TypeError, ValueError, AttributeError):
+            errors['created_at'] = 'Must be an ISO 8601 datetime'
+    if errors:
+        return None, errors
+    return {
+        'project_id': project_id,
+        'user_id': users[author],
+        'content': content.strip(),
+        'created_at': created_at
+    }, None
+
+def _copy_value(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+def _write_rows(table, columns, rows):
+    """Insert rows with COPY on PostgreSQL (psycopg2), else one executemany"""
+    connection = db.session.connection()
+    if connection.dialect.name == 'postgresql' and connection.dialect.driver == 'psycopg2':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_copy_value(row[column]) for column in columns])
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+        return
+    db.session.execute(insert(table), rows)
+
+def _import_chunk(job, project, chunk):
+    """Write one chunk and advance the checkpoint in the same transaction
+
+    The checkpoint update only applies if no other run moved it meanwhile,
+    so two runs of one job can't both import the same rows.
+    """
+    build_row, table, columns = {
+        'tasks': (_task_row, Task.__table__, TASK_COLUMNS),
+        'messages': (_message_row, Message.__table__, MESSAGE_COLUMNS)
+    }[job['kind']]
+    email_field, id_field = ('assignee_email', 'assignee_id') if job['kind'] == 'tasks' else ('author_email', 'user_id')
+
+    people = {_person(record, email_field, id_field) for record, _ in chunk if record} - {None}
+    users = _project_users(
+        project, {key for key in people if isinstance(key, str)}, {key for key in people if isinstance(key, int)}
+    )
+    now = utc_now()
+
+    rows, rejected = [], []
+    for offset, (record, errors) in enumerate(chunk):
+        if record is not None:
+            row, errors = build_row(record, project.id, users, now)
+            if row:
+                rows.append(row)
+                continue
+        rejected.append({'row': job['rows_processed'] + offset + 1, 'errors': errors})
+
+    if rows:
+        _write_rows(table, columns, rows)
+
+    errors = job['errors']
+    errors.extend(rejected[:MAX_RECORDED_ERRORS - len(errors)])
+    claimed = db.session.execute(
+        update(ImportJob).where(
+            ImportJob.id == job['id'], ImportJob.rows_processed == job['rows_processed']
+        ).values(
+            rows_processed=ImportJob.rows_processed + len(chunk),
+            rows_imported=ImportJob.rows_imported + len(rows),
+            rows_rejected=ImportJob.rows_rejected + len(rejected),
+            errors=json.dumps(errors),
+            updated_at=now
+        )
+    ).rowcount
+    if not claimed:
+        db.session.rollback()
+        raise ImportConflict('Import job was advanced by another run')
+    db.session.commit()
+    job['rows_processed'] += len(chunk)
+
+def _set_status(job_id, status, error=None):
+    values = {'status': status, 'updated_at': utc_now()}
+    if status in ('completed', 'failed'):
+        values['finished_at'] = utc_now()
+    job = db.session.get(ImportJob, job_id)
+    if error:
+        errors = json.loads(job.errors or '[]')
+        errors.append({'row': None, 'errors': {'import': error}})
+        values['errors'] = json.dumps(errors)
+    db.session.execute(update(ImportJob).where(ImportJob.id == job_id).values(**values))
+    db.session.commit()
+
+@track_performance("run import")
+def run_import(job, stream, chunk_size=None):
+    """Import a source stream into the job's project, resuming after its checkpoint
+
+    Rows are validated and written a chunk at a time, each chunk committed
+    together with the checkpoint. Per-row notifications are not sent; project
+    summaries and daily rollups are recomputed once the run completes.
+    """
+    chunk_size = chunk_size or current_app.config.get('IMPORT_CHUNK_SIZE', 2000)
+    project = db.session.get(Project, job.project_id)
+    state = {
+        'id': job.id,
+        'kind': job.kind,
+        'rows_processed': job.rows_processed,
+        'errors': json.loads(job.errors or '[]')
+    }
+    _set_status(job.id, 'running')
+
+    try:
+        records = iter_records(stream, job.format, job.kind)
+        # Rows up to the checkpoint were committed by an earlier run
+        for _ in islice(records, state['rows_processed']):
+            pass
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            _import_chunk(state, project, chunk)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Import job {state['id']} failed after {state['rows_processed']} rows: {e}")
+        if not isinstance(e, ImportConflict):
+            _set_status(state['id'], 'failed', str(e))
+        raise
+
+    record_project_updated(project.id)
+    rebuild_project_summaries([project.id])
+    # Imported rows may carry past dates, so rebuild the project's rollups from source
+    backfill_daily_activity([project.id])
+    _set_status(state['id'], 'completed')
+    logger.info(f"Import job {state['id']} completed: {state['rows_processed']} rows")
+    return db.session.get(ImportJob, state['id'])
+
+def create_import_job(project_id, user_id, kind, fmt, source=None):
+    """Record a new pending import job"""
+    job = ImportJob(project_id=project_id, user_id=user_id, kind=kind, format=fmt, source=source)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+def serialize_import_job(job):
+    """Serialize import job object to dictionary"""
+    return {
+        'id': job.id,
+        'project_id': job.project_id,
+        'kind': job.kind,
+        'format': job.format,
+        'source': job.source,
+        'status': job.status,
+        'rows_processed': job.rows_processed,
+        'rows_imported': job.rows_imported,
+        'rows_rejected': job.rows_rejected,
+        'errors': json.loads(job.errors or '[]'),
+        'created_at': job.created_at,
+        'finished_at': job.finished_at
+    }
+
+def _upload():
+    """The uploaded file (multipart 'file') or raw request body, with its filename"""
+    upload = request.files.get('file')
+    if upload:
+        return upload.stream, upload.filename
+    return request.stream, None
+
+def _run_uploaded(job, respond=success_response):
+    stream, _ = _upload()
+    try:
+        job = run_import(job, stream)
+    except ImportConflict as e:
+        return error_response(str(e), 409, error_code='IMPORT_CONFLICT')
+    except ImportRejected as e:
+        return error_response(str(e), error_code='IMPORT_REJECTED')
+    return respond({'import_job': serialize_import_job(job)})
+
+@imports_bp.route('/api/projects/<int:project_id>/import', methods=['POST'])
+@jwt_required()
+def import_project_data(project_id):
+    """Import tasks or messages from an uploaded CSV or NDJSON file"""
+    user_id = get_jwt_identity()
+    if not db.session.get(Project, project_id):
+        return not_found_response("Project")
+    if not check_project_ownership(project_id, user_id):
+        return access_denied_response()
+
+    kind = request.args.get('kind')
+    if kind not in IMPORT_KINDS:
+        return error_response(f"kind must be one of {', '.join(IMPORT_KINDS)}")
+    _, filename = _upload()
+    fmt = request.args.get('format') or infer_format(filename)
+    if fmt not in IMPORT_FORMATS:
+        return error_response(f"format must be one of {', '.join(IMPORT_FORMATS)}")
+
+    job = create_import_job(project_id, user_id, kind, fmt, filename)
+    return _run_uploaded(job, created_response)
+
+@imports_bp.route('/api/imports/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_import_job(job_id):
+    """Get an import job's progress and rejected rows"""
+    job = db.session.get(ImportJob, job_id)
+    if not job:
+        return not_found_response("Import job")
+    if job.user_id != get_jwt_identity():
+        return access_denied_response()
+    return success_response({'import_job': serialize_import_job(job)})
+
+@imports_bp.route('/api/imports/<int:job_id>/resume', methods=['POST'])
+@jwt_required()
+def resume_import_job(job_id):
+    """Continue a failed import from its checkpoint; upload the same file again"""
+    job = db.session.get(ImportJob, job_id)
+    if not job:
+        return not_found_response("Import job")
+    if job.user_id != get_jwt_identity():
+        return access_denied_response()
+    if job.status == 'completed':
+        return error_response("Import job already completed")
+    return _run_uploaded(job)
@@ -0,0 +1,70 @@
+from flask import current_app
+from sqlalchemy import select, union_all, literal
+from .models import db, Project, ProjectMember
+from .shared.lru_cache import TTLCache
+from .shared.cache import project_namespace, user_namespace
+
+def _get_cache():
+    """Return the per-app membership index cache"""
+    cache = current_app.extensions.get('membership_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('membership_cache', TTLCache(
+            maxsize=current_app.config.get('MEMBERSHIP_CACHE_SIZE', 10000),
+            ttl=current_app.config.get('MEMBERSHIP_CACHE_TTL', 60)
+        ))
+    return cache
+
+def _load_memberships(user_id):
+    """Load {project_id: role} for the user with a single query"""
+    rows = db.session.execute(union_all(
+        select(Project.id, literal('owner')).where(Project.owner_id == user_id),
+        select(ProjectMember.project_id, ProjectMember.role).where(ProjectMember.user_id == user_id)
+    )).all()
+
+    memberships = {}
+    for project_id, role in rows:
+        if memberships.get(project_id) != 'owner':
+            memberships[project_id] = role or 'member'
+    return memberships
+
+def get_user_memberships(user_id):
+    """Return {project_id: role} for every project the user can access"""
+    if user_id is None:
+        return {}
+    user_id = int(user_id)
+    cache = _get_cache()
+    memberships = cache.get(user_id)
+    if memberships is None:
+        generation = cache.generation
+        memberships = _load_memberships(user_id)
+        cache.set(user_id, memberships, generation=generation)
+    return memberships
+
+def get_accessible_project_ids(user_id):
+    """Return the ids of projects the user owns or is a member of"""
+    return list(get_user_memberships(user_id))
+
+def get_project_role(project_id, user_id):
+    """Return the user's role in the project, or None without access"""
+    return get_user_memberships(user_id).get(int(project_id))
+
+def has_project_access(project_id, user_id):
+    """In-memory project access check backed by the membership index"""
+    return project_id is not None and int(project_id) in get_user_memberships(user_id)
+
+def invalidate_user(user_id):
+    """Drop cached memberships for a user (joined, left or created a project)"""
+    _get_cache().pop(int(user_id))
+
+def invalidate_project(project_id):
+    """Drop cached memberships of every user with access to a project"""
+    project_id = int(project_id)
+    _get_cache().discard_where(lambda memberships: project_id in memberships)
+
+def membership_cache_stats():
+    """Hit/miss counters of the membership index"""
+    return _get_cache().stats()
+
+def user_cache_namespaces(user_id):
+    """Response-cache namespaces covering everything visible to the user"""
+    return [user_namespace(user_id)] + [project_namespace(pid) for pid in get_accessible_project_ids(user_id)]
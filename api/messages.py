@@ -1,13 +1,20 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 import logging
+from datetime import datetime
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy.orm import joinedload
-from .models import db, Message
+from sqlalchemy import select, func, literal, case, true
+from sqlalchemy.orm import aliased
+from .models import db, Message, User
 from .validation import validate_json
 from .permissions import require_project_access
-from .pagination import get_pagination_params, format_pagination_response
-from .serializers import serialize_message
+from .membership import get_accessible_project_ids
+from .pagination import get_pagination_params, get_count_mode, paginate, format_pagination_response, encode_cursor, decode_cursor
+from .serializers import serialize_message, MESSAGE_FIELDS, MESSAGE_RELATIONS
+from .fieldsets import get_requested_fields, load_options
+from .project_summary import record_message_posted, project_version
+from .stream import publish_event, project_channel
+from .shared.response_helpers import make_etag, etag_matches, not_modified_response, with_etag
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +22,15 @@ messages_bp = Blueprint('messages', __name__)
 
 
 
+def _decode_message_cursor(cursor):
+    """Decode a (created_at, id) message cursor"""
+    created_at, message_id = decode_cursor(cursor, 2)
+    return datetime.fromisoformat(created_at), int(message_id)
+
+def _message_cursor(message):
+    """Opaque cursor pointing at a message"""
+    return encode_cursor(message.created_at, message.id)
+
 @messages_bp.route('/api/projects/<int:project_id>/messages', methods=['GET'])
 @jwt_required()
 def get_messages(project_id):
@@ -25,16 +41,71 @@ def get_messages(project_id):
         if access_error:
             return access_error
         
+        fields, error = get_requested_fields(MESSAGE_FIELDS)
+        if error:
+            return error
+        
+        etag = make_etag(user_id, *project_version(project_id))
+        if etag_matches(etag):
+            return not_modified_response(etag)
+        
         page, per_page = get_pagination_params(default_per_page=50)
         
-        # Eager load user to avoid N+1 queries
-        messages_query = Message.query.options(joinedload(Message.user)).filter_by(project_id=project_id).order_by(Message.created_at.asc())
-        messages_paginated = messages_query.paginate(page=page, per_page=per_page, error_out=False)
+        # Join the author only when a requested field needs it; cursors always need created_at
+        messages_query = Message.query.options(
+            *load_options(Message, MESSAGE_FIELDS, MESSAGE_RELATIONS, fields, always=('created_at',))
+        ).filter_by(project_id=project_id)
         
-        response = format_pagination_response(messages_paginated, 'messages')
-        response['messages'] = [serialize_message(msg) for msg in messages_paginated.items]
+        before = request.args.get('before')
+        after = request.args.get('after')
         
-        return jsonify(response)
+        if 'page' in request.args and not (before or after):
+            # Legacy offset pagination
+            messages_query = messages_query.order_by(Message.created_at.asc())
+            messages_paginated = paginate(messages_query, page, per_page, get_count_mode(default='none'))
+            
+            response = format_pagination_response(messages_paginated, 'messages')
+            response['messages'] = [serialize_message(msg, fields) for msg in messages_paginated.items]
+            return with_etag(jsonify(response), etag)
+        
+        # Keyset pagination on (project_id, created_at) with id as tie-breaker
+        try:
+            if after:
+                created_at, message_id = _decode_message_cursor(after)
+                rows = messages_query.filter(db.or_(
+                    Message.created_at > created_at,
+                    db.and_(Message.created_at == created_at, Message.id > message_id)
+                )).order_by(Message.created_at.asc(), Message.id.asc()).limit(per_page + 1).all()
+                has_newer = len(rows) > per_page
+                has_older = True
+                rows = rows[:per_page]
+            else:
+                if before:
+                    created_at, message_id = _decode_message_cursor(before)
+                    messages_query = messages_query.filter(db.or_(
+                        Message.created_at < created_at,
+                        db.and_(Message.created_at == created_at, Message.id < message_id)
+                    ))
+                rows = messages_query.order_by(
+                    Message.created_at.desc(), Message.id.desc()
+                ).limit(per_page + 1).all()
+                has_older = len(rows) > per_page
+                has_newer = bool(before)
+                rows = rows[:per_page][::-1]
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        return with_etag(jsonify({
+            'messages': [serialize_message(msg, fields) for msg in rows],
+            'pagination': {
+                'per_page': per_page,
+                'has_older': has_older,
+                'has_newer': has_newer,
+                # Pass prev_cursor as ?before= to scroll back, next_cursor as ?after= to poll
+                'prev_cursor': _message_cursor(rows[0]) if rows and has_older else None,
+                'next_cursor': _message_cursor(rows[-1]) if rows else after
+            }
+        }), etag)
     except SQLAlchemyError as e:
         logger.error(f"Database error fetching messages for project {project_id}: {e}")
         return jsonify({'error': 'Failed to fetch messages'}), 500
@@ -66,12 +137,16 @@ def create_message(project_id):
         )
         
         db.session.add(message)
+        record_message_posted(project_id)
         db.session.commit()
         
         # Refresh to get user relationship loaded
         db.session.refresh(message)
         
-        return jsonify(serialize_message(message)), 201
+        payload = serialize_message(message)
+        publish_event(project_channel(project_id), 'message.created', {**payload, 'project_id': project_id})
+        
+        return jsonify(payload), 201
     except SQLAlchemyError as e:
         db.session.rollback()
         logger.error(f"Database error creating message for project {project_id}: {e}")
@@ -79,4 +154,100 @@ def create_message(project_id):
     except Exception as e:
         db.session.rollback()
         logger.error(f"Unexpected error creating message for project {project_id}: {e}")
-        return jsonify({'error': 'Failed to create message'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to create message'}), 500
+
+def _thread_statement(message_id, project_ids, max_depth, limit):
+    """One recursive statement: the reply tree under a message plus its reply statistics
+
+    The walk follows ix_message_thread down to THREAD_MAX_DEPTH; reply counts
+    cover everything walked, while rows are returned breadth-first up to
+    max_depth and limit, so every returned reply's parent is returned too.
+    """
+    walk_depth = current_app.config.get('THREAD_MAX_DEPTH', 100)
+    thread = select(
+        Message.id, Message.parent_id, Message.project_id, Message.user_id, Message.content,
+        Message.created_at, literal(0).label('depth')
+    ).where(Message.id == message_id, Message.project_id.in_(project_ids)).cte('thread', recursive=True)
+    reply = aliased(Message)
+    thread = thread.union_all(select(
+        reply.id, reply.parent_id, reply.project_id, reply.user_id, reply.content,
+        reply.created_at, thread.c.depth + 1
+    ).join(thread, reply.parent_id == thread.c.id).where(
+        reply.project_id == thread.c.project_id, thread.c.depth < walk_depth
+    ))
+
+    replies = select(
+        thread.c.parent_id,
+        func.count().label('reply_count'),
+        func.max(thread.c.created_at).label('last_reply_at')
+    ).group_by(thread.c.parent_id).subquery()
+    totals = select(
+        (func.count() - 1).label('total_replies'),
+        func.max(case((thread.c.depth > 0, thread.c.created_at))).label('thread_last_reply_at'),
+        func.max(thread.c.depth).label('thread_depth')
+    ).subquery()
+    return select(
+        thread, User.name.label('user_name'),
+        func.coalesce(replies.c.reply_count, 0).label('reply_count'), replies.c.last_reply_at, totals
+    ).select_from(thread).join(totals, true()).outerjoin(
+        replies, replies.c.parent_id == thread.c.id
+    ).outerjoin(User, User.id == thread.c.user_id).where(
+        thread.c.depth <= max_depth
+    ).order_by(thread.c.depth, thread.c.created_at, thread.c.id).limit(limit + 1)
+
+def _thread_node(row):
+    return {
+        'id': row.id,
+        'content': row.content,
+        'user_id': row.user_id,
+        'user_name': row.user_name or 'Unknown',
+        'parent_id': row.parent_id,
+        'created_at': row.created_at,
+        'depth': row.depth,
+        'reply_count': row.reply_count,
+        'last_reply_at': row.last_reply_at,
+        'replies': []
+    }
+
+@messages_bp.route('/api/messages/<int:message_id>/thread', methods=['GET'])
+@jwt_required()
+def get_message_thread(message_id):
+    """The reply tree under a message in one round trip, whatever its depth
+
+    ?max_depth= limits how many reply levels are returned and ?limit= how
+    many messages; statistics always describe the whole thread.
+    """
+    try:
+        user_id = get_jwt_identity()
+        walk_depth = current_app.config.get('THREAD_MAX_DEPTH', 100)
+        max_depth = max(0, min(request.args.get('max_depth', walk_depth, type=int), walk_depth))
+        max_messages = current_app.config.get('THREAD_MAX_MESSAGES', 1000)
+        limit = max(1, min(request.args.get('limit', max_messages, type=int), max_messages))
+        
+        # Access is part of the query: a message outside the user's projects isn't found
+        rows = db.session.execute(
+            _thread_statement(message_id, get_accessible_project_ids(user_id), max_depth, limit)
+        ).all()
+        if not rows:
+            return jsonify({'error': 'Message not found'}), 404
+        
+        truncated = len(rows) > limit
+        nodes = {}
+        for row in rows[:limit]:
+            node = nodes[row.id] = _thread_node(row)
+            if row.depth:
+                nodes[row.parent_id]['replies'].append(node)
+        
+        first = rows[0]
+        return jsonify({
+            'thread': nodes[message_id],
+            'total_replies': first.total_replies,
+            'last_reply_at': first.thread_last_reply_at,
+            'depth': first.thread_depth,
+            'returned': min(len(rows), limit),
+            # More replies exist beyond max_depth or limit
+            'truncated': truncated or first.thread_depth > max_depth
+        })
+    except SQLAlchemyError as e:
+        logger.error(f"Database error fetching thread of message {message_id}: {e}")
+        return jsonify({'error': 'Failed to fetch thread'}), 500
@@ -26,12 +26,34 @@ class Project(db.Model):
     description = db.Column(db.Text)
     owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=utc_now, index=True)
+    deleted_at = db.Column(db.DateTime, index=True)  # set until the background purge removes it
     
     # Relationships
     tasks = db.relationship('Task', backref='project', lazy='dynamic')
     messages = db.relationship('Message', backref='project', lazy='dynamic')
     members = db.relationship('ProjectMember', backref='project', lazy='dynamic')
 
+class ProjectSummary(db.Model):
+    """Denormalized per-project counters maintained on write"""
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), primary_key=True)
+    todo_count = db.Column(db.Integer, nullable=False, default=0)
+    in_progress_count = db.Column(db.Integer, nullable=False, default=0)
+    done_count = db.Column(db.Integer, nullable=False, default=0)
+    member_count = db.Column(db.Integer, nullable=False, default=0)  # excludes owner
+    last_activity_at = db.Column(db.DateTime, index=True)
+
+class ProjectDailyActivity(db.Model):
+    """Per-project per-day activity counters with the day's latest status snapshot"""
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    tasks_created = db.Column(db.Integer, nullable=False, default=0)
+    tasks_completed = db.Column(db.Integer, nullable=False, default=0)
+    messages_posted = db.Column(db.Integer, nullable=False, default=0)
+    # Status counts as of the last write that day; quiet days carry the previous row forward
+    todo_count = db.Column(db.Integer, nullable=False, default=0)
+    in_progress_count = db.Column(db.Integer, nullable=False, default=0)
+    done_count = db.Column(db.Integer, nullable=False, default=0)
+
 class ProjectMember(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False, index=True)
@@ -52,10 +74,12 @@ class Task(db.Model):
     priority = db.Column(db.String(10), default='medium', index=True)  # low, medium, high
     created_at = db.Column(db.DateTime, default=utc_now, index=True)
     updated_at = db.Column(db.DateTime, default=utc_now, onupdate=utc_now, index=True)
+    deleted_at = db.Column(db.DateTime, index=True)  # set until the background purge removes it
     
     __table_args__ = (
         db.Index('ix_task_project_status', 'project_id', 'status'),
         db.Index('ix_task_assignee_status', 'assignee_id', 'status'),
+        db.Index('ix_task_assignee_updated', 'assignee_id', 'updated_at'),
     )
 
 class Message(db.Model):
@@ -79,7 +103,8 @@ class Notification(db.Model):
     message = db.Column(db.Text, nullable=False)
     related_project_id = db.Column(db.Integer, db.ForeignKey('project.id'), index=True)
     related_task_id = db.Column(db.Integer, db.ForeignKey('task.id'), index=True)
-    is_read = db.Column(db.Boolean, default=False, index=True)
+    # Superseded by the read watermark (see notification_reads); kept for rollback
+    is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=utc_now, index=True)
     read_at = db.Column(db.DateTime)
     
@@ -88,7 +113,72 @@ class Notification(db.Model):
     project = db.relationship('Project', backref='notifications', lazy='joined')
     task = db.relationship('Task', backref='notifications', lazy='joined')
     
+    # Derived (is_read, read_at), filled in by notification_reads.apply_read_state
+    read_state = (False, None)
+    
     __table_args__ = (
-        db.Index('ix_notification_user_unread', 'user_id', 'is_read', 'created_at'),
         db.Index('ix_notification_user_created', 'user_id', 'created_at'),
     )
+
+class UserStats(db.Model):
+    """Per-user counters maintained on write"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    unread_notifications = db.Column(db.Integer, nullable=False, default=0)
+    notifications_version = db.Column(db.Integer, nullable=False, default=0)  # bumped when the list changes
+
+class NotificationReadState(db.Model):
+    """Per-user read watermark: notifications with ids up to read_through_id are read"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    read_through_id = db.Column(db.Integer, nullable=False, default=0)
+    read_through_at = db.Column(db.DateTime)
+
+class NotificationReadMark(db.Model):
+    """Notifications read individually above the user's watermark"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    notification_id = db.Column(db.Integer, db.ForeignKey('notification.id'), primary_key=True)
+    read_at = db.Column(db.DateTime, default=utc_now)
+
+
+class NotificationOutbox(db.Model):
+    """Notification intents written in the same transaction as the change that caused them"""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # task_assigned, task_status_changed, project_member_added, task_due_soon
+    user_id = db.Column(db.Integer, nullable=False)  # recipient
+    actor_id = db.Column(db.Integer)
+    project_id = db.Column(db.Integer)
+    task_id = db.Column(db.Integer)
+    payload = db.Column(db.Text)  # JSON with kind-specific fields
+    created_at = db.Column(db.DateTime, default=utc_now, index=True)
+
+
+class ImportJob(db.Model):
+    """Bulk import run; rows_processed is the checkpoint a resumed run skips past"""
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # who started it
+    kind = db.Column(db.String(20), nullable=False)  # tasks, messages
+    format = db.Column(db.String(10), nullable=False)  # csv, ndjson
+    source = db.Column(db.String(255))  # original filename
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)  # pending, running, completed, failed
+    rows_processed = db.Column(db.Integer, nullable=False, default=0)
+    rows_imported = db.Column(db.Integer, nullable=False, default=0)
+    rows_rejected = db.Column(db.Integer, nullable=False, default=0)
+    errors = db.Column(db.Text)  # JSON list of the first rejected rows
+    created_at = db.Column(db.DateTime, default=utc_now)
+    updated_at = db.Column(db.DateTime, default=utc_now, onupdate=utc_now)
+    finished_at = db.Column(db.DateTime)
+
+
+class PurgeJob(db.Model):
+    """Background removal of a soft-deleted project or task; step is where a resumed run continues"""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # project, task
+    target_id = db.Column(db.Integer, nullable=False)  # no FK: the job outlives its target
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # who deleted it
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)  # pending, running, completed
+    step = db.Column(db.String(30))  # table currently being purged
+    rows_deleted = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=utc_now)
+    updated_at = db.Column(db.DateTime, default=utc_now, onupdate=utc_now)
+    finished_at = db.Column(db.DateTime)
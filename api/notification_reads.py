@@ -0,0 +1,103 @@
+# Notification read state: a per-user watermark (every notification with an
+# id at or below it is read) plus a sparse set of ids read individually above
+# it. "Mark all read" moves the watermark instead of rewriting rows.
+
+from sqlalchemy import select, delete, func, exists
+from .models import db, Notification, NotificationReadState, NotificationReadMark
+from .utils import utc_now
+from .user_stats import record_notification_unread_decrement, reset_unread_counter, bump_notification_version
+from .shared.db_operations import upsert_counters
+
+def watermark_subquery(user_id):
+    """The user's read-through id as a scalar subquery, 0 when nothing was marked"""
+    return func.coalesce(
+        select(NotificationReadState.read_through_id)
+        .where(NotificationReadState.user_id == user_id).scalar_subquery(),
+        0
+    )
+
+def unread_notifications_select(user_id):
+    """COUNT of unread notifications: above the watermark and not individually read"""
+    is_marked = exists().where(
+        NotificationReadMark.user_id == user_id,
+        NotificationReadMark.notification_id == Notification.id
+    )
+    # Runs inside an upsert, where the soft-delete hook doesn't apply
+    from .purge import visible_notification
+    return select(func.count(Notification.id)).where(
+        Notification.user_id == user_id,
+        Notification.id > watermark_subquery(user_id),
+        ~is_marked,
+        visible_notification()
+    )
+
+def count_unread_notifications(user_id):
+    """Number of unread notifications for a user"""
+    return db.session.execute(unread_notifications_select(user_id)).scalar()
+
+def apply_read_state(user_id, notifications):
+    """Set each notification's derived (is_read, read_at) with at most two queries"""
+    if not notifications:
+        return notifications
+    state = db.session.get(NotificationReadState, user_id)
+    read_through_id = state.read_through_id if state else 0
+    above = [n.id for n in notifications if n.id > read_through_id]
+    marks = dict(db.session.execute(
+        select(NotificationReadMark.notification_id, NotificationReadMark.read_at).where(
+            NotificationReadMark.user_id == user_id,
+            NotificationReadMark.notification_id.in_(above)
+        )
+    ).all()) if above else {}
+
+    for notification in notifications:
+        if notification.id <= read_through_id:
+            notification.read_state = (True, state.read_through_at)
+        elif notification.id in marks:
+            notification.read_state = (True, marks[notification.id])
+        else:
+            notification.read_state = (False, None)
+    return notifications
+
+def record_notification_read(user_id, notification_id):
+    """Record one notification as read; a no-op at or below the watermark"""
+    state = db.session.get(NotificationReadState, user_id)
+    if state and notification_id <= state.read_through_id:
+        return
+    # Only a newly written mark changes the unread counter
+    if upsert_counters(NotificationReadMark, {'user_id': user_id, 'notification_id': notification_id}):
+        record_notification_unread_decrement(user_id)
+
+def record_all_notifications_read(user_id, through_id=None):
+    """Move the watermark to the newest notification the client listed and drop the marks below it
+
+    Without through_id, the watermark moves to the user's newest notification.
+    Notifications are inserted under a lock on the recipient's stats row
+    (record_notifications_created), so one user's ids commit in id order: a
+    visible id means every lower id of that user is already committed, and
+    none can appear below the watermark after it moves.
+    """
+    newest_query = select(func.max(Notification.id)).where(Notification.user_id == user_id)
+    if through_id is not None:
+        newest_query = newest_query.where(Notification.id <= through_id)
+    newest = db.session.execute(newest_query).scalar()
+    state = db.session.get(NotificationReadState, user_id)
+    if newest is None or (state and newest <= state.read_through_id):
+        return
+    upsert_counters(
+        NotificationReadState,
+        {'user_id': user_id},
+        values={'read_through_id': newest, 'read_through_at': utc_now()}
+    )
+    db.session.execute(delete(NotificationReadMark).where(
+        NotificationReadMark.user_id == user_id,
+        NotificationReadMark.notification_id <= newest
+    ))
+    # Notifications the client had not received (above through_id) stay unread
+    reset_unread_counter(user_id, unread_notifications_select(user_id))
+    bump_notification_version(user_id)
+
+def delete_read_marks(notification_ids_select):
+    """Remove marks for notifications about to be deleted"""
+    db.session.execute(delete(NotificationReadMark).where(
+        NotificationReadMark.notification_id.in_(notification_ids_select)
+    ))
@@ -1,70 +1,117 @@
-from flask import Blueprint, request
+import json
+from collections import Counter
+from flask import Blueprint, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy.orm import joinedload
+from sqlalchemy import insert, select, func
 from datetime import datetime, timezone
-from .models import db, Notification, Task, Project, User
+from .models import db, Notification, NotificationOutbox, Task, Project, User
 from .shared.db_operations import safe_db_operation
-from .shared.response_helpers import success_response, not_found_response
-from .pagination import get_pagination_params, format_pagination_response
+from .shared.response_helpers import success_response, error_response, not_found_response, make_etag, etag_matches, not_modified_response
+from .pagination import get_pagination_params, get_count_mode, paginate, format_pagination_response
 from .utils import utc_now
+from .serializers import serialize_notification, NOTIFICATION_FIELDS, NOTIFICATION_RELATIONS
+from .fieldsets import get_requested_fields, load_options
+from .stream import publish_event, user_channel
+from .shared.cache import invalidate_on_commit, user_namespace
+from .shared.error_tracking import track_performance
+from .shared.metrics import notifications_created
+from .notification_reads import (
+    apply_read_state, record_notification_read, record_all_notifications_read
+)
+from .user_stats import record_notifications_created, get_unread_count, notification_list_version
 import logging
 
 logger = logging.getLogger(__name__)
 
 notifications_bp = Blueprint('notifications', __name__)
 
+def insert_notifications(rows):
+    """Insert notification rows with one multi-row INSERT; the caller commits"""
+    if not rows:
+        return []
+    now = utc_now()
+    for row in rows:
+        row.setdefault('created_at', now)
+    # Counters first: the stats row locks make each user's ids commit in id order
+    record_notifications_created(rows)
+    ids = db.session.execute(
+        insert(Notification).returning(Notification.id, sort_by_parameter_order=True),
+        rows
+    ).scalars().all()
+    for notification_type, count in Counter(row['type'] for row in rows).items():
+        notifications_created.inc(count, type=notification_type)
+    invalidate_on_commit(*{user_namespace(row['user_id']) for row in rows})
+    return [{**row, 'id': notification_id} for notification_id, row in zip(ids, rows)]
+
+def publish_notifications(created):
+    """Push inserted notifications to stream subscribers after commit"""
+    for row in created:
+        publish_event(user_channel(row['user_id']), 'notification.created', serialize_notification_event(row))
+
 def create_notification(user_id, type, title, message, project_id=None, task_id=None):
     """Helper function to create a notification"""
     try:
-        notification = Notification(
-            user_id=user_id,
-            type=type,
-            title=title,
-            message=message,
-            related_project_id=project_id,
-            related_task_id=task_id
-        )
-        db.session.add(notification)
+        created = insert_notifications([{
+            'user_id': user_id,
+            'type': type,
+            'title': title,
+            'message': message,
+            'related_project_id': project_id,
+            'related_task_id': task_id
+        }])
         db.session.commit()
-        return notification
+        publish_notifications(created)
+        return created[0]
     except Exception as e:
         logger.error(f"Error creating notification: {e}")
         db.session.rollback()
         return None
 
+def serialize_notification_event(row):
+    """Compact notification payload pushed to stream subscribers"""
+    return {
+        'id': row['id'],
+        'type': row['type'],
+        'title': row['title'],
+        'message': row['message'],
+        'project_id': row.get('related_project_id'),
+        'task_id': row.get('related_task_id'),
+        'created_at': row['created_at']
+    }
+
 @notifications_bp.route('/api/notifications', methods=['GET'])
 @jwt_required()
 @safe_db_operation("fetch notifications")
 def get_notifications():
     user_id = get_jwt_identity()
+    
+    fields, error = get_requested_fields(NOTIFICATION_FIELDS)
+    if error:
+        return error
+    
+    etag = make_etag(user_id, *notification_list_version(user_id))
+    if etag_matches(etag):
+        return not_modified_response(etag)
+    
     page, per_page = get_pagination_params(default_per_page=20)
     
-    # Get unread count
-    unread_count = Notification.query.filter_by(user_id=user_id, is_read=False).count()
+    # Maintained counter; no COUNT over notifications
+    unread_count = get_unread_count(user_id)
     
-    # Get paginated notifications
+    # Get paginated notifications; project/task are joined only when requested
     notifications_query = Notification.query.options(
-        joinedload(Notification.project),
-        joinedload(Notification.task)
+        *load_options(Notification, NOTIFICATION_FIELDS, NOTIFICATION_RELATIONS, fields)
     ).filter_by(user_id=user_id).order_by(Notification.created_at.desc())
     
-    notifications_paginated = notifications_query.paginate(page=page, per_page=per_page, error_out=False)
+    notifications_paginated = paginate(notifications_query, page, per_page, get_count_mode(default='none'))
     
     response = format_pagination_response(notifications_paginated, 'notifications')
     response['unread_count'] = unread_count
-    response['notifications'] = [{
-        'id': n.id,
-        'type': n.type,
-        'title': n.title,
-        'message': n.message,
-        'is_read': n.is_read,
-        'created_at': n.created_at.isoformat(),
-        'read_at': n.read_at.isoformat() if n.read_at else None,
-        'project': {'id': n.project.id, 'name': n.project.name} if n.project else None,
-        'task': {'id': n.task.id, 'title': n.task.title} if n.task else None
-    } for n in notifications_paginated.items]
+    # is_read/read_at are derived from the read watermark for just this page
+    apply_read_state(user_id, notifications_paginated.items)
+    response['notifications'] = [serialize_notification(n, fields) for n in notifications_paginated.items]
     
-    return success_response(response)
+    return success_response(response, etag=etag)
 
 @notifications_bp.route('/api/notifications/<int:notification_id>/read', methods=['PATCH'])
 @jwt_required()
@@ -72,13 +119,15 @@ def get_notifications():
 def mark_notification_read(notification_id):
     user_id = get_jwt_identity()
     
-    notification = Notification.query.filter_by(id=notification_id, user_id=user_id).first()
+    found = db.session.execute(
+        select(Notification.id).where(Notification.id == notification_id, Notification.user_id == user_id)
+    ).scalar()
     
-    if not notification:
+    if not found:
         return not_found_response("Notification")
     
-    notification.is_read = True
-    notification.read_at = utc_now()
+    record_notification_read(user_id, notification_id)
+    invalidate_on_commit(user_namespace(user_id))
     db.session.commit()
     
     return success_response({'message': 'Notification marked as read'})
@@ -88,11 +137,14 @@ def mark_notification_read(notification_id):
 @safe_db_operation("mark all notifications as read")
 def mark_all_notifications_read():
     user_id = get_jwt_identity()
+    # Optional: the newest id the client listed; without it, everything committed so far
+    through_id = (request.get_json(silent=True) or {}).get('through_id')
+    if through_id is not None and (type(through_id) is not int or through_id < 1):
+        return error_response('through_id must be the id of the newest notification received')
     
-    Notification.query.filter_by(user_id=user_id, is_read=False).update({
-        'is_read': True,
-        'read_at': utc_now()
-    })
+    # One watermark write, however many notifications were unread
+    record_all_notifications_read(user_id, through_id)
+    invalidate_on_commit(user_namespace(user_id))
     db.session.commit()
     
     return success_response({'message': 'All notifications marked as read'})
@@ -100,67 +152,167 @@ def mark_all_notifications_read():
 @notifications_bp.route('/api/notifications/unread-count', methods=['GET'])
 @jwt_required()
 @safe_db_operation("get unread notification count")
-def get_unread_count():
+def get_unread_count_endpoint():
     user_id = get_jwt_identity()
-    count = Notification.query.filter_by(user_id=user_id, is_read=False).count()
-    return success_response({'unread_count': count})
+    # Reads only the user's stats row; polls with a matching ETag get a 304
+    count = get_unread_count(user_id)
+    etag = make_etag(user_id, count)
+    if etag_matches(etag):
+        return not_modified_response(etag)
+    return success_response({'unread_count': count}, etag=etag)
+
+# Helper functions to be called from other modules.
+# They only record intents in the caller's transaction; the outbox dispatcher
+# resolves names and inserts the notifications in batches.
+def enqueue_notification(kind, user_id, project_id=None, task_id=None, actor_id=None, **payload):
+    """Record a notification intent in the current transaction"""
+    db.session.add(NotificationOutbox(
+        kind=kind,
+        user_id=user_id,
+        actor_id=actor_id,
+        project_id=project_id,
+        task_id=task_id,
+        payload=json.dumps(payload) if payload else None
+    ))
 
-# Helper functions to be called from other modules
 def notify_task_assignment(task, assignee_id):
     """Send notification when a task is assigned"""
     if not assignee_id:
         return
-    
-    assignee = User.query.get(assignee_id)
-    project = Project.query.get(task.project_id)
-    
-    if assignee and project:
-        create_notification(
-            user_id=assignee_id,
-            type='task_assigned',
-            title='New Task Assigned',
-            message=f'You have been assigned to task "{task.title}" in project "{project.name}"',
-            project_id=project.id,
-            task_id=task.id
-        )
+    if task.id is None:
+        db.session.flush()
+    enqueue_notification('task_assigned', assignee_id, task.project_id, task.id, title=task.title)
 
 def notify_task_due_soon(task):
     """Send notification when task is due soon"""
     if task.assignee_id and task.due_date:
         days_until_due = (task.due_date - utc_now()).days
         if days_until_due <= 1:
-            project = Project.query.get(task.project_id)
-            create_notification(
-                user_id=task.assignee_id,
-                type='task_due_soon',
-                title='Task Due Soon',
-                message=f'Task "{task.title}" in project "{project.name}" is due soon',
-                project_id=project.id,
-                task_id=task.id
-            )
+            enqueue_notification('task_due_soon', task.assignee_id, task.project_id, task.id, title=task.title)
 
-def notify_project_member_added(project_id, user_id, added_by_name):
+def notify_project_member_added(project_id, user_id, added_by_id):
     """Send notification when added to a project"""
-    project = Project.query.get(project_id)
-    if project:
-        create_notification(
-            user_id=user_id,
-            type='project_member_added',
-            title='Added to Project',
-            message=f'{added_by_name} added you to project "{project.name}"',
-            project_id=project_id
-        )
+    enqueue_notification('project_member_added', user_id, project_id, actor_id=added_by_id)
 
 def notify_task_status_change(task, old_status, changed_by_id):
     """Send notification when task status changes"""
     if task.assignee_id and task.assignee_id != changed_by_id:
-        project = Project.query.get(task.project_id)
-        changer = User.query.get(changed_by_id)
-        create_notification(
-            user_id=task.assignee_id,
-            type='task_status_changed',
-            title='Task Status Updated',
-            message=f'{changer.name} changed status of "{task.title}" from {old_status} to {task.status}',
-            project_id=project.id,
-            task_id=task.id
+        enqueue_notification(
+            'task_status_changed', task.assignee_id, task.project_id, task.id, actor_id=changed_by_id,
+            title=task.title, old_status=old_status, new_status=task.status
         )
+
+def notify_bulk_task_changes(assignments, status_changes, changed_by_id):
+    """Record one intent per (assignee, project) for a batch of task writes
+
+    assignments and status_changes map (assignee_id, project_id) to the
+    affected task rows; single-task groups keep their per-task wording.
+    """
+    for (assignee_id, project_id), tasks in assignments.items():
+        if len(tasks) == 1:
+            enqueue_notification('task_assigned', assignee_id, project_id, tasks[0]['id'], title=tasks[0]['title'])
+        else:
+            enqueue_notification('tasks_assigned', assignee_id, project_id, count=len(tasks))
+
+    for (assignee_id, project_id), changes in status_changes.items():
+        if assignee_id == changed_by_id:
+            continue
+        if len(changes) == 1:
+            change = changes[0]
+            enqueue_notification(
+                'task_status_changed', assignee_id, project_id, change['id'], actor_id=changed_by_id,
+                title=change['title'], old_status=change['old_status'], new_status=change['new_status']
+            )
+        else:
+            enqueue_notification('tasks_status_changed', assignee_id, project_id, actor_id=changed_by_id, count=len(changes))
+
+def _build_notification(intent, payload, users, projects, tasks):
+    """Turn an outbox intent into a notification row, or None if its targets are gone"""
+    project_name = projects.get(intent.project_id)
+    if intent.project_id and project_name is None:
+        return None
+    if intent.task_id and intent.task_id not in tasks:
+        return None
+    task_title = tasks.get(intent.task_id) or payload.get('title')
+    actor_name = users.get(intent.actor_id, 'Someone')
+
+    if intent.kind == 'task_assigned':
+        title = 'New Task Assigned'
+        message = f'You have been assigned to task "{task_title}" in project "{project_name}"'
+    elif intent.kind == 'task_due_soon':
+        title = 'Task Due Soon'
+        message = f'Task "{task_title}" in project "{project_name}" is due soon'
+    elif intent.kind == 'project_member_added':
+        title = 'Added to Project'
+        message = f'{actor_name} added you to project "{project_name}"'
+    elif intent.kind == 'task_status_changed':
+        title = 'Task Status Updated'
+        message = f'{actor_name} changed status of "{task_title}" from {payload.get("old_status")} to {payload.get("new_status")}'
+    elif intent.kind == 'tasks_assigned':
+        title = 'New Tasks Assigned'
+        message = f'You have been assigned {payload.get("count")} tasks in project "{project_name}"'
+    elif intent.kind == 'tasks_status_changed':
+        title = 'Task Statuses Updated'
+        message = f'{actor_name} changed the status of {payload.get("count")} of your tasks in project "{project_name}"'
+    else:
+        logger.warning(f"Dropping notification intent with unknown kind {intent.kind}")
+        return None
+
+    return {
+        'user_id': intent.user_id,
+        'type': intent.kind,
+        'title': title,
+        'message': message,
+        'related_project_id': intent.project_id,
+        'related_task_id': intent.task_id
+    }
+
+@track_performance("dispatch notification outbox")
+def dispatch_notification_outbox(batch_size=None):
+    """Drain one batch of the outbox into notifications; returns intents processed"""
+    batch_size = batch_size or current_app.config.get('OUTBOX_BATCH_SIZE', 500)
+
+    intents_query = NotificationOutbox.query.order_by(NotificationOutbox.id).limit(batch_size)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        # Concurrent dispatchers in other workers claim disjoint batches
+        intents_query = intents_query.with_for_update(skip_locked=True)
+    intents = intents_query.all()
+    if not intents:
+        return 0
+
+    # Resolve every referenced name with one query per table
+    user_ids = {i.user_id for i in intents} | {i.actor_id for i in intents if i.actor_id}
+    project_ids = {i.project_id for i in intents if i.project_id}
+    task_ids = {i.task_id for i in intents if i.task_id}
+    users = dict(db.session.query(User.id, User.name).filter(User.id.in_(user_ids)).all())
+    projects = dict(db.session.query(Project.id, Project.name).filter(Project.id.in_(project_ids)).all()) if project_ids else {}
+    tasks = dict(db.session.query(Task.id, Task.title).filter(Task.id.in_(task_ids)).all()) if task_ids else {}
+
+    rows = []
+    for intent in intents:
+        if intent.user_id not in users:
+            continue
+        row = _build_notification(intent, json.loads(intent.payload or '{}'), users, projects, tasks)
+        if row:
+            rows.append(row)
+
+    created = insert_notifications(rows)
+    NotificationOutbox.query.filter(
+        NotificationOutbox.id.in_([i.id for i in intents])
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+    publish_notifications(created)
+    return len(intents)
+
+def outbox_backlog():
+    """Pending intent count and age of the oldest one"""
+    pending, oldest = db.session.query(
+        func.count(NotificationOutbox.id), func.min(NotificationOutbox.created_at)
+    ).one()
+    if oldest is not None and oldest.tzinfo is None:
+        oldest = oldest.replace(tzinfo=timezone.utc)
+    return {
+        'pending': pending,
+        'oldest_age_seconds': round((utc_now() - oldest).total_seconds(), 3) if oldest else 0
+    }
@@ -1,4 +1,31 @@
-from flask import request
+import base64
+import json
+import math
+from datetime import datetime
+from flask import request, current_app
+from flask_jwt_extended import get_jwt_identity
+from .models import db
+from .shared.lru_cache import TTLCache
+
+COUNT_MODES = ('none', 'estimate', 'exact')
+
+class Page:
+    """Page of results whose total may be unknown or estimated"""
+    
+    def __init__(self, items, page, per_page, has_next, total=None, count_mode='none'):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.has_next = has_next
+        self.has_prev = page > 1
+        self.total = total
+        self.count_mode = count_mode
+    
+    @property
+    def pages(self):
+        if self.total is None:
+            return None
+        return max(1, math.ceil(self.total / self.per_page)) if self.per_page else 0
 
 def get_pagination_params(default_per_page=20, max_per_page=100):
     """Extract and validate pagination parameters from request"""
@@ -6,6 +33,82 @@ def get_pagination_params(default_per_page=20, max_per_page=100):
     per_page = min(request.args.get('per_page', default_per_page, type=int), max_per_page)
     return page, per_page
 
+def get_count_mode(default='exact'):
+    """Read ?count=none|estimate|exact, falling back to the endpoint default"""
+    mode = request.args.get('count', default)
+    return mode if mode in COUNT_MODES else default
+
+def _count_cache():
+    """Per-app cache of exact counts used as estimates where planner stats are unavailable"""
+    cache = current_app.extensions.get('pagination_count_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('pagination_count_cache', TTLCache(
+            maxsize=current_app.config.get('PAGINATION_COUNT_CACHE_SIZE', 2048),
+            ttl=current_app.config.get('PAGINATION_COUNT_CACHE_TTL', 30)
+        ))
+    return cache
+
+# Query-string arguments that select a page or its shape, not the rows counted
+PAGE_ARGS = ('page', 'per_page', 'count', 'fields', 'after')
+
+def request_count_key():
+    """Cache key for the current list request: endpoint, path args, user and filters
+
+    Building it from the request costs nothing next to compiling the
+    statement, which cost more than the COUNT it was meant to save.
+    """
+    try:
+        user_id = get_jwt_identity()
+    except RuntimeError:
+        user_id = None
+    filters = sorted((name, value) for name, value in request.args.items(multi=True) if name not in PAGE_ARGS)
+    return (request.endpoint, tuple(sorted((request.view_args or {}).items())), user_id, tuple(filters))
+
+def estimate_count(query, key=None):
+    """Estimate row count from planner statistics (Postgres) or a count cached under key
+
+    key defaults to the current request's request_count_key().
+    """
+    count_query = query.order_by(None)
+    bind = db.session.get_bind()
+    
+    if bind.dialect.name == 'postgresql':
+        try:
+            compiled = count_query.statement.compile(
+                dialect=bind.dialect,
+                compile_kwargs={'literal_binds': True, 'render_postcompile': True}
+            )
+            plan = db.session.connection().exec_driver_sql(f'EXPLAIN (FORMAT JSON) {compiled}').scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+        except Exception:
+            # Statements that cannot be rendered with literal binds use the cached count
+            pass
+    
+    key = key or request_count_key()
+    cache = _count_cache()
+    total = cache.get(key)
+    if total is None:
+        generation = cache.generation
+        total = count_query.count()
+        cache.set(key, total, generation=generation)
+    return total
+
+def paginate(query, page, per_page, count_mode='exact'):
+    """Paginate a query, running COUNT(*) only in exact mode"""
+    if count_mode == 'exact':
+        return query.paginate(page=page, per_page=per_page, error_out=False)
+    
+    page = max(page, 1)
+    per_page = max(per_page, 1)
+    
+    # Fetch one extra row to learn whether a next page exists
+    items = query.limit(per_page + 1).offset((page - 1) * per_page).all()
+    has_next = len(items) > per_page
+    total = estimate_count(query) if count_mode == 'estimate' else None
+    return Page(items[:per_page], page, per_page, has_next, total, count_mode)
+
 def format_pagination_response(paginated_query, items_key='items'):
     """Format paginated query results with metadata"""
     return {
@@ -16,6 +119,23 @@ def format_pagination_response(paginated_query, items_key='items'):
             'total': paginated_query.total,
             'pages': paginated_query.pages,
             'has_next': paginated_query.has_next,
-            'has_prev': paginated_query.has_prev
+            'has_prev': paginated_query.has_prev,
+            'count': getattr(paginated_query, 'count_mode', 'exact')
         }
-    }
\ No newline at end of file
+    }
+
+def encode_cursor(*values):
+    """Encode keyset values as an opaque URL-safe cursor"""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, size):
+    """Decode a cursor into its keyset values, raising ValueError when malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+    return values
\ No newline at end of file
@@ -1,10 +1,10 @@
 from .models import Project, ProjectMember
-from .query_utils import check_project_access_optimized
+from .membership import has_project_access, get_project_role
 from .shared.response_helpers import access_denied_response
 
 def check_project_access(project_id, user_id):
     """Check if user has access to project"""
-    return check_project_access_optimized(project_id, user_id)
+    return has_project_access(project_id, user_id)
 
 def require_project_access(project_id, user_id):
     """Return error response if user doesn't have project access"""
@@ -14,5 +14,4 @@ def require_project_access(project_id, user_id):
 
 def check_project_ownership(project_id, user_id):
     """Check if user owns the project"""
-    project = Project.query.get(project_id)
-    return project and project.owner_id == user_id
\ No newline at end of file
+    return get_project_role(project_id, user_id) == 'owner'
\ No newline at end of file
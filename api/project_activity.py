@@ -0,0 +1,154 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from sqlalchemy import func, select, and_
+from .models import db, Project, ProjectDailyActivity, ProjectSummary, Task, Message
+from .utils import utc_now
+from .shared.db_operations import upsert_counters
+
+ACTIVITY_COLUMNS = ('tasks_created', 'tasks_completed', 'messages_posted')
+SNAPSHOT_COLUMNS = ('todo_count', 'in_progress_count', 'done_count')
+MAX_DAYS = 365
+
+def _summary_value(project_id, name):
+    """Current summary counter, read in the same statement as the rollup upsert"""
+    return func.coalesce(
+        select(getattr(ProjectSummary, name)).where(ProjectSummary.project_id == project_id).scalar_subquery(), 0
+    )
+
+def record_daily_activity(project_id, increments=None):
+    """Add today's activity increments and refresh today's status snapshot
+
+    Call after the project summary has been updated in the same transaction.
+    """
+    upsert_counters(
+        ProjectDailyActivity,
+        {'project_id': project_id, 'day': utc_now().date()},
+        increments={name: delta for name, delta in (increments or {}).items() if delta},
+        values={name: _summary_value(project_id, name) for name in SNAPSHOT_COLUMNS}
+    )
+
+def activity_window(days):
+    """First and last day of a window ending today, at most MAX_DAYS back"""
+    end = utc_now().date()
+    return end - timedelta(days=min(max(days, 0), MAX_DAYS)), end
+
+def read_daily_activity(project_ids, start, end):
+    """Per-day activity summed over projects, one entry per day from start to end
+
+    Reads the window's rollup rows plus each project's latest earlier row,
+    which seeds the status snapshot carried forward over quiet days.
+    """
+    if not project_ids:
+        return []
+
+    latest = select(
+        ProjectDailyActivity.project_id, func.max(ProjectDailyActivity.day).label('day')
+    ).where(
+        ProjectDailyActivity.project_id.in_(project_ids), ProjectDailyActivity.day < start
+    ).group_by(ProjectDailyActivity.project_id).subquery()
+    baseline = db.session.execute(select(ProjectDailyActivity).join(latest, and_(
+        ProjectDailyActivity.project_id == latest.c.project_id, ProjectDailyActivity.day == latest.c.day
+    ))).scalars().all()
+    rows = db.session.execute(select(ProjectDailyActivity).where(
+        ProjectDailyActivity.project_id.in_(project_ids),
+        ProjectDailyActivity.day >= start,
+        ProjectDailyActivity.day <= end
+    )).scalars().all()
+
+    # Running totals: a project's new snapshot replaces its previous one
+    snapshots = {row.project_id: [getattr(row, name) for name in SNAPSHOT_COLUMNS] for row in baseline}
+    totals = [sum(values) for values in zip(*snapshots.values())] or [0] * len(SNAPSHOT_COLUMNS)
+    by_day = defaultdict(list)
+    for row in rows:
+        by_day[row.day].append(row)
+
+    series = []
+    day = start
+    while day <= end:
+        activity = dict.fromkeys(ACTIVITY_COLUMNS, 0)
+        for row in by_day.get(day, ()):
+            for name in ACTIVITY_COLUMNS:
+                activity[name] += getattr(row, name)
+            snapshot = [getattr(row, name) for name in SNAPSHOT_COLUMNS]
+            previous = snapshots.get(row.project_id, [0] * len(SNAPSHOT_COLUMNS))
+            totals = [total + new - old for total, new, old in zip(totals, snapshot, previous)]
+            snapshots[row.project_id] = snapshot
+        series.append({'date': day, **activity, **dict(zip(SNAPSHOT_COLUMNS, totals))})
+        day += timedelta(days=1)
+    return series
+
+def _as_date(value):
+    """func.date() yields dates on PostgreSQL and ISO strings on SQLite"""
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+def _sum_before(counts_by_day, start):
+    return sum(count for day, count in counts_by_day.items() if day < start)
+
+def backfill_daily_activity(project_ids=None, days=MAX_DAYS):
+    """Rebuild the last `days` of rollups from source tables; returns rows written
+
+    Status history isn't stored, so past snapshots are approximated: a task
+    counts as done from its last update and as in progress from creation.
+    """
+    if project_ids is None:
+        project_ids = [pid for (pid,) in db.session.query(Project.id)]
+    if not project_ids:
+        return 0
+    start, end = activity_window(days)
+
+    created = defaultdict(lambda: defaultdict(int))
+    in_progress = defaultdict(lambda: defaultdict(int))
+    completed = defaultdict(lambda: defaultdict(int))
+    messages = defaultdict(lambda: defaultdict(int))
+    created_day = func.date(Task.created_at)
+    for project_id, day, status, count in db.session.query(
+        Task.project_id, created_day, Task.status, func.count(Task.id)
+    ).filter(Task.project_id.in_(project_ids)).group_by(Task.project_id, created_day, Task.status):
+        created[project_id][_as_date(day)] += count
+        if status == 'in_progress':
+            in_progress[project_id][_as_date(day)] += count
+    updated_day = func.date(Task.updated_at)
+    for project_id, day, count in db.session.query(
+        Task.project_id, updated_day, func.count(Task.id)
+    ).filter(Task.project_id.in_(project_ids), Task.status == 'done').group_by(Task.project_id, updated_day):
+        completed[project_id][_as_date(day)] += count
+    message_day = func.date(Message.created_at)
+    for project_id, day, count in db.session.query(
+        Message.project_id, message_day, func.count(Message.id)
+    ).filter(Message.project_id.in_(project_ids), Message.created_at >= start).group_by(Message.project_id, message_day):
+        messages[project_id][_as_date(day)] += count
+
+    rows = []
+    for project_id in project_ids:
+        total = _sum_before(created[project_id], start)
+        done = _sum_before(completed[project_id], start)
+        active = _sum_before(in_progress[project_id], start)
+        day = start
+        while day <= end:
+            day_created = created[project_id].get(day, 0)
+            day_completed = completed[project_id].get(day, 0)
+            day_messages = messages[project_id].get(day, 0)
+            total += day_created
+            done += day_completed
+            active += in_progress[project_id].get(day, 0)
+            # Quiet days need no row; the window's first day seeds the carried snapshot
+            if day == start or day_created or day_completed or day_messages:
+                rows.append({
+                    'project_id': project_id,
+                    'day': day,
+                    'tasks_created': day_created,
+                    'tasks_completed': day_completed,
+                    'messages_posted': day_messages,
+                    'todo_count': total - done - active,
+                    'in_progress_count': active,
+                    'done_count': done
+                })
+            day += timedelta(days=1)
+
+    ProjectDailyActivity.query.filter(
+        ProjectDailyActivity.project_id.in_(project_ids), ProjectDailyActivity.day >= start
+    ).delete(synchronize_session=False)
+    if rows:
+        db.session.execute(ProjectDailyActivity.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
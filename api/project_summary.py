@@ -0,0 +1,143 @@
+from sqlalchemy import select, func
+from .models import db, Project, ProjectMember, ProjectSummary, Task, Message
+from .utils import utc_now
+from .project_activity import record_daily_activity
+from .shared.db_operations import upsert_counters
+from .shared.cache import invalidate_on_commit, project_namespace
+
+STATUS_COLUMNS = {
+    'todo': 'todo_count',
+    'in_progress': 'in_progress_count',
+    'done': 'done_count'
+}
+
+COUNTER_COLUMNS = list(STATUS_COLUMNS.values()) + ['member_count']
+
+def _touch(project_id, increments=None, activity=None):
+    """Apply counter increments, bump last activity and expire cached project views on commit
+
+    activity holds today's rollup increments; the rollup's status snapshot is
+    refreshed from the updated summary on every touch.
+    """
+    upsert_counters(
+        ProjectSummary,
+        {'project_id': project_id},
+        increments=increments,
+        values={'last_activity_at': utc_now()}
+    )
+    record_daily_activity(project_id, activity)
+    invalidate_on_commit(project_namespace(project_id))
+
+def record_task_change(project_id, old_status=None, new_status=None):
+    """Update status counters for a task created, moved or deleted"""
+    deltas = {}
+    if old_status != new_status:
+        deltas[old_status] = -1
+        deltas[new_status] = 1
+    record_status_deltas(
+        project_id, deltas,
+        created=int(old_status is None and new_status is not None),
+        completed=int(new_status == 'done' and old_status != 'done')
+    )
+
+def record_status_deltas(project_id, deltas, created=0, completed=0):
+    """Apply aggregated {status: delta} changes for a batch of tasks in one upsert
+
+    created and completed count the batch's new tasks and moves into done.
+    """
+    increments = {
+        STATUS_COLUMNS[status]: delta
+        for status, delta in deltas.items()
+        if status in STATUS_COLUMNS and delta
+    }
+    _touch(project_id, increments, {'tasks_created': created, 'tasks_completed': completed})
+
+def record_member_added(project_id):
+    """Increment member counter for a new project member"""
+    _touch(project_id, {'member_count': 1})
+
+def record_project_updated(project_id):
+    """Bump activity when project details change so cached views revalidate"""
+    _touch(project_id)
+
+def record_message_posted(project_id):
+    """Bump last activity for a new project message"""
+    _touch(project_id, activity={'messages_posted': 1})
+
+def last_activity_select(project_ids):
+    """Scalar subquery: newest last_activity_at among the projects' summary rows
+
+    Every task, message, member and project write bumps it (see _touch), so it
+    versions anything listed per project without counting rows.
+    """
+    return select(func.max(ProjectSummary.last_activity_at)).where(
+        ProjectSummary.project_id.in_(project_ids)
+    ).scalar_subquery()
+
+def project_version(project_id):
+    """Version token for a project's task and message lists"""
+    return (db.session.execute(select(last_activity_select([project_id]))).scalar(),)
+
+def summary_payload(summary):
+    """Format summary counters for project cards"""
+    if not summary:
+        return {
+            'task_stats': dict.fromkeys(STATUS_COLUMNS, 0),
+            'member_count': 1,  # owner only
+            'last_activity_at': None
+        }
+    return {
+        'task_stats': {status: getattr(summary, column) for status, column in STATUS_COLUMNS.items()},
+        'member_count': summary.member_count + 1,  # +1 for owner
+        'last_activity_at': summary.last_activity_at.isoformat() if summary.last_activity_at else None
+    }
+
+def compute_actual_counters(project_ids=None):
+    """Recompute counters from source tables, keyed by project id"""
+    project_query = db.session.query(Project.id)
+    task_query = db.session.query(Task.project_id, Task.status, func.count(Task.id))
+    member_query = db.session.query(ProjectMember.project_id, func.count(ProjectMember.id))
+    if project_ids is not None:
+        project_query = project_query.filter(Project.id.in_(project_ids))
+        task_query = task_query.filter(Task.project_id.in_(project_ids))
+        member_query = member_query.filter(ProjectMember.project_id.in_(project_ids))
+
+    actual = {pid: dict.fromkeys(COUNTER_COLUMNS, 0) for (pid,) in project_query}
+    for project_id, status, count in task_query.group_by(Task.project_id, Task.status):
+        if project_id in actual and status in STATUS_COLUMNS:
+            actual[project_id][STATUS_COLUMNS[status]] = count
+    for project_id, count in member_query.group_by(ProjectMember.project_id):
+        if project_id in actual:
+            actual[project_id]['member_count'] = count
+    return actual
+
+def rebuild_project_summaries(project_ids=None, repair=True):
+    """Compare stored counters with source tables and optionally repair drift"""
+    actual = compute_actual_counters(project_ids)
+    stored = {
+        s.project_id: s for s in ProjectSummary.query.filter(
+            ProjectSummary.project_id.in_(list(actual))
+        )
+    } if actual else {}
+
+    drifted = []
+    for project_id, counters in actual.items():
+        summary = stored.get(project_id)
+        if summary and all(getattr(summary, c) == v for c, v in counters.items()):
+            continue
+        drifted.append(project_id)
+        if not repair:
+            continue
+        if not summary:
+            summary = ProjectSummary(project_id=project_id)
+            db.session.add(summary)
+        for column, value in counters.items():
+            setattr(summary, column, value)
+        if not summary.last_activity_at:
+            last_message = db.session.query(func.max(Message.created_at)).filter_by(project_id=project_id).scalar()
+            last_task = db.session.query(func.max(Task.updated_at)).filter_by(project_id=project_id).scalar()
+            summary.last_activity_at = max([d for d in (last_message, last_task) if d], default=None)
+
+    if repair:
+        db.session.commit()
+    return drifted
@@ -1,23 +1,33 @@
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 import logging
 from datetime import datetime
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from .models import db, Project, User, ProjectMember, Task, Message, Notification
+from .models import db, Project, User, ProjectMember, ProjectSummary, Task, Message
 from .validation import validate_json
 from .query_utils import get_user_projects_query
 from .pagination import get_pagination_params, format_pagination_response
 from .serializers import serialize_project
+from .fieldsets import get_requested_fields
+from .shared.background import wake_worker
+from .shared.cache import project_namespace, invalidate_on_commit
 from .shared.db_operations import safe_db_operation
 from .shared.response_helpers import success_response, error_response, not_found_response, access_denied_response, created_response
 from .notifications import notify_project_member_added
+from .membership import has_project_access, invalidate_user, invalidate_project
+from .project_summary import record_member_added, record_project_updated, summary_payload
+from .purge import soft_delete_project, serialize_purge_job
 
 logger = logging.getLogger(__name__)
 
 
 projects_bp = Blueprint('projects', __name__)
 
+# Default ?fields= of the project list, matching its original payload
+PROJECT_LIST_FIELDS = ('id', 'name', 'description', 'created_at', 'task_stats', 'member_count', 'last_activity_at')
+PROJECT_COLUMNS = ('id', 'name', 'description', 'created_at')
+
 @projects_bp.route('/api/test', methods=['GET'])
 def test_endpoint():
     return jsonify({'message': 'Backend is working', 'timestamp': datetime.now().isoformat()})
@@ -27,15 +37,27 @@ def get_projects():
     try:
         # For now, use user_id = 1 for testing
         user_id = 1
-        projects = Project.query.filter_by(owner_id=user_id).all()
-        return jsonify({
-            'projects': [{
-                'id': p.id,
-                'name': p.name,
-                'description': p.description,
-                'created_at': p.created_at.isoformat()
-            } for p in projects]
-        })
+        fields, error = get_requested_fields(PROJECT_LIST_FIELDS, default=PROJECT_LIST_FIELDS)
+        if error:
+            return error
+        
+        # Column-level select; the summary join is skipped unless a counter is requested
+        columns = [getattr(Project, name) for name in PROJECT_COLUMNS if name in fields or name == 'id']
+        summary_fields = fields.difference(PROJECT_COLUMNS)
+        query = db.session.query(*columns)
+        if summary_fields:
+            query = query.add_entity(ProjectSummary).outerjoin(
+                ProjectSummary, ProjectSummary.project_id == Project.id
+            )
+        
+        projects = []
+        for row in query.filter(Project.owner_id == user_id):
+            project = {name: getattr(row, name) for name in PROJECT_COLUMNS if name in fields}
+            if summary_fields:
+                payload = summary_payload(row.ProjectSummary)
+                project.update({name: payload[name] for name in summary_fields})
+            projects.append(project)
+        return jsonify({'projects': projects})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -57,6 +79,7 @@ def create_project():
         
         db.session.add(project)
         db.session.commit()
+        invalidate_user(user_id)
         
         return jsonify({
             'id': project.id,
@@ -105,6 +128,7 @@ def update_project(project_id):
     if 'description' in data:
         project.description = data['description'].strip()
     
+    record_project_updated(project_id)
     db.session.commit()
     
     return success_response({
@@ -128,16 +152,14 @@ def delete_project(project_id):
     if project.owner_id != user_id:
         return access_denied_response()
     
-    # Delete all related data
-    ProjectMember.query.filter_by(project_id=project_id).delete()
-    Task.query.filter_by(project_id=project_id).delete()
-    Message.query.filter_by(project_id=project_id).delete()
-    Notification.query.filter_by(related_project_id=project_id).delete()
-    
-    db.session.delete(project)
+    # Hidden immediately; children are removed in batches by the purge worker
+    job = soft_delete_project(project, user_id)
+    invalidate_on_commit(project_namespace(project_id))
     db.session.commit()
+    invalidate_project(project_id)
+    wake_worker(current_app, 'purge')
     
-    return success_response({'message': 'Project deleted successfully'})
+    return success_response({'message': 'Project deleted successfully', 'purge_job': serialize_purge_job(job)}, status=202)
 
 @projects_bp.route('/api/projects/<int:project_id>/members', methods=['GET'])
 @jwt_required()
@@ -150,10 +172,7 @@ def get_project_members(project_id):
         return not_found_response("Project")
     
     # Check if user has access to this project
-    is_owner = project.owner_id == user_id
-    is_member = ProjectMember.query.filter_by(project_id=project_id, user_id=user_id).first()
-    
-    if not (is_owner or is_member):
+    if not has_project_access(project_id, user_id):
         return access_denied_response()
     
     # Get all members
@@ -217,12 +236,11 @@ def add_member(project_id):
         )
         
         db.session.add(member)
+        record_member_added(project_id)
+        notify_project_member_added(project_id, user.id, user_id)
         db.session.commit()
-        
-        # Get the name of the user who added the member
-        adder = User.query.get(user_id)
-        if adder:
-            notify_project_member_added(project_id, user.id, adder.name)
+        invalidate_user(user.id)
+        wake_worker(current_app, 'notification_outbox')
         
         return jsonify({'message': 'Member added successfully'})
     except IntegrityError as e:
@@ -237,128 +255,3 @@ def add_member(project_id):
         db.session.rollback()
         logger.error(f"Unexpected error adding member to project {project_id}: {e}")
         return jsonify({'error': 'Failed to add member'}), 500
-
-
-
-# Tasks endpoints
-@projects_bp.route('/api/projects/<int:project_id>/tasks', methods=['GET'])
-def get_tasks(project_id):
-    try:
-        tasks = Task.query.filter_by(project_id=project_id).all()
-        return jsonify({
-            'tasks': [{
-                'id': t.id,
-                'title': t.title,
-                'description': t.description,
-                'status': t.status,
-                'priority': t.priority,
-                'assignee_id': t.assignee_id,
-                'due_date': t.due_date.isoformat() if t.due_date else None,
-                'created_at': t.created_at.isoformat()
-            } for t in tasks]
-        })
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@projects_bp.route('/api/projects/<int:project_id>/tasks', methods=['POST'])
-def create_task(project_id):
-    try:
-        data = request.get_json()
-        if not data or not data.get('title'):
-            return jsonify({'error': 'Task title is required'}), 400
-        
-        task = Task(
-            project_id=project_id,
-            title=data['title'].strip(),
-            description=data.get('description', '').strip(),
-            status=data.get('status', 'todo'),
-            priority=data.get('priority', 'medium'),
-            assignee_id=data.get('assignee_id')
-        )
-        
-        db.session.add(task)
-        db.session.commit()
-        
-        return jsonify({
-            'id': task.id,
-            'title': task.title,
-            'description': task.description,
-            'status': task.status,
-            'priority': task.priority,
-            'created_at': task.created_at.isoformat()
-        }), 201
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
-
-@projects_bp.route('/api/tasks/<int:task_id>', methods=['PATCH'])
-def update_task(task_id):
-    try:
-        task = Task.query.get(task_id)
-        if not task:
-            return jsonify({'error': 'Task not found'}), 404
-        
-        data = request.get_json()
-        if 'status' in data:
-            task.status = data['status']
-        if 'title' in data:
-            task.title = data['title']
-        if 'description' in data:
-            task.description = data['description']
-        
-        db.session.commit()
-        
-        return jsonify({
-            'id': task.id,
-            'title': task.title,
-            'status': task.status,
-            'updated_at': task.updated_at.isoformat()
-        })
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
-
-# Messages endpoints
-@projects_bp.route('/api/projects/<int:project_id>/messages', methods=['GET'])
-def get_messages(project_id):
-    try:
-        messages = Message.query.filter_by(project_id=project_id).order_by(Message.created_at).all()
-        return jsonify({
-            'messages': [{
-                'id': m.id,
-                'content': m.content,
-                'user_id': m.user_id,
-                'created_at': m.created_at.isoformat()
-            } for m in messages]
-        })
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@projects_bp.route('/api/projects/<int:project_id>/messages', methods=['POST'])
-def create_message(project_id):
-    try:
-        data = request.get_json()
-        if not data or not data.get('content'):
-            return jsonify({'error': 'Message content is required'}), 400
-        
-        # Use user_id = 1 for testing
-        user_id = 1
-        
-        message = Message(
-            project_id=project_id,
-            user_id=user_id,
-            content=data['content'].strip()
-        )
-        
-        db.session.add(message)
-        db.session.commit()
-        
-        return jsonify({
-            'id': message.id,
-            'content': message.content,
-            'user_id': message.user_id,
-            'created_at': message.created_at.isoformat()
-        }), 201
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
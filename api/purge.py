@@ -0,0 +1,206 @@
+# Soft deletion with a background purge. Deleting a project or task only
+# stamps deleted_at and queues a PurgeJob; every ORM SELECT hides stamped rows
+# (and the tasks, messages, memberships and notifications they own) while the
+# purge removes the children in small, separately committed batches.
+
+import logging
+from flask import Blueprint, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select, delete, event, and_, or_
+from sqlalchemy.orm import with_loader_criteria
+from .models import (
+    db, Project, ProjectMember, ProjectSummary, ProjectDailyActivity, Task, Message,
+    Notification, ImportJob, PurgeJob
+)
+from .utils import utc_now
+from .notification_reads import delete_read_marks
+from .user_stats import record_notifications_deleted
+from .shared.error_tracking import track_performance
+from .shared.response_helpers import success_response, not_found_response, access_denied_response
+
+logger = logging.getLogger(__name__)
+
+purge_bp = Blueprint('purge', __name__)
+
+# Core columns, so the hiding criteria below don't filter their own subquery
+_project = Project.__table__
+_task = Task.__table__
+_deleted_project_ids = select(_project.c.id).where(_project.c.deleted_at.isnot(None))
+_deleted_task_ids = select(_task.c.id).where(or_(
+    _task.c.deleted_at.isnot(None), _task.c.project_id.in_(_deleted_project_ids)
+))
+
+def visible_notification(notification=Notification):
+    """Condition hiding notifications about deleted projects and tasks
+
+    Applied to ORM SELECTs by _hide_deleted; statements the hook can't reach
+    (a count inside an upsert) add it themselves.
+    """
+    return and_(
+        or_(notification.related_project_id.is_(None), notification.related_project_id.notin_(_deleted_project_ids)),
+        or_(notification.related_task_id.is_(None), notification.related_task_id.notin_(_deleted_task_ids))
+    )
+
+def _hide_deleted(execute_state):
+    """Add the soft-delete criteria to ORM SELECTs unless include_deleted is set"""
+    if (
+        not execute_state.is_select
+        or execute_state.is_column_load
+        or execute_state.is_relationship_load
+        or execute_state.execution_options.get('include_deleted', False)
+    ):
+        return
+    # Only projects awaiting purge carry deleted_at, so the NOT IN lists stay short
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(Project, Project.deleted_at.is_(None), include_aliases=True),
+        with_loader_criteria(Task, and_(
+            Task.deleted_at.is_(None), Task.project_id.notin_(_deleted_project_ids)
+        ), include_aliases=True),
+        with_loader_criteria(Message, Message.project_id.notin_(_deleted_project_ids), include_aliases=True),
+        with_loader_criteria(ProjectMember, ProjectMember.project_id.notin_(_deleted_project_ids), include_aliases=True),
+        with_loader_criteria(Notification, visible_notification, include_aliases=True)
+    )
+
+def init_soft_delete(app):
+    """Hide soft-deleted rows from every ORM query of the app's session"""
+    if not event.contains(db.session, 'do_orm_execute', _hide_deleted):
+        event.listen(db.session, 'do_orm_execute', _hide_deleted)
+
+def _project_steps(project_id):
+    """(step, model, condition) in foreign-key order for purging a project"""
+    task_ids = select(_task.c.id).where(_task.c.project_id == project_id)
+    return [
+        ('notifications', Notification, or_(
+            Notification.related_project_id == project_id, Notification.related_task_id.in_(task_ids)
+        )),
+        ('messages', Message, Message.project_id == project_id),
+        ('tasks', Task, Task.project_id == project_id),
+        ('members', ProjectMember, ProjectMember.project_id == project_id),
+        ('imports', ImportJob, ImportJob.project_id == project_id),
+        ('activity', ProjectDailyActivity, ProjectDailyActivity.project_id == project_id),
+        ('summary', ProjectSummary, ProjectSummary.project_id == project_id),
+        ('project', Project, Project.id == project_id),
+    ]
+
+def _task_steps(task_id):
+    """(step, model, condition) for purging a task"""
+    return [
+        ('notifications', Notification, Notification.related_task_id == task_id),
+        ('task', Task, Task.id == task_id),
+    ]
+
+PURGE_STEPS = {'project': _project_steps, 'task': _task_steps}
+
+def _delete_batch(model, condition, batch_size):
+    """Delete up to batch_size matching rows, newest first; returns rows deleted
+
+    Newest first removes message replies before their parents. Tables keyed
+    without an id (summary, daily rollups) hold few rows per project and go
+    in one statement.
+    """
+    if not hasattr(model, 'id'):
+        return db.session.execute(delete(model).where(condition)).rowcount
+    ids = db.session.execute(
+        select(model.id).where(condition).order_by(model.id.desc()).limit(batch_size)
+        .execution_options(include_deleted=True)
+    ).scalars().all()
+    if not ids:
+        return 0
+    if model is Notification:
+        # Read marks reference notifications; the unread counters already
+        # dropped when the soft delete hid them
+        delete_read_marks(ids)
+    db.session.execute(delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False))
+    return len(ids)
+
+def soft_delete_project(project, user_id):
+    """Hide a project at once and queue its purge; the caller commits"""
+    # Counted before the stamp, while its notifications are still visible
+    record_notifications_deleted(_project_steps(project.id)[0][2])
+    project.deleted_at = utc_now()
+    return _queue_purge('project', project.id, user_id)
+
+def soft_delete_task(task, user_id):
+    """Hide a task at once and queue its notification cleanup; the caller commits"""
+    record_notifications_deleted(_task_steps(task.id)[0][2])
+    task.deleted_at = utc_now()
+    return _queue_purge('task', task.id, user_id)
+
+def _queue_purge(kind, target_id, user_id):
+    job = PurgeJob(kind=kind, target_id=target_id, user_id=user_id)
+    db.session.add(job)
+    return job
+
+@track_performance("purge batch")
+def purge_next_batch(batch_size=None):
+    """Purge one batch of the oldest unfinished job; returns rows deleted
+
+    Each batch commits with the job's step and progress, so a crashed run
+    resumes where it stopped. A job that just finished counts as 1 so the
+    worker moves straight on to the next one.
+    """
+    batch_size = batch_size or current_app.config.get('PURGE_BATCH_SIZE', 1000)
+    query = PurgeJob.query.filter(PurgeJob.status != 'completed').order_by(
+        PurgeJob.last_error.isnot(None), PurgeJob.id
+    ).limit(1)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        # Concurrent workers purge different jobs
+        query = query.with_for_update(skip_locked=True)
+    job = query.first()
+    if not job:
+        return 0
+
+    job_id = job.id
+    try:
+        steps = PURGE_STEPS[job.kind](job.target_id)
+        names = [name for name, _, _ in steps]
+        start = names.index(job.step) if job.step in names else 0
+        deleted = 0
+        for name, model, condition in steps[start:]:
+            job.step = name
+            deleted = _delete_batch(model, condition, batch_size)
+            if deleted:
+                break
+        job.rows_deleted += deleted
+        job.last_error = None
+        if deleted:
+            job.status = 'running'
+        else:
+            job.status = 'completed'
+            job.finished_at = utc_now()
+            logger.info(f"Purge job {job.id} removed {job.kind} {job.target_id}: {job.rows_deleted} rows")
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        # Failed jobs move behind the others and are retried on the next pass
+        PurgeJob.query.filter_by(id=job_id).update({'last_error': str(e)})
+        db.session.commit()
+        raise
+    return deleted or 1
+
+def serialize_purge_job(job):
+    """Serialize purge job object to dictionary"""
+    names = [name for name, _, _ in PURGE_STEPS[job.kind](job.target_id)]
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'target_id': job.target_id,
+        'status': job.status,
+        'step': job.step,
+        'steps': names,
+        'rows_deleted': job.rows_deleted,
+        'last_error': job.last_error,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at
+    }
+
+@purge_bp.route('/api/purge-jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_purge_job(job_id):
+    """Get the progress of a project or task purge"""
+    job = db.session.get(PurgeJob, job_id)
+    if not job:
+        return not_found_response("Purge job")
+    if job.user_id != get_jwt_identity():
+        return access_denied_response()
+    return success_response({'purge_job': serialize_purge_job(job)})
@@ -1,5 +1,6 @@
-from flask import render_template, jsonify
+from flask import render_template, jsonify, current_app, request
 from .models import db
+from .shared.access_control import bearer_token_matches
 
 def register_routes(app):
     """Register all application routes"""
@@ -50,17 +51,132 @@ def register_routes(app):
         except Exception as e:
             db_status = f'error: {str(e)}'
         
+        from .membership import membership_cache_stats
+        from .notifications import outbox_backlog
+        from .shared.background import worker_stats
+        from .shared.cache import get_response_cache
+        from .shared.db_pool import pool_stats
+        from .shared.logging_config import logging_stats
+        from .shared.password_hashing import get_password_hasher
+        
+        response_cache = get_response_cache()
+        
+        try:
+            notification_outbox = outbox_backlog()
+        except Exception as e:
+            notification_outbox = {'error': str(e)}
+        
         return jsonify({
             'status': 'ok',
             'api_version': '1.0.0',
             'database': db_status,
+            'database_pool': pool_stats(db.engine),
+            'caches': {
+                'membership': membership_cache_stats(),
+                'responses': response_cache.stats() if response_cache else None
+            },
+            'notification_outbox': notification_outbox,
+            'workers': worker_stats(current_app),
+            'password_hashing': get_password_hasher().stats(),
+            'logging': logging_stats(current_app),
             'message': 'SynergySphere API is running'
         })
     
+    @app.route('/api/metrics')
+    def metrics():
+        """Prometheus text exposition of this process, or every worker in multiprocess mode"""
+        from .shared.metrics import aggregate_snapshots, render_text
+        
+        token = current_app.config.get('METRICS_TOKEN')
+        if 'metrics' not in current_app.extensions or not token:
+            return jsonify({'error': 'Metrics are disabled'}), 404
+        if not bearer_token_matches(token):
+            return jsonify({'error': 'Invalid metrics token'}), 401
+        families = aggregate_snapshots(current_app.config.get('METRICS_MULTIPROC_DIR'))
+        return current_app.response_class(render_text(families), mimetype='text/plain; version=0.0.4')
+    
+    register_metric_collectors(app)
+    
+    @app.route('/api/jobs/run')
+    def run_background_jobs():
+        """Drain the outbox, purge and reconciliation jobs; called by the Vercel cron"""
+        from .shared.background import run_jobs
+        
+        token = current_app.config.get('CRON_SECRET')
+        if not token:
+            return jsonify({'error': 'Job endpoint is disabled'}), 404
+        if not bearer_token_matches(token):
+            return jsonify({'error': 'Invalid cron secret'}), 401
+        return jsonify({'jobs': run_jobs(current_app, current_app.config.get('JOBS_TIME_BUDGET', 20))})
+    
+    @app.route('/api/debug/sql-profile')
+    def sql_profile():
+        """Endpoints with the most queries per request (?sort=db_time for DB time)
+
+        Statement patterns reveal the schema, so the endpoint is operator-only:
+        it requires SQL_PROFILER_TOKEN and does not exist without one.
+        """
+        from .shared.sql_profiler import get_profile_stats
+        
+        stats = get_profile_stats(current_app)
+        token = current_app.config.get('SQL_PROFILER_TOKEN')
+        if stats is None or not token:
+            return jsonify({'error': 'SQL profiling is disabled'}), 404
+        if not bearer_token_matches(token):
+            return jsonify({'error': 'Invalid profiler token'}), 401
+        limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+        sort = request.args.get('sort', 'queries')
+        return jsonify({'sort': sort, 'endpoints': stats.worst(sort, limit)})
+    
     @app.errorhandler(404)
     def not_found(error):
         return render_template('404.html'), 404
     
     @app.errorhandler(500)
     def internal_error(error):
-        return jsonify({'error': 'Internal server error'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Internal server error'}), 500
+
+def register_metric_collectors(app):
+    """Gauges refreshed from pool, cache and outbox stats on every scrape"""
+    from .membership import membership_cache_stats
+    from .notifications import outbox_backlog
+    from .shared.cache import get_response_cache
+    from .shared.db_pool import pool_stats
+    from .shared.metrics import registry
+    
+    pool_gauges = {name: registry.gauge(f'db_pool_{name}', f'Connection pool {name.replace("_", " ")}') for name in (
+        'size', 'checked_out', 'overflow'
+    )}
+    pool_counters = {name: registry.counter(f'db_pool_{name}_total', f'Connection pool {name}') for name in (
+        'checkouts', 'connects', 'invalidations', 'timeouts', 'waits'
+    )}
+    cache_hits = registry.counter('cache_hits_total', 'Cache lookups answered from the cache', ('cache',))
+    cache_misses = registry.counter('cache_misses_total', 'Cache lookups that missed', ('cache',))
+    cache_size = registry.gauge('cache_entries', 'Entries held by the cache', ('cache',))
+    outbox_pending = registry.gauge('notification_outbox_pending', 'Notification intents awaiting dispatch')
+    
+    def collect_pool():
+        stats = pool_stats(db.engine)
+        for name, gauge in pool_gauges.items():
+            if name in stats:
+                gauge.set(stats[name])
+        for name, counter in pool_counters.items():
+            if stats[name] is not None:
+                counter.set(stats[name])
+    
+    def collect_caches():
+        caches = {'membership': membership_cache_stats()}
+        response_cache = get_response_cache()
+        if response_cache:
+            caches['responses'] = response_cache.stats()
+        for cache, stats in caches.items():
+            cache_hits.set(stats.get('hits', 0), cache=cache)
+            cache_misses.set(stats.get('misses', 0), cache=cache)
+            if 'size' in stats:
+                cache_size.set(stats['size'], cache=cache)
+    
+    def collect_outbox():
+        outbox_pending.set(outbox_backlog()['pending'])
+    
+    for collector in (collect_pool, collect_caches, collect_outbox):
+        registry.add_collector(collector)
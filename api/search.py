@@ -0,0 +1,314 @@
+import html
+import logging
+import re
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select, union_all, literal, literal_column, func, table, column, and_, or_, inspect, cast, Float
+from .models import db, Project, User, Task, Message
+from .membership import get_accessible_project_ids
+from .pagination import encode_cursor, decode_cursor
+from .shared.response_helpers import error_response, access_denied_response
+
+logger = logging.getLogger(__name__)
+
+search_bp = Blueprint('search', __name__)
+
+SEARCH_TYPES = ('task', 'message')
+MAX_QUERY_LENGTH = 200
+
+# Text search configuration; must match the one in the index expressions
+PG_CONFIG = literal_column("'english'::regconfig")
+
+# Control characters mark matches in snippets so user text can be escaped before adding <mark>
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_STOP = '\x03'
+PG_HEADLINE_OPTIONS = f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxWords=24, MinWords=8, MaxFragments=2'
+
+# FTS5 external-content tables over task and message, kept in sync by triggers
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5("
+    "title, description, content='task', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF title, description ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS message_fts USING fts5("
+    "content, content='message', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS message_fts_ai AFTER INSERT ON message BEGIN "
+    "INSERT INTO message_fts(rowid, content) VALUES (new.id, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS message_fts_ad AFTER DELETE ON message BEGIN "
+    "INSERT INTO message_fts(message_fts, rowid, content) VALUES ('delete', old.id, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS message_fts_au AFTER UPDATE OF content ON message BEGIN "
+    "INSERT INTO message_fts(message_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+    "INSERT INTO message_fts(rowid, content) VALUES (new.id, new.content); END",
+)
+
+# GIN indexes over the same expressions _task_vector/_message_vector build
+POSTGRES_SEARCH_DDL = (
+    "CREATE INDEX IF NOT EXISTS ix_task_search ON task USING gin (("
+    "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')))",
+    "CREATE INDEX IF NOT EXISTS ix_message_search ON message USING gin ("
+    "to_tsvector('english'::regconfig, content))",
+)
+
+task_fts = table('task_fts', column('rowid'))
+message_fts = table('message_fts', column('rowid'))
+
+def _dialect():
+    return db.session.get_bind().dialect.name
+
+def _task_vector():
+    """Weighted title (A) and description (B) vector, matching ix_task_search"""
+    return func.setweight(func.to_tsvector(PG_CONFIG, func.coalesce(Task.title, '')), 'A').op('||')(
+        func.setweight(func.to_tsvector(PG_CONFIG, func.coalesce(Task.description, '')), 'B')
+    )
+
+def _message_vector():
+    """Message content vector, matching ix_message_search"""
+    return func.to_tsvector(PG_CONFIG, Message.content)
+
+def _fts5_query(q):
+    """Turn free text into an FTS5 query: every word required, the last one as a prefix"""
+    words = re.findall(r'\w+', q)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+def _postgres_rank(vector, tsquery):
+    """ts_rank_cd as float8; compared as real, a rank from a JSON cursor never equals itself"""
+    return cast(func.ts_rank_cd(vector, tsquery), Float(53))
+
+def _postgres_matches(q, project_ids, types):
+    """Matching rows as (type, id, project_id, rank) ranked with ts_rank_cd"""
+    tsquery = func.websearch_to_tsquery(PG_CONFIG, q)
+    selects = []
+    if 'task' in types:
+        vector = _task_vector()
+        selects.append(select(
+            literal('task').label('type'), Task.id.label('id'), Task.project_id.label('project_id'),
+            _postgres_rank(vector, tsquery).label('rank')
+        ).where(vector.op('@@')(tsquery), Task.project_id.in_(project_ids)))
+    if 'message' in types:
+        vector = _message_vector()
+        selects.append(select(
+            literal('message').label('type'), Message.id.label('id'), Message.project_id.label('project_id'),
+            _postgres_rank(vector, tsquery).label('rank')
+        ).where(vector.op('@@')(tsquery), Message.project_id.in_(project_ids)))
+    return selects
+
+def _sqlite_matches(q, project_ids, types):
+    """Matching rows as (type, id, project_id, rank) ranked with bm25 (negated, higher is better)"""
+    match = _fts5_query(q)
+    if match is None:
+        return []
+    selects = []
+    if 'task' in types:
+        selects.append(select(
+            literal('task').label('type'), Task.id.label('id'), Task.project_id.label('project_id'),
+            (-func.bm25(literal_column('task_fts'), 10.0, 1.0)).label('rank')
+        ).select_from(task_fts).join(Task, Task.id == task_fts.c.rowid).where(
+            literal_column('task_fts').op('MATCH')(match), Task.project_id.in_(project_ids)
+        ))
+    if 'message' in types:
+        selects.append(select(
+            literal('message').label('type'), Message.id.label('id'), Message.project_id.label('project_id'),
+            (-func.bm25(literal_column('message_fts'))).label('rank')
+        ).select_from(message_fts).join(Message, Message.id == message_fts.c.rowid).where(
+            literal_column('message_fts').op('MATCH')(match), Message.project_id.in_(project_ids)
+        ))
+    return selects
+
+def _highlight(snippet):
+    """Escape user text, then turn match markers into <mark> tags"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>')
+
+def _postgres_snippets(q, task_ids, message_ids):
+    """Highlighted (title, snippet) per (type, id) for one page of results"""
+    tsquery = func.websearch_to_tsquery(PG_CONFIG, q)
+    snippets = {}
+    if task_ids:
+        rows = db.session.execute(select(
+            Task.id,
+            func.ts_headline(PG_CONFIG, Task.title, tsquery, f'{PG_HEADLINE_OPTIONS}, HighlightAll=true'),
+            func.ts_headline(PG_CONFIG, func.coalesce(Task.description, ''), tsquery, PG_HEADLINE_OPTIONS)
+        ).where(Task.id.in_(task_ids)))
+        snippets.update({('task', task_id): (title, snippet) for task_id, title, snippet in rows})
+    if message_ids:
+        rows = db.session.execute(select(
+            Message.id, func.ts_headline(PG_CONFIG, Message.content, tsquery, PG_HEADLINE_OPTIONS)
+        ).where(Message.id.in_(message_ids)))
+        snippets.update({('message', message_id): (None, snippet) for message_id, snippet in rows})
+    return snippets
+
+def _sqlite_snippets(q, task_ids, message_ids):
+    """Highlighted (title, snippet) per (type, id) for one page of results"""
+    match = _fts5_query(q)
+    snippets = {}
+    if task_ids:
+        rows = db.session.execute(select(
+            task_fts.c.rowid,
+            func.highlight(literal_column('task_fts'), 0, HIGHLIGHT_START, HIGHLIGHT_STOP),
+            func.snippet(literal_column('task_fts'), 1, HIGHLIGHT_START, HIGHLIGHT_STOP, '…', 24)
+        ).where(literal_column('task_fts').op('MATCH')(match), task_fts.c.rowid.in_(task_ids)))
+        snippets.update({('task', task_id): (title, snippet) for task_id, title, snippet in rows})
+    if message_ids:
+        rows = db.session.execute(select(
+            message_fts.c.rowid,
+            func.snippet(literal_column('message_fts'), 0, HIGHLIGHT_START, HIGHLIGHT_STOP, '…', 24)
+        ).where(literal_column('message_fts').op('MATCH')(match), message_fts.c.rowid.in_(message_ids)))
+        snippets.update({('message', message_id): (None, snippet) for message_id, snippet in rows})
+    return snippets
+
+def _result_details(task_ids, message_ids):
+    """Display columns per (type, id) for one page of results"""
+    details = {}
+    if task_ids:
+        rows = db.session.execute(
+            select(Task.id, Task.title, Task.status, Task.created_at, Project.name)
+            .join(Project, Project.id == Task.project_id).where(Task.id.in_(task_ids))
+        )
+        details.update({('task', row.id): {
+            'title': row.title, 'status': row.status, 'created_at': row.created_at, 'project_name': row.name
+        } for row in rows})
+    if message_ids:
+        rows = db.session.execute(
+            select(Message.id, Message.created_at, Project.name, User.name.label('author_name'))
+            .join(Project, Project.id == Message.project_id)
+            .outerjoin(User, User.id == Message.user_id).where(Message.id.in_(message_ids))
+        )
+        details.update({('message', row.id): {
+            'author_name': row.author_name, 'created_at': row.created_at,
+            'project_name': row.name
+        } for row in rows})
+    return details
+
+def search(q, project_ids, types=SEARCH_TYPES, after=None, limit=20):
+    """Ranked matches in the given projects; returns (results, next_cursor)"""
+    postgres = _dialect() == 'postgresql'
+    if not postgres:
+        ensure_search_index()
+    selects = (_postgres_matches if postgres else _sqlite_matches)(q, project_ids, types)
+    if not selects or not project_ids:
+        return [], None
+
+    matches = (union_all(*selects) if len(selects) > 1 else selects[0]).subquery()
+    query = select(matches).order_by(matches.c.rank.desc(), matches.c.type, matches.c.id.desc())
+    if after:
+        rank, type_, id_ = decode_cursor(after, 3)
+        # Keyset on (rank desc, type asc, id desc)
+        query = query.where(or_(
+            matches.c.rank < rank,
+            and_(matches.c.rank == rank, matches.c.type > type_),
+            and_(matches.c.rank == rank, matches.c.type == type_, matches.c.id < id_)
+        ))
+    rows = db.session.execute(query.limit(limit + 1)).all()
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    # Snippets and display columns only for the page, not every match
+    task_ids = [row.id for row in rows if row.type == 'task']
+    message_ids = [row.id for row in rows if row.type == 'message']
+    snippets = (_postgres_snippets if postgres else _sqlite_snippets)(q, task_ids, message_ids)
+    details = _result_details(task_ids, message_ids)
+
+    results = []
+    for row in rows:
+        key = (row.type, row.id)
+        detail = details.get(key)
+        if detail is None:
+            continue
+        title, snippet = snippets.get(key, (None, None))
+        result = {
+            'type': row.type,
+            'id': row.id,
+            'project_id': row.project_id,
+            'project_name': detail['project_name'],
+            'rank': row.rank,
+            'created_at': detail['created_at']
+        }
+        if row.type == 'task':
+            result['title'] = detail['title']
+            result['status'] = detail['status']
+            result['title_html'] = _highlight(title) if title else html.escape(detail['title'])
+        else:
+            result['author_name'] = detail['author_name']
+        result['snippet_html'] = _highlight(snippet)
+        results.append(result)
+
+    next_cursor = encode_cursor(rows[-1].rank, rows[-1].type, rows[-1].id) if has_next else None
+    return results, next_cursor
+
+def ensure_search_index():
+    """Create SQLite FTS5 tables and triggers on first use, populated from existing rows"""
+    if current_app.extensions.get('search_index_ready'):
+        return
+    connection = db.session.connection()
+    if not inspect(connection).has_table('task_fts'):
+        for statement in SQLITE_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql("INSERT INTO task_fts(task_fts) VALUES ('rebuild')")
+        connection.exec_driver_sql("INSERT INTO message_fts(message_fts) VALUES ('rebuild')")
+        db.session.commit()
+    current_app.extensions['search_index_ready'] = True
+
+def rebuild_search_index():
+    """Create missing search indexes and rebuild them from the source tables"""
+    connection = db.session.connection()
+    if connection.dialect.name == 'postgresql':
+        for statement in POSTGRES_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql('REINDEX INDEX ix_task_search')
+        connection.exec_driver_sql('REINDEX INDEX ix_message_search')
+    elif connection.dialect.name == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql("INSERT INTO task_fts(task_fts) VALUES ('rebuild')")
+        connection.exec_driver_sql("INSERT INTO message_fts(message_fts) VALUES ('rebuild')")
+    db.session.commit()
+
+@search_bp.route('/api/search', methods=['GET'])
+@jwt_required()
+def search_endpoint():
+    """Full-text search over tasks and messages in the user's projects"""
+    user_id = get_jwt_identity()
+    q = (request.args.get('q') or '').strip()
+    if not q:
+        return error_response("q is required")
+    if len(q) > MAX_QUERY_LENGTH:
+        return error_response(f"q must be at most {MAX_QUERY_LENGTH} characters")
+
+    type_ = request.args.get('type')
+    if type_ and type_ not in SEARCH_TYPES:
+        return error_response(f"type must be one of {', '.join(SEARCH_TYPES)}")
+    types = (type_,) if type_ else SEARCH_TYPES
+
+    project_ids = get_accessible_project_ids(user_id)
+    project_id = request.args.get('project_id', type=int)
+    if project_id is not None:
+        if project_id not in project_ids:
+            return access_denied_response()
+        project_ids = [project_id]
+
+    limit = max(1, min(request.args.get('per_page', 20, type=int), 50))
+    try:
+        results, next_cursor = search(q, project_ids, types, request.args.get('after'), limit)
+    except ValueError:
+        return error_response("Invalid cursor")
+
+    return jsonify({
+        'results': results,
+        'pagination': {
+            'per_page': limit,
+            'has_next': next_cursor is not None,
+            # Pass next_cursor as ?after= for the next page
+            'next_cursor': next_cursor
+        }
+    })
@@ -1,30 +1,82 @@
-def serialize_task(task):
+# Datetimes are returned as-is; the app's JSON provider encodes them as ISO 8601
+
+from operator import attrgetter
+from .fieldsets import serialize_fields
+
+def _related_name(relation, default=None):
+    """Getter for the name of a related object"""
+    def getter(obj):
+        related = getattr(obj, relation)
+        return related.name if related else default
+    return getter
+
+def _related_ref(relation, label):
+    """Getter for a compact {id, label} reference to a related object"""
+    def getter(obj):
+        related = getattr(obj, relation)
+        return {'id': related.id, label: getattr(related, label)} if related else None
+    return getter
+
+def _read_state(index):
+    """Getter for the derived (is_read, read_at) of a notification"""
+    def getter(notification):
+        return notification.read_state[index]
+    return getter
+
+def _column(name):
+    return (attrgetter(name), name, None)
+
+# field -> (getter, column, relationship) used by ?fields= on list endpoints
+TASK_FIELDS = {
+    'id': _column('id'),
+    'project_id': _column('project_id'),
+    'project_name': (_related_name('project'), 'project_id', 'project'),
+    'title': _column('title'),
+    'description': _column('description'),
+    'status': _column('status'),
+    'assignee_id': _column('assignee_id'),
+    'assignee_name': (_related_name('assignee'), 'assignee_id', 'assignee'),
+    'due_date': _column('due_date'),
+    'priority': _column('priority'),
+    'created_at': _column('created_at'),
+    'updated_at': _column('updated_at')
+}
+TASK_RELATIONS = {'project': ('id', 'name'), 'assignee': ('id', 'name')}
+
+MESSAGE_FIELDS = {
+    'id': _column('id'),
+    'content': _column('content'),
+    'user_id': _column('user_id'),
+    'user_name': (_related_name('user', 'Unknown'), 'user_id', 'user'),
+    'parent_id': _column('parent_id'),
+    'created_at': _column('created_at')
+}
+MESSAGE_RELATIONS = {'user': ('id', 'name')}
+
+NOTIFICATION_FIELDS = {
+    'id': _column('id'),
+    'type': _column('type'),
+    'title': _column('title'),
+    'message': _column('message'),
+    'is_read': (_read_state(0), 'id', None),
+    'created_at': _column('created_at'),
+    'read_at': (_read_state(1), 'id', None),
+    'project': (_related_ref('project', 'name'), 'related_project_id', 'project'),
+    'task': (_related_ref('task', 'title'), 'related_task_id', 'task')
+}
+NOTIFICATION_RELATIONS = {'project': ('id', 'name'), 'task': ('id', 'title')}
+
+def serialize_task(task, fields=None):
     """Serialize task object to dictionary"""
-    return {
-        'id': task.id,
-        'project_id': task.project_id,
-        'project_name': task.project.name if hasattr(task, 'project') and task.project else None,
-        'title': task.title,
-        'description': task.description,
-        'status': task.status,
-        'assignee_id': task.assignee_id,
-        'assignee_name': task.assignee.name if task.assignee else None,
-        'due_date': task.due_date.isoformat() if task.due_date else None,
-        'priority': task.priority,
-        'created_at': task.created_at.isoformat(),
-        'updated_at': task.updated_at.isoformat()
-    }
+    return serialize_fields(task, TASK_FIELDS, fields)
 
-def serialize_message(message):
+def serialize_message(message, fields=None):
     """Serialize message object to dictionary"""
-    return {
-        'id': message.id,
-        'content': message.content,
-        'user_id': message.user_id,
-        'user_name': message.user.name if message.user else 'Unknown',
-        'parent_id': message.parent_id,
-        'created_at': message.created_at.isoformat()
-    }
+    return serialize_fields(message, MESSAGE_FIELDS, fields)
+
+def serialize_notification(notification, fields=None):
+    """Serialize notification object to dictionary"""
+    return serialize_fields(notification, NOTIFICATION_FIELDS, fields)
 
 def serialize_project(project):
     """Serialize project object to dictionary"""
@@ -33,5 +85,5 @@ def serialize_project(project):
         'name': project.name,
         'description': project.description,
         'owner_name': project.owner.name if hasattr(project, 'owner') and project.owner else None,
-        'created_at': project.created_at.isoformat()
-    }
\ No newline at end of file
+        'created_at': project.created_at
+    }
@@ -1,4 +1,6 @@
+import hmac
 from functools import wraps
+from flask import request
 from flask_jwt_extended import get_jwt_identity
 from .response_helpers import access_denied_response
 from ..permissions import check_project_access
@@ -16,4 +18,8 @@ def require_project_member(project_id_param='project_id'):
             
             return func(*args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
+
+def bearer_token_matches(token):
+    """Whether the request carries token as its bearer token (operator endpoints)"""
+    return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_start_lock = threading.Lock()
+
+class PeriodicWorker(threading.Thread):
+    """Daemon thread running a job inside an app context every interval seconds"""
+
+    def __init__(self, app, name, job, interval):
+        super().__init__(name=f'worker-{name}', daemon=True)
+        self.app = app
+        self.job_name = name
+        self.job = job
+        self.interval = interval
+        self.runs = 0
+        self.processed = 0
+        self.last_error = None
+        self.last_run_at = None
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop_event.is_set():
+                break
+            self.run_once()
+
+    def run_once(self):
+        """Run the job until it reports no more work"""
+        with self.app.app_context():
+            try:
+                while True:
+                    processed = self.job() or 0
+                    self.processed += processed
+                    if not processed:
+                        break
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Background job {self.job_name} failed: {e}", exc_info=True)
+            finally:
+                self.runs += 1
+                self.last_run_at = time.time()
+
+    def wake(self):
+        """Run the job now instead of waiting for the next interval"""
+        self._wake.set()
+
+    def stop(self):
+        """Ask the worker to exit after its current run"""
+        self._stop_event.set()
+        self._wake.set()
+
+    def stats(self):
+        """Run counters for monitoring"""
+        return {
+            'alive': self.is_alive(),
+            'interval': self.interval,
+            'runs': self.runs,
+            'processed': self.processed,
+            'last_run_at': self.last_run_at,
+            'last_error': self.last_error
+        }
+
+def register_job(app, name, job, interval, enabled=True, inline=False):
+    """Register a periodic job
+
+    Enabled jobs get a worker thread, started lazily on the first request.
+    Every job also runs from run_jobs() (the cron endpoint); a disabled job
+    marked inline runs in the request that wakes it instead, for serverless
+    hosts where threads are frozen between invocations.
+    """
+    app.extensions.setdefault('background_jobs', {})[name] = (job, interval, enabled, inline)
+
+def start_workers(app):
+    """Start workers for enabled jobs once per process"""
+    with _start_lock:
+        workers = app.extensions.setdefault('background_workers', {})
+        for name, (job, interval, enabled, _) in app.extensions.get('background_jobs', {}).items():
+            if enabled and name not in workers:
+                worker = PeriodicWorker(app, name, job, interval)
+                workers[name] = worker
+                worker.start()
+
+def _run_job(name, job):
+    """One job call in the current app context; returns (processed, error)"""
+    from ..models import db
+    try:
+        return job() or 0, None
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Background job {name} failed: {e}", exc_info=True)
+        return 0, str(e)
+
+def wake_worker(app, name):
+    """Nudge a worker after committing new work for it, or run one batch inline without one"""
+    worker = app.extensions.get('background_workers', {}).get(name)
+    if worker:
+        worker.wake()
+        return
+    job, _, enabled, inline = app.extensions.get('background_jobs', {}).get(name, (None, None, True, False))
+    if inline and not enabled:
+        _run_job(name, job)
+
+def run_jobs(app, budget_seconds=20):
+    """Run every registered job until it has no more work or the time budget is spent
+
+    For hosts without worker threads; returns {name: {'processed', 'error'}}.
+    """
+    deadline = time.monotonic() + budget_seconds
+    results = {}
+    for name, (job, _, _, _) in app.extensions.get('background_jobs', {}).items():
+        total, error = 0, None
+        while time.monotonic() < deadline:
+            processed, error = _run_job(name, job)
+            total += processed
+            if not processed:
+                break
+        results[name] = {'processed': total, 'error': error}
+    return results
+
+def worker_stats(app):
+    """Stats of every running worker"""
+    return {name: worker.stats() for name, worker in app.extensions.get('background_workers', {}).items()}
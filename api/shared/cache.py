@@ -0,0 +1,304 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from functools import wraps
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from werkzeug.http import unquote_etag
+from sqlalchemy import event
+from ..models import db
+from .lru_cache import TTLCache
+from .response_helpers import not_modified_response
+
+logger = logging.getLogger(__name__)
+
+# Optional Redis integration for a cache shared by every worker process
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+class MemoryCacheBackend:
+    """Per-process LRU backend; namespace bumps only reach this process"""
+
+    name = 'memory'
+
+    def __init__(self, maxsize=2048, ttl=30):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions = {}
+        self._locks = set()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, value, ttl):
+        self._entries.set(key, value, ttl)
+
+    def get_versions(self, namespaces):
+        with self._lock:
+            return [self._versions.get(namespace, 0) for namespace in namespaces]
+
+    def bump(self, namespace):
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+    def acquire(self, key, timeout):
+        with self._lock:
+            if key in self._locks:
+                return False
+            self._locks.add(key)
+            return True
+
+    def release(self, key):
+        with self._lock:
+            self._locks.discard(key)
+
+    def stats(self):
+        stats = self._entries.stats()
+        return {'size': stats['size'], 'maxsize': stats['maxsize'], 'evictions': stats['evictions'] + stats['expirations']}
+
+class RedisCacheBackend:
+    """Shared backend speaking the Redis protocol (Redis, Valkey, KeyDB, ...)"""
+
+    name = 'redis'
+
+    def __init__(self, url, prefix='synergysphere:cache'):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("Redis cache backend requires the redis package - install with: pip install redis")
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(f'{self._prefix}:entry:{key}')
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.set(f'{self._prefix}:entry:{key}', json.dumps(value), ex=ttl)
+
+    def get_versions(self, namespaces):
+        if not namespaces:
+            return []
+        values = self._client.mget([f'{self._prefix}:ns:{namespace}' for namespace in namespaces])
+        return [int(value) if value is not None else 0 for value in values]
+
+    def bump(self, namespace):
+        self._client.incr(f'{self._prefix}:ns:{namespace}')
+
+    def acquire(self, key, timeout):
+        return bool(self._client.set(f'{self._prefix}:lock:{key}', 1, nx=True, px=int(timeout * 1000)))
+
+    def release(self, key):
+        self._client.delete(f'{self._prefix}:lock:{key}')
+
+    def stats(self):
+        try:
+            info = self._client.info('stats')
+            return {'evictions': info.get('evicted_keys', 0) + info.get('expired_keys', 0)}
+        except Exception as e:
+            return {'error': str(e)}
+
+class ResponseCache:
+    """Versioned-key response cache with single-flight fills"""
+
+    def __init__(self, backend, ttl=30, lock_timeout=5):
+        self.backend = backend
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.bumps = 0
+        self.errors = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def build_key(self, view, namespaces, vary):
+        """Key embedding the current version of every namespace the view reads"""
+        versions = self.backend.get_versions(namespaces)
+        raw = repr((view, vary, request.path, request.query_string, list(zip(namespaces, versions))))
+        return f'{view}:{hashlib.sha1(raw.encode()).hexdigest()}'
+
+    def get_or_fill(self, key, fill):
+        """Return the cached entry, computing it at most once per key at a time"""
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry
+
+        # Single-flight within this process: followers wait for the leader's result
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = threading.Event()
+        if not leader:
+            flight.wait(self.lock_timeout)
+            entry = self._lookup(key, count=False)
+            if entry is not None:
+                self.coalesced += 1
+                return entry
+            return fill()
+
+        try:
+            # Across processes the backend lock elects one filler; the others poll briefly
+            if not self._safe(self.backend.acquire, key, self.lock_timeout, default=True):
+                deadline = time.monotonic() + self.lock_timeout
+                while time.monotonic() < deadline:
+                    time.sleep(0.05)
+                    entry = self._lookup(key, count=False)
+                    if entry is not None:
+                        self.coalesced += 1
+                        return entry
+                return fill()
+            try:
+                entry = fill()
+                if entry is not None:
+                    self._safe(self.backend.set, key, entry, self.ttl)
+                return entry
+            finally:
+                self._safe(self.backend.release, key)
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.set()
+
+    def _lookup(self, key, count=True):
+        entry = self._safe(self.backend.get, key)
+        if count:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def _safe(self, operation, *args, default=None):
+        """Backend failures degrade to uncached responses instead of errors"""
+        try:
+            return operation(*args)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache {operation.__name__} failed: {e}")
+            return default
+
+    def bump(self, namespace):
+        """Invalidate every cached view reading namespace"""
+        self.bumps += 1
+        self._safe(self.backend.bump, namespace)
+
+    def stats(self):
+        """Hit ratio and eviction counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.backend.name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'coalesced': self.coalesced,
+            'namespace_bumps': self.bumps,
+            'errors': self.errors,
+            **(self._safe(self.backend.stats) or {})
+        }
+
+def init_response_cache(app):
+    """Create the response cache for the configured backend"""
+    backend_name = app.config.get('RESPONSE_CACHE_BACKEND', 'memory')
+    if backend_name == 'none':
+        app.extensions['response_cache'] = None
+        return
+    if backend_name == 'redis':
+        backend = RedisCacheBackend(app.config['RESPONSE_CACHE_REDIS_URL'])
+    else:
+        backend = MemoryCacheBackend(maxsize=app.config.get('RESPONSE_CACHE_SIZE', 2048))
+    app.extensions['response_cache'] = ResponseCache(
+        backend,
+        ttl=app.config.get('RESPONSE_CACHE_TTL', 30),
+        lock_timeout=app.config.get('RESPONSE_CACHE_LOCK_TIMEOUT', 5)
+    )
+
+def get_response_cache():
+    """Return the app's response cache, or None when disabled"""
+    return current_app.extensions.get('response_cache')
+
+def project_namespace(project_id):
+    return f'project:{project_id}'
+
+def user_namespace(user_id):
+    return f'user:{user_id}'
+
+def invalidate_on_commit(*namespaces):
+    """Bump namespaces once the current transaction commits
+
+    Bumping earlier would let a concurrent reader cache pre-commit data
+    under the new version.
+    """
+    db.session.info.setdefault('cache_namespaces', set()).update(namespaces)
+
+@event.listens_for(db.session, 'after_commit')
+def _bump_committed_namespaces(session):
+    namespaces = session.info.pop('cache_namespaces', None)
+    if not namespaces:
+        return
+    try:
+        cache = get_response_cache()
+    except RuntimeError:
+        return
+    if cache:
+        for namespace in namespaces:
+            cache.bump(namespace)
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_pending_namespaces(session):
+    session.info.pop('cache_namespaces', None)
+
+def cached_view(namespaces, vary_on_user=True):
+    """Cache a view's 200 responses under keys versioned by namespaces
+
+    namespaces is called with the view arguments and returns the namespaces
+    the response depends on, or None to bypass the cache (e.g. access denied).
+    Apply below jwt_required so the caller is known.
+    """
+    def decorator(func):
+        view_name = f'{func.__module__}.{func.__name__}'
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_response_cache()
+            scope = namespaces(**kwargs) if cache else None
+            if scope is None:
+                return func(*args, **kwargs)
+
+            vary = get_jwt_identity() if vary_on_user else None
+            key = cache.build_key(view_name, scope, vary)
+            filled = []
+
+            def fill():
+                response = current_app.make_response(func(*args, **kwargs))
+                filled.append(response)
+                if response.status_code != 200 or response.is_streamed:
+                    # Errors and streams are returned as-is and never stored
+                    return None
+                return {
+                    'body': response.get_data(as_text=True),
+                    'mimetype': response.mimetype,
+                    'etag': response.headers.get('ETag'),
+                    'cache_control': response.headers.get('Cache-Control')
+                }
+
+            entry = cache.get_or_fill(key, fill)
+            if entry is None:
+                return filled[-1]
+
+            etag = unquote_etag(entry['etag'])[0] if entry['etag'] else None
+            if etag and request.if_none_match.contains_weak(etag):
+                return not_modified_response(etag)
+            response = current_app.response_class(entry['body'], status=200, mimetype=entry['mimetype'])
+            if entry['etag']:
+                response.headers['ETag'] = entry['etag']
+                response.headers['Cache-Control'] = entry['cache_control']
+            response.headers['X-Cache'] = 'MISS' if filled else 'HIT'
+            return response
+        return wrapper
+    return decorator
@@ -61,4 +61,47 @@ def commit_or_rollback():
     except Exception as e:
         db.session.rollback()
         logger.error(f"Commit failed: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def _dialect_insert(model):
+    """Return a dialect-specific INSERT supporting ON CONFLICT, if available"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(model)
+
+def upsert_counters(model, keys, increments=None, values=None):
+    """Insert a counter row or atomically apply increments to the existing one
+
+    Returns the number of rows written (0 when a plain insert hit an existing row).
+    """
+    increments = increments or {}
+    values = values or {}
+    
+    stmt = _dialect_insert(model)
+    if stmt is not None:
+        stmt = stmt.values(**keys, **increments, **values)
+        set_ = {name: getattr(model, name) + delta for name, delta in increments.items()}
+        set_.update(values)
+        if not set_:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(keys))
+        else:
+            stmt = stmt.on_conflict_do_update(index_elements=list(keys), set_=set_)
+        return db.session.execute(stmt).rowcount
+    
+    # Fallback for dialects without ON CONFLICT: update first, insert when missing
+    set_ = {getattr(model, name): getattr(model, name) + delta for name, delta in increments.items()}
+    set_.update({getattr(model, name): value for name, value in values.items()})
+    updated = 0
+    if set_:
+        updated = db.session.query(model).filter_by(**keys).update(set_, synchronize_session=False)
+    if updated:
+        return updated
+    if db.session.query(model).filter_by(**keys).first():
+        return 0
+    db.session.add(model(**keys, **increments, **values))
+    return 1
\ No newline at end of file
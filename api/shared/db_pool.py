@@ -0,0 +1,155 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, NullPool
+
+# Checkout latency histogram bucket upper bounds, in milliseconds
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+# Measured by the instrumented pool classes only
+TIMING_FIELDS = ('timeouts', 'waits', 'wait_ms_avg', 'wait_ms_max', 'checkout_ms_avg', 'checkout_ms_max',
+                 'overflow_peak', 'checkout_latency')
+
+class PoolMetrics:
+    """Process-wide pool counters fed by the instrumented pools and pool events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkins = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.soft_invalidations = 0
+            self.timeouts = 0
+            self.timed_checkouts = 0
+            self.waits = 0
+            self.wait_ms_total = 0.0
+            self.wait_ms_max = 0.0
+            self.checkout_ms_total = 0.0
+            self.checkout_ms_max = 0.0
+            self.overflow_peak = 0
+            self.latency_buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record_checkout(self, elapsed_ms, waited, overflow):
+        """Timing of one checkout from an instrumented pool; the count comes from pool events"""
+        with self._lock:
+            self.timed_checkouts += 1
+            self.checkout_ms_total += elapsed_ms
+            self.checkout_ms_max = max(self.checkout_ms_max, elapsed_ms)
+            self.overflow_peak = max(self.overflow_peak, overflow)
+            if waited:
+                self.waits += 1
+                self.wait_ms_total += elapsed_ms
+                self.wait_ms_max = max(self.wait_ms_max, elapsed_ms)
+            for index, bound in enumerate(LATENCY_BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    self.latency_buckets[index] += 1
+                    break
+            else:
+                self.latency_buckets[-1] += 1
+
+    def increment(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self, timed=True):
+        """Counters from pool events; timing fields are None unless the pool is instrumented"""
+        with self._lock:
+            stats = {
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'soft_invalidations': self.soft_invalidations
+            }
+            if not timed:
+                return {**stats, **dict.fromkeys(TIMING_FIELDS)}
+            buckets = dict(zip([f'le_{bound}ms' for bound in LATENCY_BUCKETS_MS] + ['inf'], self.latency_buckets))
+            return {
+                **stats,
+                'timeouts': self.timeouts,
+                'waits': self.waits,
+                'wait_ms_avg': round(self.wait_ms_total / self.waits, 3) if self.waits else 0.0,
+                'wait_ms_max': round(self.wait_ms_max, 3),
+                'checkout_ms_avg': round(self.checkout_ms_total / self.timed_checkouts, 3) if self.timed_checkouts else 0.0,
+                'checkout_ms_max': round(self.checkout_ms_max, 3),
+                'overflow_peak': self.overflow_peak,
+                'checkout_latency': buckets
+            }
+
+pool_metrics = PoolMetrics()
+
+class _InstrumentedPool:
+    """Times every checkout; it counts as a wait when the pool was exhausted"""
+
+    def _is_exhausted(self):
+        return False
+
+    def _overflow_in_use(self):
+        return 0
+
+    def _do_get(self):
+        waited = self._is_exhausted()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.increment('timeouts')
+            raise
+        pool_metrics.record_checkout((time.perf_counter() - start) * 1000, waited, self._overflow_in_use())
+        return connection
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    """QueuePool for long-lived workers with checkout/wait telemetry"""
+
+    def _is_exhausted(self):
+        return self._max_overflow > -1 and self.checkedout() >= self.size() + self._max_overflow
+
+    def _overflow_in_use(self):
+        return max(self.overflow(), 0)
+
+class InstrumentedNullPool(_InstrumentedPool, NullPool):
+    """NullPool for external poolers; checkout latency is the connect time"""
+
+def transaction_settings_sql(settings):
+    """SET LOCAL statements for Postgres settings given in milliseconds"""
+    return [f'SET LOCAL {name} = {int(value)}' for name, value in settings.items() if value]
+
+def init_db_pool(app, engine):
+    """Attach pool event listeners and transaction-scoped session settings"""
+    for name, counter in (('checkout', 'checkouts'), ('checkin', 'checkins'), ('connect', 'connects'),
+                          ('invalidate', 'invalidations'), ('soft_invalidate', 'soft_invalidations')):
+        event.listen(engine, name, lambda *args, counter=counter: pool_metrics.increment(counter))
+
+    # Behind a transaction-mode pooler session-level settings would leak to
+    # other clients, so they are applied per transaction instead
+    settings = app.config.get('DB_TRANSACTION_SETTINGS')
+    if settings and engine.dialect.name == 'postgresql':
+        statements = transaction_settings_sql(settings)
+
+        @event.listens_for(engine, 'begin')
+        def apply_transaction_settings(connection):
+            for statement in statements:
+                connection.exec_driver_sql(statement)
+
+def pool_stats(engine):
+    """Current pool occupancy plus cumulative checkout metrics
+
+    Pools other than the instrumented ones (SQLite's defaults) report their
+    event counters, with the timing fields as None.
+    """
+    pool = engine.pool
+    instrumented = isinstance(pool, _InstrumentedPool)
+    stats = {'pool_class': type(pool).__name__, 'instrumented': instrumented, **pool_metrics.stats(instrumented)}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0)
+        })
+    return stats
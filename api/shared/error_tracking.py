@@ -1,8 +1,10 @@
 import logging
 import os
+import time
 from functools import wraps
 from flask import request, g
 import uuid
+from .metrics import operation_duration
 
 logger = logging.getLogger(__name__)
 
@@ -64,25 +66,26 @@ def capture_exception(error, context=None):
             sentry_sdk.capture_exception(error)
 
 def track_performance(operation_name):
-    """Decorator to track operation performance"""
+    """Decorator to track operation performance in operation_duration_seconds"""
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            import time
-            start_time = time.time()
+            start_time = time.perf_counter()
             
             try:
                 result = func(*args, **kwargs)
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
+                operation_duration.observe(duration, operation=operation_name, outcome='success')
                 
-                logger.info(f"Performance: {operation_name} completed in {duration:.3f}s", 
+                logger.debug(f"Performance: {operation_name} completed in {duration:.3f}s", 
                            extra={'operation': operation_name, 'duration': duration})
                 return result
             except Exception as e:
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
+                operation_duration.observe(duration, operation=operation_name, outcome='error')
                 logger.error(f"Performance: {operation_name} failed after {duration:.3f}s", 
                            extra={'operation': operation_name, 'duration': duration})
                 raise
                 
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
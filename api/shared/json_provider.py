@@ -0,0 +1,76 @@
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime
+from flask.json.provider import DefaultJSONProvider
+
+# Optional native encoder; the stdlib encoder is used when it is missing
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _default(value):
+    """Encode types the encoders don't know natively; datetimes as ISO 8601"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider using orjson when installed, else the stdlib encoder
+
+    Both encode datetimes as ISO 8601 (the default provider uses HTTP dates),
+    so serializers can hand datetime objects over as-is.
+    """
+
+    # Key order carries no meaning for API clients; sorting only costs time
+    sort_keys = False
+    # orjson always emits UTF-8; keep the stdlib fallback byte-compatible
+    ensure_ascii = False
+
+    def _indent(self):
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def dumps_bytes(self, obj, indent=None):
+        """Encode obj straight to UTF-8 bytes; indent=None follows the app's setting"""
+        if indent is None:
+            indent = self._indent()
+        if ORJSON_AVAILABLE:
+            option = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_default, option=option)
+        if indent:
+            return self.dumps(obj).encode('utf-8')
+        return self.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if ORJSON_AVAILABLE and not kwargs:
+            return self.dumps_bytes(obj).decode('utf-8')
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        if self._indent():
+            kwargs.setdefault('indent', 2)
+        else:
+            kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if ORJSON_AVAILABLE and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
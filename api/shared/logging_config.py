@@ -1,11 +1,35 @@
+import atexit
+import copy
 import logging
+import queue
+import random
 import sys
+import threading
+import time
+import zlib
 from datetime import datetime
 from functools import wraps
-from flask import request, g
+from logging.handlers import QueueHandler, QueueListener
+from flask import request, g, has_request_context
 import json
 import os
 
+# Per-request SQL profile fields (see shared.sql_profiler)
+PROFILE_FIELDS = ('db_queries', 'db_time_ms', 'db_repeated')
+# Request details copied onto records while the request is still active
+REQUEST_FIELDS = ('request_id', 'endpoint', 'method', 'ip')
+
+def request_context_fields():
+    """Request details for a log record; empty outside a request"""
+    if not has_request_context():
+        return {}
+    return {
+        'request_id': g.get('request_id'),
+        'endpoint': request.endpoint,
+        'method': request.method,
+        'ip': request.remote_addr
+    }
+
 class StructuredFormatter(logging.Formatter):
     """Custom formatter for structured JSON logging"""
     
@@ -20,21 +44,18 @@ class StructuredFormatter(logging.Formatter):
             'line': record.lineno
         }
         
-        # Add request context if available
-        try:
-            if hasattr(g, 'request_id'):
-                log_entry['request_id'] = g.request_id
-            if request:
-                log_entry['endpoint'] = request.endpoint
-                log_entry['method'] = request.method
-                log_entry['ip'] = request.remote_addr
-        except RuntimeError:
-            # Outside of request context
-            pass
+        # Add request context: captured on the record by the queue handler,
+        # read directly when formatting on the request thread
+        context = getattr(record, 'request_context', None)
+        if context is None:
+            context = request_context_fields()
+        log_entry.update({key: value for key, value in context.items() if value is not None})
         
         # Add exception info if present
         if record.exc_info:
             log_entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_entry['exception'] = record.exc_text
         
         # Add extra fields
         if hasattr(record, 'user_id'):
@@ -43,15 +64,124 @@ class StructuredFormatter(logging.Formatter):
             log_entry['project_id'] = record.project_id
         if hasattr(record, 'operation'):
             log_entry['operation'] = record.operation
+        for field in PROFILE_FIELDS:
+            if hasattr(record, field):
+                log_entry[field] = getattr(record, field)
+        if getattr(record, 'suppressed', 0):
+            log_entry['suppressed'] = record.suppressed
             
-        return json.dumps(log_entry)
+        return json.dumps(log_entry, default=str)
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of INFO-and-below operation logs; warnings and errors always pass
+
+    The decision hashes the request id, so a request's "Starting" and
+    "Completed" lines are kept or dropped together.
+    """
+    
+    def __init__(self, rates=None, default_rate=1.0):
+        super().__init__()
+        self.rates = rates or {}
+        self.default_rate = default_rate
+    
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, 'operation', None), self.default_rate)
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        key = getattr(record, 'request_id', None) or (g.get('request_id') if has_request_context() else None)
+        draw = (zlib.crc32(key.encode()) % 10000) / 10000 if key else random.random()
+        return draw < rate
+
+class ErrorBurstFilter(logging.Filter):
+    """Let at most `burst` ERROR records per call site through per window
+
+    Records are keyed by where they were logged, not by their message: most
+    messages are f-strings carrying ids, so no two would share a window.
+
+    Once a window expires, the next passing record carries how many were
+    suppressed meanwhile.
+    """
+    
+    def __init__(self, burst=10, window=60.0):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._lock = threading.Lock()
+        self._windows = {}  # (logger, path, line) -> [window start, passed, suppressed]
+    
+    def filter(self, record):
+        if record.levelno < logging.ERROR or self.burst <= 0:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                if len(self._windows) > 1000:
+                    self._windows.clear()
+                suppressed = state[2] if state else 0
+                self._windows[key] = [now, 1, 0]
+                record.suppressed = suppressed
+                return True
+            if state[1] < self.burst:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+class RequestContextQueueHandler(QueueHandler):
+    """Hands records to the logging thread; only cheap work runs on the request thread"""
+    
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record):
+        # Unlike the base class, leave formatting to the listener thread: only the
+        # message is merged and request details captured while still available
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        record.request_context = request_context_fields()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Never block a request on logging; the count shows up in health stats
+            self.dropped += 1
+
+def parse_sample_rates(value):
+    """'fetch recent projects=0.1,get notifications=0.05' -> {operation: rate}"""
+    rates = {}
+    for entry in (value or '').split(','):
+        operation, _, rate = entry.rpartition('=')
+        if operation.strip():
+            rates[operation.strip()] = float(rate)
+    return rates
 
 def setup_logging(app):
-    """Configure structured logging for the application"""
+    """Configure structured logging for the application
+
+    LOG_MODE 'async' (default) enqueues records and formats and writes them on
+    a QueueListener thread; 'sync' formats and writes on the calling thread.
+    """
     
-    # Remove default handlers
+    # Remove default handlers, stopping a listener left by an earlier setup
     for handler in app.logger.handlers[:]:
         app.logger.removeHandler(handler)
+    previous = app.extensions.pop('log_listener', None)
+    if previous:
+        atexit.unregister(previous.stop)
+        previous.stop()
     
     # Create structured formatter
     formatter = StructuredFormatter()
@@ -61,8 +191,22 @@ def setup_logging(app):
     console_handler.setFormatter(formatter)
     console_handler.setLevel(logging.INFO)
     
+    if app.config.get('LOG_MODE', 'async') == 'async':
+        handler = RequestContextQueueHandler(queue.Queue(app.config.get('LOG_QUEUE_SIZE', 10000)))
+        listener = QueueListener(handler.queue, console_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        app.extensions['log_listener'] = listener
+    else:
+        handler = console_handler
+    handler.setLevel(logging.INFO)
+    handler.addFilter(SamplingFilter(
+        parse_sample_rates(app.config.get('LOG_SAMPLE_RATES')), app.config.get('LOG_SAMPLE_RATE', 1.0)
+    ))
+    handler.addFilter(ErrorBurstFilter(app.config.get('LOG_ERROR_BURST', 10), app.config.get('LOG_ERROR_WINDOW', 60)))
+    
     # Add handlers (console only for serverless)
-    app.logger.addHandler(console_handler)
+    app.logger.addHandler(handler)
     app.logger.setLevel(logging.INFO)
     
     # Configure root logger
@@ -70,6 +214,13 @@ def setup_logging(app):
     
     return app.logger
 
+def logging_stats(app):
+    """Queue depth and dropped records of the async pipeline"""
+    handler = next((h for h in app.logger.handlers if isinstance(h, RequestContextQueueHandler)), None)
+    if handler is None:
+        return {'mode': 'sync'}
+    return {'mode': 'async', 'queued': handler.queue.qsize(), 'dropped': handler.dropped}
+
 def log_operation(operation_name, user_id=None, project_id=None):
     """Decorator to log operations with context"""
     def decorator(func):
@@ -0,0 +1,329 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from flask import g, request
+from .query_timing import observe_statements
+
+try:
+    import fcntl
+except ImportError:  # Windows: exited workers' snapshots are never folded
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram bucket upper bounds, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+
+# Counters and histograms of exited workers, in METRICS_MULTIPROC_DIR
+EXITED_SNAPSHOT = 'exited_metrics.json'
+
+class Metric:
+    """One metric family: counter, gauge or histogram, keyed by label values"""
+
+    def __init__(self, registry, name, help_text, kind, labels=(), buckets=None):
+        self._lock = registry._lock
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets) if buckets else None
+        self.values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labels)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = value
+
+    def observe(self, value, **labels):
+        """Record a histogram observation: per-bucket counts, then sum and count"""
+        key = self._key(labels)
+        with self._lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {key: list(value) if isinstance(value, list) else value for key, value in self.values.items()}
+
+class MetricsRegistry:
+    """Process-wide metric families plus collectors refreshed on every scrape"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collectors = {}
+
+    def _metric(self, name, help_text, kind, labels=(), buckets=None):
+        with self._lock:
+            metric = self._metrics.get(name)
+        if metric is None:
+            metric = Metric(self, name, help_text, kind, labels, buckets)
+            with self._lock:
+                metric = self._metrics.setdefault(name, metric)
+        return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._metric(name, help_text, 'counter', labels)
+
+    def gauge(self, name, help_text, labels=()):
+        return self._metric(name, help_text, 'gauge', labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=DURATION_BUCKETS):
+        return self._metric(name, help_text, 'histogram', labels, buckets)
+
+    def add_collector(self, collector):
+        """Register a callable run before each scrape, e.g. to set gauges from stats()
+
+        Collectors are keyed by name, so a re-created app replaces its own.
+        """
+        self._collectors[collector.__name__] = collector
+
+    def collect(self):
+        for collector in list(self._collectors.values()):
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector {collector.__name__} failed: {e}")
+
+    def snapshot(self):
+        """{name: family} of every metric, JSON-serializable"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: {
+            'help': metric.help,
+            'kind': metric.kind,
+            'labels': list(metric.labels),
+            'buckets': list(metric.buckets) if metric.buckets else None,
+            'samples': [[list(key), value] for key, value in metric.snapshot().items()]
+        } for metric in metrics}
+
+registry = MetricsRegistry()
+
+def _merge(families, snapshot):
+    """Add a process snapshot into the aggregate: counters, gauges and histograms sum"""
+    for name, family in snapshot.items():
+        merged = families.setdefault(name, {**family, 'samples': {}})
+        for key, value in family['samples']:
+            key = tuple(key)
+            previous = merged['samples'].get(key)
+            if previous is None:
+                merged['samples'][key] = value
+            elif isinstance(value, list):
+                merged['samples'][key] = [a + b for a, b in zip(previous, value)]
+            else:
+                merged['samples'][key] = previous + value
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _snapshot_path(directory, pid=None):
+    return os.path.join(directory, f'metrics_{pid or os.getpid()}.json')
+
+def _read_snapshot(path):
+    """A snapshot file's contents, or None once it is gone or unreadable"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (ValueError, OSError):
+        return None
+
+def _write_snapshot(path, snapshot):
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as f:
+        json.dump(snapshot, f)
+    os.replace(temporary, path)
+
+def _fold_exited(directory, paths):
+    """Move exited workers' counters and histograms into one totals file and delete their snapshots
+
+    Totals keep counting, as they would in a single process, while the
+    directory holds one file per live worker. The lock stops two scrapes
+    from folding the same snapshot twice.
+    """
+    if fcntl is None:
+        return
+    exited_path = os.path.join(directory, EXITED_SNAPSHOT)
+    with open(os.path.join(directory, 'metrics.lock'), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            totals = {}
+            _merge(totals, _read_snapshot(exited_path) or {})
+            folded = []
+            for path in paths:
+                snapshot = _read_snapshot(path)
+                if snapshot is None:
+                    continue
+                _merge(totals, {name: family for name, family in snapshot.items() if family['kind'] != 'gauge'})
+                folded.append(path)
+            if not folded:
+                return
+            _write_snapshot(exited_path, {name: {
+                **family, 'samples': [[list(key), value] for key, value in family['samples'].items()]
+            } for name, family in totals.items()})
+            for path in folded:
+                os.remove(path)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def write_process_snapshot(directory):
+    """Publish this process's metrics for other workers' scrapes; returns 0 for the worker loop"""
+    registry.collect()
+    _write_snapshot(_snapshot_path(directory), registry.snapshot())
+    return 0
+
+def aggregate_snapshots(directory=None):
+    """This process's metrics merged with the snapshots of the other workers
+
+    Snapshots of exited workers are folded into the totals file: their
+    gauges are dropped, their counters and histograms keep counting towards
+    the totals, as they would in a single process.
+    """
+    registry.collect()
+    families = {}
+    _merge(families, registry.snapshot())
+    if not directory:
+        return families
+    own = _snapshot_path(directory)
+    exited = []
+    for path in glob.glob(os.path.join(directory, 'metrics_*.json')):
+        if path == own:
+            continue
+        try:
+            pid = int(os.path.basename(path)[len('metrics_'):-len('.json')])
+        except ValueError:
+            continue
+        if not _process_alive(pid):
+            exited.append(path)
+            continue
+        snapshot = _read_snapshot(path)
+        if snapshot is not None:
+            _merge(families, snapshot)
+    if exited:
+        _fold_exited(directory, exited)
+        if fcntl is None:
+            # Without file locks, exited snapshots stay and are merged in place
+            for path in exited:
+                snapshot = _read_snapshot(path) or {}
+                _merge(families, {name: family for name, family in snapshot.items() if family['kind'] != 'gauge'})
+    _merge(families, _read_snapshot(os.path.join(directory, EXITED_SNAPSHOT)) or {})
+    return families
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _label_text(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_text(families):
+    """Prometheus text exposition format (version 0.0.4)"""
+    lines = []
+    for name in sorted(families):
+        family = families[name]
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['kind']}")
+        for key, value in sorted(family['samples'].items()):
+            if family['kind'] != 'histogram':
+                lines.append(f"{name}{_label_text(family['labels'], key)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(list(family['buckets']) + ['+Inf'], value):
+                cumulative += count
+                le = bound if bound == '+Inf' else repr(float(bound))
+                lines.append(f"{name}_bucket{_label_text(family['labels'], key, [('le', le)])} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(family['labels'], key)} {_number(value[-2])}")
+            lines.append(f"{name}_count{_label_text(family['labels'], key)} {value[-1]}")
+    return '\n'.join(lines) + '\n'
+
+http_request_duration = registry.histogram(
+    'http_request_duration_seconds', 'Request latency by endpoint, method and status', ('endpoint', 'method', 'status')
+)
+http_requests_in_progress = registry.gauge(
+    'http_requests_in_progress', 'Requests currently being handled', ('endpoint',)
+)
+db_queries = registry.counter('db_queries_total', 'SQL statements executed', ('statement',))
+db_query_duration = registry.histogram(
+    'db_query_duration_seconds', 'SQL statement latency', ('statement',), DB_DURATION_BUCKETS
+)
+operation_duration = registry.histogram(
+    'operation_duration_seconds', 'Duration of tracked operations', ('operation', 'outcome')
+)
+notifications_created = registry.counter('notifications_created_total', 'Notifications inserted', ('type',))
+
+def init_metrics(app, engine):
+    """Instrument requests and SQL statements (METRICS_ENABLED)
+
+    With METRICS_MULTIPROC_DIR set, each worker process publishes its
+    metrics there and /api/metrics reports the sum over all workers.
+    """
+    if not app.config.get('METRICS_ENABLED', False):
+        return
+    app.extensions['metrics'] = registry
+
+    def record_query(statement, elapsed):
+        kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'OTHER'
+        db_queries.inc(statement=kind)
+        db_query_duration.observe(elapsed, statement=kind)
+
+    observe_statements(engine, record_query)
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_endpoint = request.endpoint or 'unmatched'
+        g.metrics_started = time.perf_counter()
+        http_requests_in_progress.inc(endpoint=g.metrics_endpoint)
+
+    @app.after_request
+    def record_request_metrics(response):
+        if 'metrics_started' in g:
+            http_request_duration.observe(
+                time.perf_counter() - g.metrics_started,
+                endpoint=g.metrics_endpoint, method=request.method, status=response.status_code
+            )
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(error=None):
+        endpoint = g.pop('metrics_endpoint', None)
+        if endpoint is not None:
+            http_requests_in_progress.dec(endpoint=endpoint)
+
+    directory = app.config.get('METRICS_MULTIPROC_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        from .background import register_job
+        register_job(app, 'metrics_snapshot', lambda: write_process_snapshot(directory),
+                     app.config.get('METRICS_SNAPSHOT_INTERVAL', 5))
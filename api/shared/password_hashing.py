@@ -0,0 +1,88 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt
+from flask import current_app
+
+class HashingOverloaded(Exception):
+    """Raised when too many hashing jobs are already pending"""
+
+class PasswordHasher:
+    """bcrypt on a bounded thread pool with a cap on queued jobs
+
+    bcrypt releases the GIL, so hashes run in parallel up to max_workers;
+    beyond max_pending outstanding jobs new requests are rejected instead of
+    piling up behind a login storm.
+    """
+
+    def __init__(self, log_rounds=12, max_workers=4, max_pending=32, timeout=10):
+        self.log_rounds = log_rounds
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bcrypt')
+
+    def _run(self, func, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingOverloaded()
+            self.pending += 1
+        # Pending drops when the job really finishes, even if the caller gave up
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(self._job_done)
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self.rejected += 1
+            raise HashingOverloaded()
+
+    def _job_done(self, future):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def hash(self, password):
+        """Hash a password with the configured work factor"""
+        return self._run(
+            lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.log_rounds)).decode('utf-8')
+        )
+
+    def verify(self, password, password_hash):
+        """Check a password against a stored hash"""
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash uses a different work factor than configured"""
+        try:
+            return int(password_hash.split('$')[2]) != self.log_rounds
+        except (IndexError, ValueError):
+            return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'log_rounds': self.log_rounds,
+                'workers': self.max_workers,
+                'pending': self.pending,
+                'max_pending': self.max_pending,
+                'completed': self.completed,
+                'rejected': self.rejected
+            }
+
+def init_password_hasher(app):
+    """Create the app's password hasher from configuration"""
+    app.extensions['password_hasher'] = PasswordHasher(
+        log_rounds=app.config.get('BCRYPT_LOG_ROUNDS', 12),
+        max_workers=app.config.get('PASSWORD_HASH_WORKERS', 4),
+        max_pending=app.config.get('PASSWORD_HASH_MAX_PENDING', 32),
+        timeout=app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+    )
+
+def get_password_hasher():
+    """Return the app's password hasher"""
+    return current_app.extensions['password_hasher']
@@ -0,0 +1,224 @@
+import itertools
+import json
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Optional Redis integration for cross-process fan-out
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+class Event:
+    """Published event with a broker-wide monotonically increasing id"""
+
+    __slots__ = ('id', 'channel', 'type', 'data')
+
+    def __init__(self, id, channel, type, data):
+        self.id = id
+        self.channel = channel
+        self.type = type
+        self.data = data
+
+    def to_dict(self):
+        return {'id': self.id, 'channel': self.channel, 'type': self.type, 'data': self.data}
+
+    def to_sse(self, dumps=json.dumps):
+        """Format event as a Server-Sent Events frame"""
+        return f"id: {self.id}\nevent: {self.type}\ndata: {dumps(self.data)}\n\n"
+
+class Subscription:
+    """Bounded per-subscriber queue; the oldest event is dropped when full"""
+
+    def __init__(self, broker, channels, maxsize):
+        self.broker = broker
+        self.channels = frozenset(channels)
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.closed = False
+        self._events = deque()
+        self._condition = threading.Condition()
+
+    def put(self, event):
+        with self._condition:
+            if len(self._events) >= self.maxsize:
+                self._events.popleft()
+                self.dropped += 1
+                self.broker.record_dropped()
+            self._events.append(event)
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """Wait for the next event, returning None on timeout or close"""
+        with self._condition:
+            if not self._events and not self.closed:
+                self._condition.wait(timeout)
+            return self._events.popleft() if self._events else None
+
+    def drain(self, limit):
+        """Return up to limit queued events without waiting"""
+        with self._condition:
+            events = []
+            while self._events and len(events) < limit:
+                events.append(self._events.popleft())
+            return events
+
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+        self.broker.unsubscribe(self)
+
+class MemoryBackend:
+    """In-process backend: events only reach subscribers of this process"""
+
+    name = 'memory'
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._deliver = None
+
+    def start(self, deliver):
+        self._deliver = deliver
+
+    def publish(self, channel, type, data):
+        # Delivered under the lock that allocates the id, so history is appended in id order
+        with self._lock:
+            self._deliver(Event(next(self._ids), channel, type, data))
+
+class RedisBackend:
+    """Cross-process backend using Redis INCR for ids and PUBLISH for fan-out"""
+
+    name = 'redis'
+
+    def __init__(self, url, prefix='synergysphere:stream', dumps=None):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("Redis backend requires the redis package - install with: pip install redis")
+        self._client = redis.Redis.from_url(url)
+        self._dumps = dumps or (lambda obj: json.dumps(obj, default=str))
+        self._id_key = f'{prefix}:last_id'
+        self._channel = f'{prefix}:events'
+        self._deliver = None
+
+    def start(self, deliver):
+        self._deliver = deliver
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self._channel: self._on_message})
+        pubsub.run_in_thread(sleep_time=0.5, daemon=True)
+
+    def _on_message(self, message):
+        try:
+            payload = json.loads(message['data'])
+            self._deliver(Event(payload['id'], payload['channel'], payload['type'], payload['data']))
+        except Exception as e:
+            logger.error(f"Failed to decode stream event: {e}")
+
+    def publish(self, channel, type, data):
+        event_id = self._client.incr(self._id_key)
+        self._client.publish(self._channel, self._dumps(
+            {'id': event_id, 'channel': channel, 'type': type, 'data': data}
+        ))
+
+class Broker:
+    """Channel-based pub/sub with per-subscriber bounded queues and replay history"""
+
+    def __init__(self, backend=None, queue_size=100, history_size=1000):
+        self.backend = backend or MemoryBackend()
+        self.queue_size = queue_size
+        self._history = deque(maxlen=history_size)
+        self._subscriptions = {}
+        self._lock = threading.RLock()
+        self.last_event_id = 0
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.replayed = 0
+        self.total_connections = 0
+        self.backend.start(self._deliver)
+
+    def publish(self, channel, type, data):
+        """Publish an event through the configured backend"""
+        self.backend.publish(channel, type, data)
+
+    def _deliver(self, event):
+        with self._lock:
+            self._remember(event)
+            self.last_event_id = max(self.last_event_id, event.id)
+            self.published += 1
+            subscribers = list(self._subscriptions.get(event.channel, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+        with self._lock:
+            self.delivered += len(subscribers)
+
+    def _remember(self, event):
+        """Insert into history in id order: Redis publishers race between INCR and PUBLISH
+
+        A resume from Last-Event-ID replays events with a higher id, so an
+        event appended behind a newer one would be skipped.
+        """
+        history = self._history
+        index = len(history)
+        while index and history[index - 1].id > event.id:
+            index -= 1
+        if len(history) == history.maxlen:
+            if index == 0:
+                return
+            history.popleft()
+            index -= 1
+        history.insert(index, event)
+
+    def subscribe(self, channels, last_event_id=None):
+        """Register a subscriber, replaying buffered events newer than last_event_id"""
+        subscription = Subscription(self, channels, self.queue_size)
+        # Replay under the lock so live events cannot overtake replayed ones
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+            self.total_connections += 1
+
+            if last_event_id is not None:
+                oldest = self._history[0].id if self._history else self.last_event_id + 1
+                if last_event_id < oldest - 1:
+                    # Events were evicted from history; tell the client to resync via REST
+                    subscription.put(Event(self.last_event_id, None, 'reset', {'reason': 'history_expired'}))
+                for event in self._history:
+                    if event.id > last_event_id and event.channel in subscription.channels:
+                        subscription.put(event)
+                        self.replayed += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def record_dropped(self):
+        with self._lock:
+            self.dropped += 1
+
+    def stats(self):
+        """Connection and delivery counters for monitoring"""
+        with self._lock:
+            connections = len({s for subs in self._subscriptions.values() for s in subs})
+            return {
+                'backend': self.backend.name,
+                'connections': connections,
+                'total_connections': self.total_connections,
+                'channels': len(self._subscriptions),
+                'published': self.published,
+                'delivered': self.delivered,
+                'dropped': self.dropped,
+                'replayed': self.replayed,
+                'last_event_id': self.last_event_id,
+                'history_size': len(self._history)
+            }
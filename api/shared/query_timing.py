@@ -0,0 +1,33 @@
+import time
+import weakref
+from sqlalchemy import event
+
+# engine -> callbacks run after each statement; one hook pair per engine
+_observers = weakref.WeakKeyDictionary()
+
+def observe_statements(engine, callback):
+    """Call callback(statement, elapsed_seconds) after every statement the engine runs
+
+    The SQL profiler and the metrics share one before/after hook pair. The
+    start time lives on the execution context rather than conn.info, so a
+    statement that raises (after_cursor_execute never fires) leaves nothing
+    behind on the connection.
+    """
+    if engine in _observers:
+        _observers[engine].append(callback)
+        return
+    callbacks = _observers[engine] = [callback]
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def finish_statement_timer(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_query_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        for observer in callbacks:
+            observer(statement, elapsed)
@@ -1,13 +1,36 @@
-from flask import jsonify
+import hashlib
+from flask import jsonify, request, current_app
 
-def success_response(data=None, message=None, status=200):
+def success_response(data=None, message=None, status=200, etag=None):
     """Standard success response format"""
     response = {'success': True}
     if data is not None:
         response.update(data)
     if message:
         response['message'] = message
-    return jsonify(response), status
+    response = jsonify(response)
+    if etag:
+        with_etag(response, etag)
+    return response, status
+
+def make_etag(*version):
+    """Weak validator for a resource version token, scoped to the request URL"""
+    raw = repr((request.path, request.query_string, version))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+def etag_matches(etag):
+    """Whether the client's If-None-Match already names this version"""
+    return request.if_none_match.contains_weak(etag)
+
+def not_modified_response(etag):
+    """Empty 304 telling the client its cached copy is current"""
+    return with_etag(current_app.response_class(status=304), etag)
+
+def with_etag(response, etag):
+    """Attach a weak ETag; clients may cache privately but must revalidate"""
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 def error_response(message, status=400, field_errors=None, error_code=None):
     """Enhanced error response format with field-specific errors"""
@@ -0,0 +1,134 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from flask import g, request, has_request_context
+from .query_timing import observe_statements
+
+logger = logging.getLogger(__name__)
+
+# Bound parameters and expanded IN lists, so repeated lookups share one pattern
+_PARAMS = re.compile(r"%\(\w+\)s|\?|'(?:[^']|'')*'|\b\d+\b")
+_PARAM_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+def statement_pattern(statement):
+    """Statement text with literals and placeholders collapsed to ?"""
+    pattern = _PARAM_LISTS.sub('(?)', _PARAMS.sub('?', statement))
+    return ' '.join(pattern.split())
+
+class RequestProfile:
+    """SQL executed while handling one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.patterns = Counter()
+
+    def record(self, statement, elapsed_ms):
+        self.queries += 1
+        self.db_ms += elapsed_ms
+        self.patterns[statement_pattern(statement)] += 1
+
+    def repeated(self, threshold):
+        """(pattern, count) for statements run at least threshold times: likely N+1 loops"""
+        return [(pattern, count) for pattern, count in self.patterns.most_common() if count >= threshold]
+
+class ProfileStats:
+    """Per-endpoint SQL totals across requests, safe to update from any thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def add(self, endpoint, profile, repeated):
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {
+                'requests': 0, 'queries': 0, 'queries_max': 0, 'db_ms': 0.0, 'db_ms_max': 0.0,
+                'repeated_requests': 0, 'repeated_pattern': None
+            })
+            stats['requests'] += 1
+            stats['queries'] += profile.queries
+            stats['queries_max'] = max(stats['queries_max'], profile.queries)
+            stats['db_ms'] += profile.db_ms
+            stats['db_ms_max'] = max(stats['db_ms_max'], profile.db_ms)
+            if repeated:
+                stats['repeated_requests'] += 1
+                stats['repeated_pattern'] = repeated[0][0]
+
+    def worst(self, sort='queries', limit=20):
+        """Endpoints ordered by average queries per request or total DB time"""
+        with self._lock:
+            rows = [{
+                'endpoint': endpoint,
+                **stats,
+                'queries_avg': round(stats['queries'] / stats['requests'], 2),
+                'db_ms': round(stats['db_ms'], 3),
+                'db_ms_avg': round(stats['db_ms'] / stats['requests'], 3),
+                'db_ms_max': round(stats['db_ms_max'], 3)
+            } for endpoint, stats in self._endpoints.items()]
+        key = 'db_ms' if sort == 'db_time' else 'queries_avg'
+        return sorted(rows, key=lambda row: row[key], reverse=True)[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+def get_profile_stats(app):
+    """The app's per-endpoint SQL stats, or None when profiling is off"""
+    return app.extensions.get('sql_profiler')
+
+def server_timing(profile, repeated):
+    """Server-Timing header value for a request profile"""
+    total_ms = (time.perf_counter() - profile.started) * 1000
+    metrics = [
+        f'db;desc="{profile.queries} queries";dur={profile.db_ms:.3f}',
+        f'app;dur={total_ms:.3f}'
+    ]
+    if repeated:
+        metrics.append(f'db-repeated;desc="{len(repeated)} statements repeated"')
+    return ', '.join(metrics)
+
+def init_sql_profiler(app, engine):
+    """Opt-in per-request SQL profiling (SQL_PROFILER_ENABLED)
+
+    Statements run outside a request, e.g. by background workers, are ignored.
+    """
+    if not app.config.get('SQL_PROFILER_ENABLED', False):
+        return
+    threshold = app.config.get('SQL_PROFILER_REPEAT_THRESHOLD', 5)
+    stats = app.extensions['sql_profiler'] = ProfileStats()
+
+    def record_query(statement, elapsed):
+        if has_request_context() and 'sql_profile' in g:
+            g.sql_profile.record(statement, elapsed * 1000)
+
+    observe_statements(engine, record_query)
+
+    @app.before_request
+    def start_request_profile():
+        g.sql_profile = RequestProfile()
+
+    @app.after_request
+    def finish_request_profile(response):
+        profile = g.pop('sql_profile', None)
+        if profile is None:
+            return response
+        repeated = profile.repeated(threshold)
+        endpoint = request.endpoint or 'unmatched'
+        stats.add(endpoint, profile, repeated)
+        response.headers.add('Server-Timing', server_timing(profile, repeated))
+
+        extra = {
+            'operation': endpoint,
+            'db_queries': profile.queries,
+            'db_time_ms': round(profile.db_ms, 3),
+            'db_repeated': [{'statement': pattern, 'count': count} for pattern, count in repeated]
+        }
+        if repeated:
+            pattern, count = repeated[0]
+            logger.warning(f"Possible N+1 in {endpoint}: {count}x {pattern[:200]}", extra=extra)
+        else:
+            logger.info(f"SQL profile for {endpoint}", extra=extra)
+        return response
@@ -0,0 +1,136 @@
+import logging
+import time
+from flask import Blueprint, Response, current_app, request, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from .models import db
+from .membership import get_accessible_project_ids, has_project_access
+from .shared.pubsub import Broker, MemoryBackend, RedisBackend
+from .shared.response_helpers import success_response, error_response, access_denied_response
+from .shared.access_control import bearer_token_matches
+
+logger = logging.getLogger(__name__)
+
+stream_bp = Blueprint('stream', __name__)
+
+def init_stream_broker(app):
+    """Create the event broker for the configured backend"""
+    backend_name = app.config.get('STREAM_BACKEND', 'memory')
+    if backend_name == 'redis':
+        backend = RedisBackend(app.config['STREAM_REDIS_URL'], dumps=app.json.dumps)
+    else:
+        backend = MemoryBackend()
+    app.extensions['stream_broker'] = Broker(
+        backend,
+        queue_size=app.config.get('STREAM_QUEUE_SIZE', 100),
+        history_size=app.config.get('STREAM_HISTORY_SIZE', 1000)
+    )
+
+def get_broker():
+    """Return the app's event broker"""
+    return current_app.extensions['stream_broker']
+
+def project_channel(project_id):
+    """Channel carrying a project's message events"""
+    return f'project:{project_id}'
+
+def user_channel(user_id):
+    """Channel carrying a user's notification events"""
+    return f'user:{user_id}'
+
+def publish_event(channel, type, data):
+    """Publish an event to stream subscribers; failures never break the caller"""
+    try:
+        get_broker().publish(channel, type, data)
+    except Exception as e:
+        logger.error(f"Failed to publish {type} event to {channel}: {e}")
+
+def _subscription_channels(user_id):
+    """Resolve channels for the caller, optionally narrowed to one project"""
+    project_id = request.args.get('project_id', type=int)
+    if project_id is not None:
+        if not has_project_access(project_id, user_id):
+            return None
+        project_ids = [project_id]
+    else:
+        project_ids = get_accessible_project_ids(user_id)
+    return [user_channel(user_id)] + [project_channel(pid) for pid in project_ids]
+
+def _last_event_id():
+    """Resume point from the Last-Event-ID header or query parameter"""
+    value = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+@stream_bp.route('/api/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def event_stream():
+    """Server-Sent Events stream of new messages and notifications"""
+    user_id = get_jwt_identity()
+    channels = _subscription_channels(user_id)
+    if channels is None:
+        return access_denied_response()
+
+    subscription = get_broker().subscribe(channels, _last_event_id())
+    heartbeat = current_app.config.get('STREAM_HEARTBEAT_SECONDS', 15)
+    max_duration = current_app.config.get('STREAM_MAX_DURATION', 300)
+    dumps = current_app.json.dumps
+
+    # Release the DB connection; the stream itself never touches the database
+    db.session.close()
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            # Bounded lifetime frees the worker; EventSource reconnects with Last-Event-ID
+            deadline = time.monotonic() + max_duration
+            while time.monotonic() < deadline:
+                event = subscription.get(timeout=heartbeat)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield event.to_sse(dumps)
+        finally:
+            subscription.close()
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@stream_bp.route('/api/stream/poll', methods=['GET'])
+@jwt_required()
+def poll_events():
+    """Long-poll fallback returning events newer than last_event_id"""
+    user_id = get_jwt_identity()
+    channels = _subscription_channels(user_id)
+    if channels is None:
+        return access_denied_response()
+
+    timeout = min(request.args.get('timeout', 25, type=float), current_app.config.get('STREAM_POLL_TIMEOUT', 25))
+    broker = get_broker()
+    last_event_id = _last_event_id()
+    subscription = broker.subscribe(channels, last_event_id)
+    db.session.close()
+
+    try:
+        first = subscription.get(timeout=max(timeout, 0))
+        events = [first] + subscription.drain(99) if first else []
+    finally:
+        subscription.close()
+
+    return success_response({
+        'events': [event.to_dict() for event in events],
+        'last_event_id': events[-1].id if events else (last_event_id if last_event_id is not None else broker.last_event_id)
+    })
+
+@stream_bp.route('/api/stream/stats', methods=['GET'])
+def stream_stats():
+    """Connection counts and dropped-event metrics; operator-only, like /api/metrics"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        return error_response('Stream stats are disabled', 404)
+    if not bearer_token_matches(token):
+        return error_response('Invalid metrics token', 401)
+    return success_response({'stream': get_broker().stats()})
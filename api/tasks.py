@@ -1,44 +1,85 @@
-from flask import Blueprint, request
+from collections import defaultdict
+from flask import Blueprint, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy.orm import joinedload
-from .models import db, Task, Project
+from sqlalchemy import insert, update, select
+from .models import db, Task, Project, User
 from .validation import validate_json
 from .utils import utc_now, parse_datetime
 from .permissions import require_project_access
-from .pagination import get_pagination_params, format_pagination_response
-from .serializers import serialize_task
+from .membership import get_accessible_project_ids, has_project_access, user_cache_namespaces
+from .shared.cache import cached_view, project_namespace
+from .pagination import get_pagination_params, get_count_mode, paginate, format_pagination_response
+from .serializers import serialize_task, TASK_FIELDS, TASK_RELATIONS
+from .fieldsets import get_requested_fields, load_options
 from .shared.db_operations import safe_db_operation
-from .shared.response_helpers import success_response, not_found_response, created_response
-from .notifications import notify_task_assignment, notify_task_status_change
+from .shared.response_helpers import (
+    success_response, not_found_response, created_response, error_response,
+    validation_error_response, access_denied_response, make_etag, etag_matches, not_modified_response
+)
+from .notifications import notify_task_assignment, notify_task_status_change, notify_bulk_task_changes
+from .project_summary import record_task_change, record_status_deltas, last_activity_select, project_version
+from .user_stats import assigned_tasks_changed_at
+from .shared.background import wake_worker
+from .purge import soft_delete_task, serialize_purge_job
 
 tasks_bp = Blueprint('tasks', __name__)
 
+TASK_STATUSES = ('todo', 'in_progress', 'done')
+TASK_PRIORITIES = ('low', 'medium', 'high')
+WRITABLE_TASK_FIELDS = ('title', 'description', 'assignee_id', 'due_date', 'priority', 'status')
+
+def my_tasks_version(user_id, project_ids):
+    """Version token for the user's assigned tasks without counting them
+
+    A task write bumps its project's last activity and the task's updated_at;
+    reassigning a task away shows up in the former, soft deletes in both.
+    """
+    return (tuple(sorted(project_ids)),) + tuple(db.session.execute(
+        select(last_activity_select(project_ids), assigned_tasks_changed_at(user_id))
+        .execution_options(include_deleted=True)
+    ).one())
+
+def _project_task_namespaces(project_id):
+    """Task lists are shared by every member; non-members bypass the cache"""
+    if not has_project_access(project_id, get_jwt_identity()):
+        return None
+    return [project_namespace(project_id)]
+
 @tasks_bp.route('/api/tasks/my-tasks', methods=['GET'])
 @jwt_required()
+@cached_view(lambda: user_cache_namespaces(get_jwt_identity()))
 @safe_db_operation("fetch my tasks")
 def get_my_tasks():
     """Get all tasks assigned to the current user across all projects"""
     user_id = get_jwt_identity()
     
+    fields, error = get_requested_fields(TASK_FIELDS)
+    if error:
+        return error
+    
+    etag = make_etag(user_id, *my_tasks_version(user_id, get_accessible_project_ids(user_id)))
+    if etag_matches(etag):
+        return not_modified_response(etag)
+    
     page, per_page = get_pagination_params(default_per_page=50)
     
-    # Get all tasks assigned to this user
+    # Get all tasks assigned to this user, joining only what the fields need
     tasks_query = Task.query.options(
-        joinedload(Task.assignee),
-        joinedload(Task.project)
+        *load_options(Task, TASK_FIELDS, TASK_RELATIONS, fields)
     ).filter_by(assignee_id=user_id).order_by(Task.due_date.asc(), Task.created_at.desc())
     
-    tasks_paginated = tasks_query.paginate(page=page, per_page=per_page, error_out=False)
+    tasks_paginated = paginate(tasks_query, page, per_page, get_count_mode(default='estimate'))
     
     response = format_pagination_response(tasks_paginated, 'tasks')
-    response['tasks'] = [serialize_task(task) for task in tasks_paginated.items]
+    response['tasks'] = [serialize_task(task, fields) for task in tasks_paginated.items]
     
-    return success_response(response)
+    return success_response(response, etag=etag)
 
 
 
 @tasks_bp.route('/api/projects/<int:project_id>/tasks', methods=['GET'])
 @jwt_required()
+@cached_view(_project_task_namespaces, vary_on_user=False)
 @safe_db_operation("fetch tasks")
 def get_tasks(project_id):
     user_id = get_jwt_identity()
@@ -47,15 +88,26 @@ def get_tasks(project_id):
     if access_error:
         return access_error
     
+    fields, error = get_requested_fields(TASK_FIELDS)
+    if error:
+        return error
+    
+    etag = make_etag(*project_version(project_id))
+    if etag_matches(etag):
+        return not_modified_response(etag)
+    
     page, per_page = get_pagination_params(default_per_page=20)
     
-    tasks_query = Task.query.options(joinedload(Task.assignee)).filter_by(project_id=project_id)
-    tasks_paginated = tasks_query.paginate(page=page, per_page=per_page, error_out=False)
+    # Stable order so consecutive pages neither skip nor repeat tasks
+    tasks_query = Task.query.options(
+        *load_options(Task, TASK_FIELDS, TASK_RELATIONS, fields)
+    ).filter_by(project_id=project_id).order_by(Task.id)
+    tasks_paginated = paginate(tasks_query, page, per_page, get_count_mode(default='exact'))
     
     response = format_pagination_response(tasks_paginated, 'tasks')
-    response['tasks'] = [serialize_task(task) for task in tasks_paginated.items]
+    response['tasks'] = [serialize_task(task, fields) for task in tasks_paginated.items]
     
-    return success_response(response)
+    return success_response(response, etag=etag)
 
 @tasks_bp.route('/api/projects/<int:project_id>/tasks', methods=['POST'])
 @jwt_required()
@@ -84,12 +136,15 @@ def create_task(project_id):
     )
     
     db.session.add(task)
-    db.session.commit()
+    record_task_change(project_id, new_status=task.status)
     
-    # Send notification if task is assigned
+    # Notification intent is committed atomically with the task
     if task.assignee_id:
         notify_task_assignment(task, task.assignee_id)
     
+    db.session.commit()
+    wake_worker(current_app, 'notification_outbox')
+    
     return created_response(serialize_task(task))
 
 @tasks_bp.route('/api/tasks/<int:task_id>', methods=['PATCH'])
@@ -125,15 +180,18 @@ def update_task(task_id):
         task.priority = data['priority']
     
     task.updated_at = utc_now()
-    db.session.commit()
+    record_task_change(task.project_id, old_status, task.status)
     
-    # Send notifications for changes
+    # Notification intents are committed atomically with the change
     if 'status' in data and old_status != task.status:
         notify_task_status_change(task, old_status, user_id)
     
     if 'assignee_id' in data and old_assignee != task.assignee_id and task.assignee_id:
         notify_task_assignment(task, task.assignee_id)
     
+    db.session.commit()
+    wake_worker(current_app, 'notification_outbox')
+    
     return success_response(serialize_task(task))
 
 @tasks_bp.route('/api/tasks/<int:task_id>', methods=['DELETE'])
@@ -151,11 +209,208 @@ def delete_task(task_id):
     if access_error:
         return access_error
     
-    # Delete related notifications
-    from .models import Notification
-    Notification.query.filter_by(related_task_id=task_id).delete()
-    
-    db.session.delete(task)
+    # Hidden immediately; its notifications are removed by the purge worker
+    record_task_change(task.project_id, old_status=task.status)
+    job = soft_delete_task(task, user_id)
     db.session.commit()
+    wake_worker(current_app, 'purge')
     
-    return success_response({'message': 'Task deleted successfully'})
+    return success_response({'message': 'Task deleted successfully', 'purge_job': serialize_purge_job(job)}, status=202)
+
+def _get_bulk_items():
+    """Read the tasks array of a bulk request, or return an error response"""
+    data = request.get_json(silent=True) or {}
+    items = data.get('tasks')
+    if not isinstance(items, list) or not items:
+        return None, error_response('tasks must be a non-empty list')
+    max_items = current_app.config.get('BULK_MAX_ITEMS', 500)
+    if len(items) > max_items:
+        return None, error_response(f'At most {max_items} tasks per request', 413)
+    return items, None
+
+def _validate_task_item(item, creating):
+    """Validate one bulk item, returning (values, errors)"""
+    if not isinstance(item, dict):
+        return None, {'item': 'Must be an object'}
+
+    errors = {}
+    values = {field: item[field] for field in WRITABLE_TASK_FIELDS if field in item}
+
+    if creating or 'title' in values:
+        title = values.get('title')
+        if not isinstance(title, str) or not title.strip():
+            errors['title'] = 'Title is required'
+        elif len(title) > 200:
+            errors['title'] = 'Title must be at most 200 characters'
+    if 'status' in values and values['status'] not in TASK_STATUSES:
+        errors['status'] = f"Must be one of {', '.join(TASK_STATUSES)}"
+    if 'priority' in values and values['priority'] not in TASK_PRIORITIES:
+        errors['priority'] = f"Must be one of {', '.join(TASK_PRIORITIES)}"
+    if values.get('assignee_id') is not None and (not isinstance(values['assignee_id'], int) or isinstance(values['assignee_id'], bool)):
+        errors['assignee_id'] = 'Must be a user id'
+    if 'due_date' in values:
+        try:
+            values['due_date'] = parse_datetime(values['due_date'])
+        except (TypeError, ValueError, AttributeError):
+            errors['due_date'] = 'Must be an ISO 8601 datetime'
+
+    if creating:
+        values.setdefault('description', '')
+        values.setdefault('priority', 'medium')
+        values.setdefault('status', 'todo')
+    return values, errors
+
+def _check_assignees(values_list, item_errors, indexes):
+    """Flag items whose assignee does not exist, with one lookup for the batch"""
+    assignee_ids = {values['assignee_id'] for values in values_list if values and values.get('assignee_id')}
+    if not assignee_ids:
+        return
+    existing = set(db.session.execute(select(User.id).where(User.id.in_(assignee_ids))).scalars())
+    for index, values in zip(indexes, values_list):
+        if values and values.get('assignee_id') and values['assignee_id'] not in existing:
+            item_errors.setdefault(str(index), {})['assignee_id'] = 'User not found'
+
+def _serialize_tasks_by_id(task_ids):
+    """Load and serialize written tasks in request order with one query"""
+    tasks = Task.query.options(*load_options(Task, TASK_FIELDS, TASK_RELATIONS)).filter(Task.id.in_(task_ids)).all()
+    by_id = {task.id: task for task in tasks}
+    return [serialize_task(by_id[task_id]) for task_id in task_ids if task_id in by_id]
+
+@tasks_bp.route('/api/projects/<int:project_id>/tasks:bulk', methods=['POST'])
+@jwt_required()
+@safe_db_operation("bulk create tasks")
+def bulk_create_tasks(project_id):
+    """Create many tasks in one transaction; nothing is written if any item is invalid"""
+    user_id = get_jwt_identity()
+
+    access_error = require_project_access(project_id, user_id)
+    if access_error:
+        return access_error
+
+    items, error = _get_bulk_items()
+    if error:
+        return error
+
+    rows, item_errors = [], {}
+    for index, item in enumerate(items):
+        values, errors = _validate_task_item(item, creating=True)
+        if errors:
+            item_errors[str(index)] = errors
+        rows.append(values)
+    _check_assignees(rows, item_errors, range(len(rows)))
+    if item_errors:
+        return validation_error_response(item_errors)
+
+    now = utc_now()
+    for values in rows:
+        values.update(project_id=project_id, created_at=now, updated_at=now)
+
+    # One multi-row INSERT; ids come back in the same order as the items
+    created = db.session.execute(
+        insert(Task).returning(Task.id, sort_by_parameter_order=True), rows
+    ).scalars().all()
+
+    status_deltas = defaultdict(int)
+    assignments = defaultdict(list)
+    for task_id, values in zip(created, rows):
+        status_deltas[values['status']] += 1
+        if values.get('assignee_id'):
+            assignments[(values['assignee_id'], project_id)].append({'id': task_id, 'title': values['title']})
+
+    record_status_deltas(project_id, status_deltas, created=len(created), completed=status_deltas['done'])
+    notify_bulk_task_changes(assignments, {}, user_id)
+
+    db.session.commit()
+    wake_worker(current_app, 'notification_outbox')
+
+    return created_response({
+        'results': [{'index': index, 'id': task_id, 'status': 'created'} for index, task_id in enumerate(created)],
+        'tasks': _serialize_tasks_by_id(created)
+    }, f'{len(created)} tasks created')
+
+@tasks_bp.route('/api/tasks:bulk', methods=['PATCH'])
+@jwt_required()
+@safe_db_operation("bulk update tasks")
+def bulk_update_tasks():
+    """Update many tasks by id in one transaction; nothing is written if any item is invalid"""
+    user_id = get_jwt_identity()
+
+    items, error = _get_bulk_items()
+    if error:
+        return error
+
+    changes, item_errors, seen = [], {}, set()
+    for index, item in enumerate(items):
+        values, errors = _validate_task_item(item, creating=False)
+        task_id = item.get('id') if isinstance(item, dict) else None
+        if not isinstance(task_id, int) or isinstance(task_id, bool):
+            errors['id'] = 'Task id is required'
+        elif task_id in seen:
+            errors['id'] = 'Duplicate task id'
+        seen.add(task_id)
+        if errors:
+            item_errors[str(index)] = errors
+        changes.append((task_id, values))
+
+    # Current state of every referenced task in one query
+    current = {
+        row.id: row for row in db.session.execute(
+            select(Task.id, Task.project_id, Task.title, Task.status, Task.assignee_id)
+            .where(Task.id.in_([task_id for task_id, _ in changes if isinstance(task_id, int)]))
+        )
+    }
+    accessible = set(get_accessible_project_ids(user_id))
+    denied = False
+    for index, (task_id, _) in enumerate(changes):
+        if str(index) in item_errors:
+            continue
+        row = current.get(task_id)
+        if row is None:
+            item_errors[str(index)] = {'id': 'Task not found'}
+        elif row.project_id not in accessible:
+            denied = True
+    if denied:
+        return access_denied_response()
+    _check_assignees([values for _, values in changes], item_errors, range(len(changes)))
+    if item_errors:
+        return validation_error_response(item_errors)
+
+    now = utc_now()
+    status_deltas = defaultdict(lambda: defaultdict(int))
+    completions = defaultdict(int)
+    assignments = defaultdict(list)
+    status_changes = defaultdict(list)
+    for task_id, values in changes:
+        row = current[task_id]
+        values.update(id=task_id, updated_at=now)
+        title = values.get('title', row.title)
+        new_status = values.get('status', row.status)
+        new_assignee = values.get('assignee_id', row.assignee_id)
+
+        if new_status != row.status:
+            status_deltas[row.project_id][row.status] -= 1
+            status_deltas[row.project_id][new_status] += 1
+            if new_status == 'done':
+                completions[row.project_id] += 1
+            if new_assignee:
+                status_changes[(new_assignee, row.project_id)].append(
+                    {'id': task_id, 'title': title, 'old_status': row.status, 'new_status': new_status}
+                )
+        if new_assignee and new_assignee != row.assignee_id:
+            assignments[(new_assignee, row.project_id)].append({'id': task_id, 'title': title})
+
+    # ORM bulk UPDATE by primary key, batched into executemany per column set
+    db.session.execute(update(Task), [values for _, values in changes])
+
+    for project_id in {current[task_id].project_id for task_id, _ in changes}:
+        record_status_deltas(project_id, status_deltas.get(project_id, {}), completed=completions[project_id])
+    notify_bulk_task_changes(assignments, status_changes, user_id)
+
+    db.session.commit()
+    wake_worker(current_app, 'notification_outbox')
+
+    task_ids = [task_id for task_id, _ in changes]
+    return success_response({
+        'results': [{'index': index, 'id': task_id, 'status': 'updated'} for index, task_id in enumerate(task_ids)],
+        'tasks': _serialize_tasks_by_id(task_ids)
+    }, f'{len(task_ids)} tasks updated')
@@ -0,0 +1,135 @@
+from collections import Counter
+from flask import current_app
+from sqlalchemy import select, update, func, exists, case
+from .models import db, User, UserStats, Task, Notification, NotificationReadState, NotificationReadMark
+from .shared.db_operations import upsert_counters
+from .shared.cache import invalidate_on_commit, user_namespace
+from .shared.error_tracking import track_performance
+
+def _unread_by_user(condition):
+    """Derived unread counts per user among the notifications matching condition"""
+    is_marked = exists().where(
+        NotificationReadMark.user_id == Notification.user_id,
+        NotificationReadMark.notification_id == Notification.id
+    )
+    return dict(db.session.execute(
+        select(Notification.user_id, func.count(Notification.id))
+        .outerjoin(NotificationReadState, NotificationReadState.user_id == Notification.user_id)
+        .where(condition, Notification.id > func.coalesce(NotificationReadState.read_through_id, 0), ~is_marked)
+        .group_by(Notification.user_id)
+    ).all())
+
+def record_notifications_created(rows):
+    """Count new notifications as unread for their recipients, one upsert per user
+
+    Call it before inserting the rows: the upsert locks each recipient's stats
+    row (in user id order, so concurrent batches can't deadlock) until commit,
+    so a user's notification ids are allocated, and committed, in order.
+    """
+    for user_id, count in sorted(Counter(row['user_id'] for row in rows).items()):
+        upsert_counters(UserStats, {'user_id': user_id}, increments={'unread_notifications': count, 'notifications_version': 1})
+
+def bump_notification_version(user_id):
+    """Mark the user's notification list as changed (read state moved, rows deleted)"""
+    upsert_counters(UserStats, {'user_id': user_id}, increments={'notifications_version': 1})
+
+def record_notification_unread_decrement(user_id):
+    """One notification was read; never drops below zero"""
+    updated = db.session.execute(update(UserStats).where(UserStats.user_id == user_id).values(
+        unread_notifications=case((UserStats.unread_notifications > 0, UserStats.unread_notifications - 1), else_=0),
+        notifications_version=UserStats.notifications_version + 1
+    )).rowcount
+    if not updated:
+        bump_notification_version(user_id)
+
+def record_notifications_deleted(condition):
+    """Discount the unread notifications matching condition before they are deleted or hidden"""
+    unread = _unread_by_user(condition)
+    user_ids = db.session.execute(select(Notification.user_id).where(condition).distinct()).scalars().all()
+    for user_id in user_ids:
+        bump_notification_version(user_id)
+        count = unread.get(user_id, 0)
+        if count:
+            db.session.execute(update(UserStats).where(UserStats.user_id == user_id).values(
+                unread_notifications=case(
+                    (UserStats.unread_notifications > count, UserStats.unread_notifications - count), else_=0
+                )
+            ))
+        invalidate_on_commit(user_namespace(user_id))
+
+def reset_unread_counter(user_id, unread_select):
+    """Set the counter from a derived unread COUNT, evaluated in the same statement"""
+    upsert_counters(UserStats, {'user_id': user_id}, values={'unread_notifications': unread_select.scalar_subquery()})
+
+def get_unread_count(user_id):
+    """The user's maintained unread counter; never reads the notification table"""
+    return db.session.execute(
+        select(UserStats.unread_notifications).where(UserStats.user_id == user_id)
+    ).scalar() or 0
+
+def notification_list_version(user_id):
+    """Version token for a user's notification list: unread counter and list version
+
+    Creating, deleting or reading notifications bumps notifications_version, so
+    this is one primary-key lookup instead of a COUNT over notification.
+    """
+    row = db.session.execute(
+        select(UserStats.unread_notifications, UserStats.notifications_version).where(UserStats.user_id == user_id)
+    ).first()
+    return tuple(row) if row else (0, 0)
+
+def assigned_tasks_changed_at(user_id):
+    """Scalar subquery: newest updated_at among the user's assigned tasks (ix_task_assignee_updated)
+
+    Run it with include_deleted=True: a soft delete bumps updated_at, and
+    hiding the task must change the version.
+    """
+    return select(func.max(Task.updated_at)).where(Task.assignee_id == user_id).scalar_subquery()
+
+@track_performance("reconcile unread counters")
+def reconcile_unread_counters(after_user_id=0, batch_size=500):
+    """Compare a batch of users' counters with derived unread counts and repair drift
+
+    Returns (users checked, counters repaired, last user id checked). Repairs
+    are compare-and-set, so a counter that moved meanwhile is left for the
+    next pass instead of being overwritten with a stale count.
+    """
+    user_ids = db.session.execute(
+        select(User.id).where(User.id > after_user_id).order_by(User.id).limit(batch_size)
+    ).scalars().all()
+    if not user_ids:
+        return 0, 0, None
+
+    actual = _unread_by_user(Notification.user_id.in_(user_ids))
+    stored = dict(db.session.execute(
+        select(UserStats.user_id, UserStats.unread_notifications).where(UserStats.user_id.in_(user_ids))
+    ).all())
+
+    repaired = 0
+    for user_id in user_ids:
+        expected = actual.get(user_id, 0)
+        if user_id not in stored:
+            if expected:
+                upsert_counters(UserStats, {'user_id': user_id}, values={'unread_notifications': expected})
+                invalidate_on_commit(user_namespace(user_id))
+                repaired += 1
+            continue
+        if stored[user_id] != expected:
+            repaired += db.session.execute(update(UserStats).where(
+                UserStats.user_id == user_id, UserStats.unread_notifications == stored[user_id]
+            ).values(unread_notifications=expected)).rowcount
+            invalidate_on_commit(user_namespace(user_id))
+    db.session.commit()
+    return len(user_ids), repaired, user_ids[-1]
+
+def run_unread_reconciliation():
+    """Periodic job: reconcile the next batch of users, wrapping around at the end
+
+    Returns the repairs made, so the worker keeps going while it finds drift.
+    """
+    cursor = current_app.extensions.get('unread_reconcile_cursor', 0)
+    _, repaired, last_user_id = reconcile_unread_counters(
+        cursor, current_app.config.get('UNREAD_RECONCILE_BATCH_SIZE', 500)
+    )
+    current_app.extensions['unread_reconcile_cursor'] = last_user_id or 0
+    return repaired
@@ -0,0 +1,46 @@
+"""Add denormalized project summary counters
+
+Revision ID: 004
+Revises: 003
+Create Date: 2025-02-03 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('project_summary',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('todo_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('in_progress_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('done_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('member_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('last_activity_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['project.id'], ),
+    sa.PrimaryKeyConstraint('project_id')
+    )
+    op.create_index('ix_project_summary_last_activity_at', 'project_summary', ['last_activity_at'])
+
+    # Backfill counters for existing projects
+    op.execute("""
+        INSERT INTO project_summary (project_id, todo_count, in_progress_count, done_count, member_count, last_activity_at)
+        SELECT p.id,
+            (SELECT COUNT(*) FROM task t WHERE t.project_id = p.id AND t.status = 'todo'),
+            (SELECT COUNT(*) FROM task t WHERE t.project_id = p.id AND t.status = 'in_progress'),
+            (SELECT COUNT(*) FROM task t WHERE t.project_id = p.id AND t.status = 'done'),
+            (SELECT COUNT(*) FROM project_member m WHERE m.project_id = p.id),
+            COALESCE((SELECT MAX(t.updated_at) FROM task t WHERE t.project_id = p.id), p.created_at)
+        FROM project p
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_project_summary_last_activity_at', 'project_summary')
+    op.drop_table('project_summary')
@@ -0,0 +1,80 @@
+"""Add full-text search indexes
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-02-12 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # Expression indexes; queries must build the identical expressions
+        op.execute(
+            "CREATE INDEX ix_task_search ON task USING gin (("
+            "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')))"
+        )
+        op.execute(
+            "CREATE INDEX ix_message_search ON message USING gin ("
+            "to_tsvector('english'::regconfig, content))"
+        )
+    elif bind.dialect.name == 'sqlite':
+        # External-content FTS5 tables kept in sync by triggers
+        op.execute(
+            "CREATE VIRTUAL TABLE task_fts USING fts5("
+            "title, description, content='task', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER task_fts_ai AFTER INSERT ON task BEGIN "
+            "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER task_fts_ad AFTER DELETE ON task BEGIN "
+            "INSERT INTO task_fts(task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER task_fts_au AFTER UPDATE OF title, description ON task BEGIN "
+            "INSERT INTO task_fts(task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+            "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+        )
+        op.execute(
+            "CREATE VIRTUAL TABLE message_fts USING fts5("
+            "content, content='message', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER message_fts_ai AFTER INSERT ON message BEGIN "
+            "INSERT INTO message_fts(rowid, content) VALUES (new.id, new.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER message_fts_ad AFTER DELETE ON message BEGIN "
+            "INSERT INTO message_fts(message_fts, rowid, content) VALUES ('delete', old.id, old.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER message_fts_au AFTER UPDATE OF content ON message BEGIN "
+            "INSERT INTO message_fts(message_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+            "INSERT INTO message_fts(rowid, content) VALUES (new.id, new.content); END"
+        )
+        op.execute("INSERT INTO task_fts(task_fts) VALUES ('rebuild')")
+        op.execute("INSERT INTO message_fts(message_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.drop_index('ix_message_search', 'message')
+        op.drop_index('ix_task_search', 'task')
+    elif bind.dialect.name == 'sqlite':
+        for trigger in ('task_fts_ai', 'task_fts_ad', 'task_fts_au', 'message_fts_ai', 'message_fts_ad', 'message_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS task_fts")
+        op.execute("DROP TABLE IF EXISTS message_fts")
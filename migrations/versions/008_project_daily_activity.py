@@ -0,0 +1,35 @@
+"""Add project daily activity rollups
+
+Revision ID: 008
+Revises: 007
+Create Date: 2025-02-14 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('project_daily_activity',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('tasks_created', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('tasks_completed', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('messages_posted', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('todo_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('in_progress_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('done_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.ForeignKeyConstraint(['project_id'], ['project.id'], ),
+    sa.PrimaryKeyConstraint('project_id', 'day')
+    )
+    # Populate with `flask activity backfill`
+
+
+def downgrade():
+    op.drop_table('project_daily_activity')
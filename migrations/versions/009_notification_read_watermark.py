@@ -0,0 +1,69 @@
+"""Replace per-row notification read flags with a read watermark
+
+Revision ID: 009
+Revises: 008
+Create Date: 2025-02-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notification_read_state',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('read_through_id', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('read_through_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('notification_read_mark',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('notification_id', sa.Integer(), nullable=False),
+    sa.Column('read_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['notification_id'], ['notification.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'notification_id')
+    )
+
+    if not sa.inspect(op.get_bind()).has_table('notification'):
+        return
+
+    # Watermark just below each user's oldest unread notification (or at the
+    # newest one when everything is read); reads above it become marks
+    op.execute(
+        "INSERT INTO notification_read_state (user_id, read_through_id, read_through_at) "
+        "SELECT user_id, COALESCE(MIN(CASE WHEN NOT is_read THEN id END) - 1, MAX(id)), MAX(read_at) "
+        "FROM notification GROUP BY user_id"
+    )
+    op.execute(
+        "INSERT INTO notification_read_mark (user_id, notification_id, read_at) "
+        "SELECT n.user_id, n.id, COALESCE(n.read_at, n.created_at) FROM notification n "
+        "JOIN notification_read_state s ON s.user_id = n.user_id "
+        "WHERE n.is_read AND n.id > s.read_through_id"
+    )
+
+    # Read flips no longer touch notification rows or their indexes
+    op.execute('DROP INDEX IF EXISTS ix_notification_user_unread')
+    op.execute('DROP INDEX IF EXISTS ix_notification_is_read')
+
+
+def downgrade():
+    if sa.inspect(op.get_bind()).has_table('notification'):
+        op.execute(
+            "UPDATE notification SET is_read = "
+            "(id <= COALESCE((SELECT s.read_through_id FROM notification_read_state s "
+            "WHERE s.user_id = notification.user_id), 0) "
+            "OR EXISTS (SELECT 1 FROM notification_read_mark m "
+            "WHERE m.user_id = notification.user_id AND m.notification_id = notification.id))"
+        )
+        op.create_index('ix_notification_is_read', 'notification', ['is_read'])
+        op.create_index('ix_notification_user_unread', 'notification', ['user_id', 'is_read', 'created_at'])
+    op.drop_table('notification_read_mark')
+    op.drop_table('notification_read_state')
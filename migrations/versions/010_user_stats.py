@@ -0,0 +1,42 @@
+"""Add per-user stats with a maintained unread notification counter
+
+Revision ID: 010
+Revises: 009
+Create Date: 2025-02-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('unread_notifications', sa.Integer(), nullable=False, server_default='0'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    if not sa.inspect(op.get_bind()).has_table('notification'):
+        return
+
+    # Seed counters from the derived read state: above the watermark, not marked
+    op.execute(
+        "INSERT INTO user_stats (user_id, unread_notifications) "
+        "SELECT n.user_id, COUNT(n.id) FROM notification n "
+        "LEFT JOIN notification_read_state s ON s.user_id = n.user_id "
+        "WHERE n.id > COALESCE(s.read_through_id, 0) "
+        "AND NOT EXISTS (SELECT 1 FROM notification_read_mark m "
+        "WHERE m.user_id = n.user_id AND m.notification_id = n.id) "
+        "GROUP BY n.user_id"
+    )
+
+
+def downgrade():
+    op.drop_table('user_stats')
@@ -0,0 +1,48 @@
+"""Soft-delete projects and tasks and add purge jobs
+
+Revision ID: 011
+Revises: 010
+Create Date: 2025-02-21 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('project', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_project_deleted_at', 'project', ['deleted_at'])
+    op.add_column('task', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_task_deleted_at', 'task', ['deleted_at'])
+
+    op.create_table('purge_job',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('target_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('step', sa.String(length=30), nullable=True),
+    sa.Column('rows_deleted', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_purge_job_status', 'purge_job', ['status'])
+
+
+def downgrade():
+    op.drop_index('ix_purge_job_status', 'purge_job')
+    op.drop_table('purge_job')
+    op.drop_index('ix_task_deleted_at', 'task')
+    op.drop_column('task', 'deleted_at')
+    op.drop_index('ix_project_deleted_at', 'project')
+    op.drop_column('project', 'deleted_at')
@@ -0,0 +1,25 @@
+"""Add maintained version sources for conditional GETs
+
+Revision ID: 012
+Revises: 011
+Create Date: 2025-02-24 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user_stats', sa.Column('notifications_version', sa.Integer(), nullable=False, server_default='0'))
+    op.create_index('ix_task_assignee_updated', 'task', ['assignee_id', 'updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_task_assignee_updated', 'task')
+    op.drop_column('user_stats', 'notifications_version')
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark the bulk task endpoints against the single-item ones
+
+Creates and then updates --items tasks (each assigned, so notification
+intents are written too) once item by item and once through
+POST /api/projects/<id>/tasks:bulk and PATCH /api/tasks:bulk.
+
+    python scripts/bench_bulk_tasks.py --items 100 500
+"""
+import argparse
+import time
+from bench_common import create_bench_app, create_user, create_project, auth_headers, print_table
+from api.models import db, ProjectMember
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, nargs='+', default=[100, 500])
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    client = app.test_client()
+    owner_id = create_user('owner')
+    assignee_id = create_user('assignee')
+    project_id = create_project(owner_id)
+    db.session.add(ProjectMember(project_id=project_id, user_id=assignee_id))
+    db.session.commit()
+    headers = auth_headers(owner_id)
+
+    def item(index):
+        return {'title': f'Task {index}', 'assignee_id': assignee_id, 'priority': 'high'}
+
+    rows = []
+    for count in args.items:
+        created = []
+
+        def create_singly():
+            for index in range(count):
+                response = client.post(f'/api/projects/{project_id}/tasks', json=item(index), headers=headers)
+                assert response.status_code == 201, response.status_code
+                created.append(response.get_json()['id'])
+
+        def update_singly():
+            for task_id in created:
+                response = client.patch(f'/api/tasks/{task_id}', json={'status': 'done'}, headers=headers)
+                assert response.status_code == 200, response.status_code
+
+        bulk_ids = []
+
+        def create_bulk():
+            response = client.post(f'/api/projects/{project_id}/tasks:bulk',
+                                   json={'tasks': [item(index) for index in range(count)]}, headers=headers)
+            assert response.status_code == 201, response.status_code
+            bulk_ids.extend(result['id'] for result in response.get_json()['results'])
+
+        def update_bulk():
+            response = client.patch('/api/tasks:bulk',
+                                    json={'tasks': [{'id': task_id, 'status': 'done'} for task_id in bulk_ids]}, headers=headers)
+            assert response.status_code == 200, response.status_code
+
+        for operation, single, bulk in (('create', create_singly, create_bulk), ('update', update_singly, update_bulk)):
+            single_s, bulk_s = timed(single), timed(bulk)
+            rows.append({
+                'items': count,
+                'operation': operation,
+                'single_ms': round(single_s * 1000, 1),
+                'bulk_ms': round(bulk_s * 1000, 1),
+                'single_tasks_per_s': round(count / single_s),
+                'bulk_tasks_per_s': round(count / bulk_s),
+                'speedup': f'{single_s / bulk_s:.1f}x'
+            })
+
+    print(f'Single-item vs bulk task endpoints on {db.engine.dialect.name}')
+    print_table(rows, ['items', 'operation', 'single_ms', 'bulk_ms', 'single_tasks_per_s', 'bulk_tasks_per_s', 'speedup'])
+
+if __name__ == '__main__':
+    main()
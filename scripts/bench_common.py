@@ -0,0 +1,89 @@
+"""Shared setup for the scripts/bench_*.py benchmarks
+
+Benchmarks create their own data, so they run against BENCH_DATABASE_URL
+(a throwaway SQLite file by default) and never against DATABASE_URL.
+Background workers and the response cache are switched off so that every
+timed request does its full work.
+"""
+import atexit
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_database_file = None
+if os.getenv('BENCH_DATABASE_URL'):
+    os.environ['DATABASE_URL'] = os.environ['BENCH_DATABASE_URL']
+else:
+    _database_file = tempfile.NamedTemporaryFile(prefix='synergysphere-bench-', suffix='.db', delete=False).name
+    os.environ['DATABASE_URL'] = f'sqlite:///{_database_file}'
+os.environ.pop('POSTGRES_URL', None)
+os.environ.setdefault('FLASK_ENV', 'development')
+for flag in ('OUTBOX_DISPATCHER_ENABLED', 'UNREAD_RECONCILE_ENABLED', 'PURGE_WORKER_ENABLED'):
+    os.environ[flag] = 'false'
+os.environ.setdefault('RESPONSE_CACHE_BACKEND', 'none')
+os.environ.setdefault('LOG_MODE', 'sync')
+
+from flask_jwt_extended import create_access_token
+from api import create_app
+from api.models import db, User, Project
+
+def create_bench_app(quiet=True):
+    """App with a fresh schema and a pushed app context"""
+    if quiet:
+        logging.disable(logging.CRITICAL)
+    app = create_app()
+    app.config['TESTING'] = True
+    app.app_context().push()
+    db.drop_all()
+    db.create_all()
+    return app
+
+@atexit.register
+def _remove_database_file():
+    if _database_file and os.path.exists(_database_file):
+        os.remove(_database_file)
+
+def create_user(name='bench'):
+    """Insert a user and return its id (request teardown detaches instances)"""
+    user = User(name=name, email=f'{name}@bench.local', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+def create_project(owner_id, name='Bench project'):
+    """Insert a project and return its id"""
+    project = Project(name=name, description='', owner_id=owner_id)
+    db.session.add(project)
+    db.session.commit()
+    return project.id
+
+def auth_headers(user_id):
+    return {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+
+def measure(fn, repeat=20, warmup=3):
+    """Run fn repeatedly; returns {'median_ms', 'p95_ms'} over the timed runs"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3)
+    }
+
+def print_table(rows, columns):
+    """Print rows (dicts) as an aligned text table"""
+    widths = {column: max(len(column), *(len(str(row.get(column, ''))) for row in rows)) for column in columns}
+    print('  '.join(column.ljust(widths[column]) for column in columns))
+    print('  '.join('-' * widths[column] for column in columns))
+    for row in rows:
+        print('  '.join(str(row.get(column, '')).ljust(widths[column]) for column in columns))
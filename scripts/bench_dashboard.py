@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/dashboard/stats as a user's assigned task count grows
+
+The stats come from conditional aggregates, so latency should stay roughly
+flat; load_rows_ms times loading the same tasks as ORM objects, which is what
+the endpoint did before, for comparison.
+
+    python scripts/bench_dashboard.py --sizes 100 1000 10000 50000
+"""
+import argparse
+import random
+from datetime import timedelta
+from sqlalchemy import insert
+from bench_common import (
+    create_bench_app, create_user, create_project, auth_headers, measure, print_table
+)
+from api.models import db, Task
+from api.project_summary import rebuild_project_summaries
+from api.utils import utc_now
+
+STATUSES = ('todo', 'in_progress', 'done')
+
+def add_tasks(project_id, user_id, count):
+    now = utc_now()
+    rows = [{
+        'project_id': project_id,
+        'title': f'Task {index}',
+        'description': '',
+        'assignee_id': user_id,
+        'status': random.choice(STATUSES),
+        'priority': 'medium',
+        'due_date': now + timedelta(days=random.randint(-10, 30)),
+        'created_at': now - timedelta(days=random.randint(0, 30)),
+        'updated_at': now
+    } for index in range(count)]
+    for start in range(0, len(rows), 5000):
+        db.session.execute(insert(Task), rows[start:start + 5000])
+    db.session.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    client = app.test_client()
+    user_id = create_user()
+    project_id = create_project(user_id)
+    headers = auth_headers(user_id)
+
+    rows, total = [], 0
+    for size in sorted(args.sizes):
+        add_tasks(project_id, user_id, size - total)
+        total = size
+        rebuild_project_summaries([project_id])
+
+        def fetch_stats():
+            response = client.get('/api/dashboard/stats', headers=headers)
+            assert response.status_code == 200, response.status_code
+
+        def load_rows():
+            Task.query.filter_by(assignee_id=user_id).all()
+            db.session.expunge_all()
+
+        stats = measure(fetch_stats, args.repeat)
+        rows.append({
+            'tasks': size,
+            'median_ms': stats['median_ms'],
+            'p95_ms': stats['p95_ms'],
+            'load_rows_ms': measure(load_rows, max(3, args.repeat // 4), warmup=1)['median_ms']
+        })
+
+    print(f'GET /api/dashboard/stats on {db.engine.dialect.name}')
+    print_table(rows, ['tasks', 'median_ms', 'p95_ms', 'load_rows_ms'])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark ?fields= sparse fieldsets against the full list payloads
+
+Times a page of each list endpoint with and without ?fields= and reports
+the response size, so the saving in bytes and in joined relations shows up
+next to the latency.
+
+    python scripts/bench_fieldsets.py --per-page 20 100
+"""
+import argparse
+from datetime import timedelta
+from sqlalchemy import insert
+from bench_common import create_bench_app, create_user, create_project, auth_headers, measure, print_table
+from api.models import db, Task, Message, Notification
+from api.utils import utc_now
+
+ROWS = 2000
+
+def add_rows(project_id, user_id):
+    now = utc_now()
+    description = 'Acceptance criteria and notes for the task. ' * 5
+    db.session.execute(insert(Task), [{
+        'project_id': project_id, 'title': f'Task {index}', 'description': description, 'assignee_id': user_id,
+        'status': 'todo', 'priority': 'medium', 'due_date': now + timedelta(days=index % 30),
+        'created_at': now, 'updated_at': now
+    } for index in range(ROWS)])
+    db.session.execute(insert(Message), [{
+        'project_id': project_id, 'user_id': user_id, 'content': f'Message {index} about the release plan',
+        'created_at': now - timedelta(seconds=index)
+    } for index in range(ROWS)])
+    db.session.execute(insert(Notification), [{
+        'user_id': user_id, 'type': 'task_assigned', 'title': 'Task assigned', 'message': f'You were assigned Task {index}',
+        'related_project_id': project_id, 'created_at': now - timedelta(seconds=index)
+    } for index in range(ROWS)])
+    db.session.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--per-page', type=int, nargs='+', default=[20, 100])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    client = app.test_client()
+    user_id = create_user()
+    project_id = create_project(user_id)
+    headers = auth_headers(user_id)
+    add_rows(project_id, user_id)
+
+    # endpoint -> the compact fieldset a list view would ask for
+    endpoints = (
+        (f'/api/projects/{project_id}/tasks', 'id,title,status,due_date'),
+        ('/api/tasks/my-tasks', 'id,title,status,project_name'),
+        (f'/api/projects/{project_id}/messages', 'id,content,user_name,created_at'),
+        ('/api/notifications', 'id,title,is_read'),
+    )
+
+    rows = []
+    for per_page in args.per_page:
+        for endpoint, fields in endpoints:
+            for label, query in (('full', ''), (fields, f'&fields={fields}')):
+                url = f'{endpoint}?per_page={per_page}&count=none{query}'
+
+                def fetch_page():
+                    response = client.get(url, headers=headers)
+                    assert response.status_code == 200, (url, response.status_code)
+                    return response
+                rows.append({
+                    'per_page': per_page, 'endpoint': endpoint, 'fields': label,
+                    'bytes': len(fetch_page().data), **measure(fetch_page, args.repeat)
+                })
+
+    print(f'List pages with and without ?fields= on {db.engine.dialect.name}')
+    print_table(rows, ['per_page', 'endpoint', 'fields', 'bytes', 'median_ms', 'p95_ms'])
+
+if __name__ == '__main__':
+    main()
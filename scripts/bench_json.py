@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark JSON encoding of list payloads
+
+Serializes pages of tasks, messages and notifications with the API
+serializers, then encodes each page with:
+
+- flask-default: Flask's DefaultJSONProvider (stdlib json)
+- fast-stdlib: FastJSONProvider with its stdlib fallback
+- fast-orjson: FastJSONProvider with orjson, when installed
+
+    python scripts/bench_json.py --sizes 20 100 1000
+"""
+import argparse
+from datetime import timedelta
+from unittest import mock
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+from bench_common import create_bench_app, create_user, create_project, measure, print_table
+from api.models import db, Task, Message, Notification
+from api.notification_reads import apply_read_state
+from api.serializers import serialize_task, serialize_message, serialize_notification
+from api.shared import json_provider
+from api.utils import utc_now
+
+def add_rows(project_id, user_id, count):
+    now = utc_now()
+    description = 'Acceptance criteria and notes for the task. ' * 5
+    db.session.execute(insert(Task), [{
+        'project_id': project_id, 'title': f'Task {index}', 'description': description, 'assignee_id': user_id,
+        'status': 'todo', 'priority': 'medium', 'due_date': now + timedelta(days=index % 30),
+        'created_at': now, 'updated_at': now
+    } for index in range(count)])
+    db.session.execute(insert(Message), [{
+        'project_id': project_id, 'user_id': user_id, 'content': f'Message {index} about the release plan',
+        'created_at': now - timedelta(seconds=index)
+    } for index in range(count)])
+    db.session.commit()
+    task_ids = db.session.execute(db.select(Task.id)).scalars().all()
+    db.session.execute(insert(Notification), [{
+        'user_id': user_id, 'type': 'task_assigned', 'title': 'Task assigned', 'message': f'You were assigned Task {index}',
+        'related_project_id': project_id, 'related_task_id': task_ids[index], 'created_at': now - timedelta(seconds=index)
+    } for index in range(count)])
+    db.session.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    app.debug = False  # compact output, as in production
+    user_id = create_user()
+    project_id = create_project(user_id)
+    largest = max(args.sizes)
+    add_rows(project_id, user_id, largest)
+
+    tasks = Task.query.options(joinedload(Task.project), joinedload(Task.assignee)).limit(largest).all()
+    messages = Message.query.options(joinedload(Message.user)).limit(largest).all()
+    notifications = apply_read_state(user_id, Notification.query.options(
+        joinedload(Notification.project), joinedload(Notification.task)
+    ).limit(largest).all())
+    payloads = (
+        ('tasks', tasks, serialize_task),
+        ('messages', messages, serialize_message),
+        ('notifications', notifications, serialize_notification),
+    )
+
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = json_provider.FastJSONProvider(app)
+
+    def fast_stdlib(obj):
+        with mock.patch.object(json_provider, 'ORJSON_AVAILABLE', False):
+            return fast_provider.dumps_bytes(obj)
+
+    encoders = [
+        ('flask-default', lambda obj: default_provider.dumps(obj).encode('utf-8')),
+        ('fast-stdlib', fast_stdlib),
+    ]
+    if json_provider.ORJSON_AVAILABLE:
+        encoders.append(('fast-orjson', fast_provider.dumps_bytes))
+
+    rows = []
+    for size in args.sizes:
+        for name, objects, serialize in payloads:
+            page = objects[:size]
+            serialized = measure(lambda: [serialize(obj) for obj in page], args.repeat)
+            body = {name: [serialize(obj) for obj in page], 'pagination': {'page': 1, 'per_page': size}}
+            for encoder, encode in encoders:
+                rows.append({
+                    'page_size': size,
+                    'payload': name,
+                    'serialize_ms': serialized['median_ms'],
+                    'encoder': encoder,
+                    'encode_ms': measure(lambda: encode(body), args.repeat)['median_ms'],
+                    'bytes': len(encode(body))
+                })
+
+    print(f"JSON encoding per page (orjson {'installed' if json_provider.ORJSON_AVAILABLE else 'not installed'})")
+    print_table(rows, ['page_size', 'payload', 'serialize_ms', 'encoder', 'encode_ms', 'bytes'])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-request cost of the logging pipeline
+
+Times a request that logs "Starting"/"Completed" operation records with
+logging off, with LOG_MODE=sync (format and write on the request thread),
+with LOG_MODE=async (enqueue only) and with async plus success-log
+sampling. Output goes to /dev/null so terminal speed doesn't count; the
+overhead column is relative to logging off.
+
+    python scripts/bench_logging.py --repeat 500 --rounds 5
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+from bench_common import create_bench_app, create_user, auth_headers, measure, print_table
+from api.shared.logging_config import setup_logging, logging_stats
+
+# mode name -> config applied before setup_logging
+MODES = (
+    ('off', None),
+    ('sync', {'LOG_MODE': 'sync', 'LOG_SAMPLE_RATE': 1.0}),
+    ('async', {'LOG_MODE': 'async', 'LOG_SAMPLE_RATE': 1.0}),
+    ('async, 10% sampled', {'LOG_MODE': 'async', 'LOG_SAMPLE_RATE': 0.1}),
+)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_bench_app(quiet=False)
+    client = app.test_client()
+    user_id = create_user()
+    headers = auth_headers(user_id)
+    # Logged through safe_db_operation on every request
+    url = '/api/notifications'
+
+    def fetch():
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, response.status_code
+
+    # Modes alternate over several rounds so drift in the process doesn't favour one
+    stdout, medians, p95s, dropped = sys.stdout, {}, {}, {}
+    devnull = open(os.devnull, 'w')
+    sys.stdout = devnull
+    try:
+        for _ in range(args.rounds):
+            for name, config in MODES:
+                logging.disable(logging.CRITICAL if config is None else logging.NOTSET)
+                app.config.update(config or {'LOG_MODE': 'sync'})
+                setup_logging(app)
+                timing = measure(fetch, args.repeat // args.rounds, warmup=20)
+                medians.setdefault(name, []).append(timing['median_ms'])
+                p95s.setdefault(name, []).append(timing['p95_ms'])
+                dropped[name] = logging_stats(app).get('dropped', '')
+    finally:
+        # Stops the async listener before stdout is restored
+        app.config['LOG_MODE'] = 'sync'
+        setup_logging(app)
+        sys.stdout = stdout
+        devnull.close()
+
+    rows = [{
+        'mode': name,
+        'median_ms': round(statistics.median(medians[name]), 3),
+        'p95_ms': round(statistics.median(p95s[name]), 3),
+        'dropped': dropped[name]
+    } for name, _ in MODES]
+    baseline = rows[0]['median_ms']
+    for row in rows:
+        row['overhead_ms'] = round(row['median_ms'] - baseline, 3)
+    print(f'GET {url} per request')
+    print_table(rows, ['mode', 'median_ms', 'p95_ms', 'overhead_ms', 'dropped'])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /api/search on a large message corpus
+
+Loads a synthetic corpus (a million messages by default), builds the search
+index the way `flask rebuild-search-index` does, then times first pages and
+cursor pages for common, rare, multi-word and prefix queries. The target is
+a median under 100 ms.
+
+    python scripts/bench_search.py --messages 1000000
+    BENCH_DATABASE_URL=postgresql://... python scripts/bench_search.py
+"""
+import argparse
+import random
+from sqlalchemy import insert
+from bench_common import create_bench_app, create_user, create_project, auth_headers, measure, print_table
+from api.models import db, Task, Message
+from api.search import rebuild_search_index
+from api.utils import utc_now
+
+BATCH_SIZE = 20000
+TARGET_MS = 100
+
+# Common words first; the corpus draws them with a Zipf-like skew
+VOCABULARY = (
+    'update release deploy review meeting design backend frontend database migration sprint deadline '
+    'customer feedback invoice budget roadmap prototype testing staging production incident rollback '
+    'dashboard analytics onboarding security audit compliance latency throughput cache index search '
+    'notification export import archive payroll vendor contract proposal workshop retrospective '
+    'kubernetes terraform grafana postgres redis webhook oauth sandbox benchmark quarterly'
+).split()
+QUERIES = ('release', 'quarterly', 'database migration', 'deploy prod', 'kubernetes rollback')
+
+def sentence(rng, weights, length):
+    return ' '.join(rng.choices(VOCABULARY, weights, k=length)).capitalize() + '.'
+
+def add_corpus(project_id, user_id, messages, tasks):
+    rng = random.Random(17)
+    weights = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+    now = utc_now()
+    for start in range(0, messages, BATCH_SIZE):
+        db.session.execute(insert(Message), [{
+            'project_id': project_id, 'user_id': user_id, 'content': sentence(rng, weights, rng.randint(6, 30)),
+            'created_at': now
+        } for _ in range(min(BATCH_SIZE, messages - start))])
+        db.session.commit()
+    db.session.execute(insert(Task), [{
+        'project_id': project_id, 'title': sentence(rng, weights, 4), 'description': sentence(rng, weights, 40),
+        'assignee_id': user_id, 'status': 'todo', 'priority': 'medium', 'created_at': now, 'updated_at': now
+    } for _ in range(tasks)])
+    db.session.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=1000000)
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    client = app.test_client()
+    user_id = create_user()
+    project_id = create_project(user_id)
+    headers = auth_headers(user_id)
+    add_corpus(project_id, user_id, args.messages, args.tasks)
+    rebuild_search_index()
+
+    def fetch(url):
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, (url, response.status_code)
+        return response.get_json()
+
+    rows = []
+    for q in QUERIES:
+        first_page = f'/api/search?q={q}&per_page=20'
+        cursor = fetch(first_page)['pagination']['next_cursor']
+        pages = [('first', first_page)]
+        if cursor:
+            pages.append(('second', f'{first_page}&after={cursor}'))
+        for page, url in pages:
+            timing = measure(lambda: fetch(url), args.repeat)
+            rows.append({'q': q, 'page': page, **timing, 'under_target': timing['median_ms'] < TARGET_MS})
+
+    print(f'GET /api/search over {args.messages} messages and {args.tasks} tasks on {db.engine.dialect.name}')
+    print_table(rows, ['q', 'page', 'median_ms', 'p95_ms', 'under_target'])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /api/messages/<id>/thread on deeply nested threads
+
+Builds reply chains of increasing depth (each reply fanning out to a few
+siblings) and reports the SQL statements and latency per request. The
+thread itself is one recursive statement at every depth; the level-by-level
+baseline issues one query per level, as a client walking parent_id would.
+
+    python scripts/bench_thread.py --depths 5 20 100
+"""
+import argparse
+from sqlalchemy import event, select
+from bench_common import create_bench_app, create_user, create_project, auth_headers, measure, print_table
+from api.models import db, Message
+from api.utils import utc_now
+
+def add_thread(project_id, user_id, depth, fanout):
+    """A chain of depth replies, each with fanout - 1 leaf siblings; returns the root id"""
+    now = utc_now()
+    root = Message(project_id=project_id, user_id=user_id, content='Thread root', created_at=now)
+    db.session.add(root)
+    db.session.flush()
+    parent_id = root.id
+    for level in range(depth):
+        replies = [Message(project_id=project_id, user_id=user_id, parent_id=parent_id,
+                           content=f'Reply {level}.{index}', created_at=now) for index in range(fanout)]
+        db.session.add_all(replies)
+        db.session.flush()
+        parent_id = replies[0].id
+    db.session.commit()
+    return root.id
+
+def load_level_by_level(root_id):
+    """Baseline: one query per reply level"""
+    level = [root_id]
+    while level:
+        level = db.session.execute(select(Message.id).where(Message.parent_id.in_(level))).scalars().all()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--depths', type=int, nargs='+', default=[5, 20, 100])
+    parser.add_argument('--fanout', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    app.config['THREAD_MAX_DEPTH'] = max(app.config.get('THREAD_MAX_DEPTH', 100), *args.depths)
+    client = app.test_client()
+    user_id = create_user()
+    project_id = create_project(user_id)
+    headers = auth_headers(user_id)
+
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *event_args: statements.append(event_args[2]))
+
+    def count_statements(fn):
+        statements.clear()
+        fn()
+        return len(statements)
+
+    rows = []
+    for depth in args.depths:
+        root_id = add_thread(project_id, user_id, depth, args.fanout)
+
+        def fetch_thread():
+            response = client.get(f'/api/messages/{root_id}/thread', headers=headers)
+            assert response.status_code == 200, response.status_code
+            assert response.get_json()['depth'] == depth
+        rows.append({'depth': depth, 'messages': depth * args.fanout + 1, 'method': 'thread endpoint',
+                     'statements': count_statements(fetch_thread), **measure(fetch_thread, args.repeat)})
+        rows.append({'depth': depth, 'messages': depth * args.fanout + 1, 'method': 'level-by-level',
+                     'statements': count_statements(lambda: load_level_by_level(root_id)),
+                     **measure(lambda: load_level_by_level(root_id), args.repeat)})
+
+    print(f'Thread loading on {db.engine.dialect.name}; endpoint statements include the access lookup until it is cached')
+    print_table(rows, ['depth', 'messages', 'method', 'statements', 'median_ms', 'p95_ms'])
+
+if __name__ == '__main__':
+    main()
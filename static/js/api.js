@@ -35,15 +35,18 @@ class API {
     static async request(endpoint, options = {}) {
         const url = `${API_BASE}${endpoint}`;
         const requestId = Math.random().toString(36).substr(2, 9);
+        const isGet = !options.method || options.method === 'GET';
+        const cached = isGet ? this.etagCache.get(url) : null;
         
         const config = {
+            ...options,
             headers: {
                 'Content-Type': 'application/json',
                 'X-Request-ID': requestId,
                 ...auth.getAuthHeaders(),
+                ...(cached ? { 'If-None-Match': cached.etag } : {}),
                 ...options.headers
-            },
-            ...options
+            }
         };
 
         Logger.info(`API Request: ${options.method || 'GET'} ${endpoint}`, { requestId });
@@ -51,13 +54,30 @@ class API {
         try {
             const response = await fetch(url, config);
             
+            // Expired access token: refresh once and replay the request
+            if (response.status === 401 && !options.retried && !endpoint.startsWith('/auth/')) {
+                if (await auth.refreshAccessToken()) {
+                    return this.request(endpoint, { ...options, retried: true });
+                }
+            }
+            
             if (response.status === 204) {
                 Logger.info(`API Response: ${response.status} (empty)`, { requestId, endpoint });
                 return null;
             }
             
+            if (response.status === 304 && cached) {
+                Logger.info('API Response: 304 (not modified)', { requestId, endpoint });
+                return structuredClone(cached.data);
+            }
+            
             const data = await response.json();
             
+            const etag = response.headers.get('ETag');
+            if (isGet && response.ok && etag) {
+                this.rememberETag(url, etag, data);
+            }
+            
             if (!response.ok) {
                 Logger.error(`API Error ${response.status}`, { 
                     requestId, endpoint, error: data, status: response.status 
@@ -75,6 +95,16 @@ class API {
         }
     }
 
+    static rememberETag(url, etag, data) {
+        // Bounded LRU of validated GET responses (Map keeps insertion order);
+        // stored as a copy so callers mutating their result cannot corrupt it
+        this.etagCache.delete(url);
+        this.etagCache.set(url, { etag, data: structuredClone(data) });
+        if (this.etagCache.size > this.etagCacheSize) {
+            this.etagCache.delete(this.etagCache.keys().next().value);
+        }
+    }
+
     static async get(endpoint) {
         return this.request(endpoint);
     }
@@ -105,4 +135,106 @@ class API {
             method: 'DELETE'
         });
     }
-}
\ No newline at end of file
+
+    // Ranked server-side search; pass the previous next_cursor as params.after
+    static async search(q, params = {}) {
+        const query = new URLSearchParams({ q, ...params });
+        return this.request(`/search?${query}`);
+    }
+
+    // Reply tree under a message; params.max_depth and params.limit trim it
+    static async getMessageThread(messageId, params = {}) {
+        const query = new URLSearchParams(params);
+        return this.request(`/messages/${messageId}/thread?${query}`);
+    }
+}
+
+API.etagCache = new Map();
+API.etagCacheSize = 100;
+
+// Server-push event stream (SSE with long-poll fallback)
+class EventStream {
+    constructor(params = {}) {
+        this.params = params;
+        this.handlers = {};
+        this.lastEventId = null;
+        this.source = null;
+        this.polling = false;
+        this.failures = 0;
+    }
+
+    on(type, handler) {
+        (this.handlers[type] = this.handlers[type] || []).push(handler);
+        if (this.source) {
+            this.source.addEventListener(type, (e) => this.dispatch(type, e));
+        }
+        return this;
+    }
+
+    dispatch(type, e) {
+        if (e.lastEventId) {
+            this.lastEventId = e.lastEventId;
+        }
+        const data = e.data ? JSON.parse(e.data) : {};
+        (this.handlers[type] || []).forEach(handler => handler(data));
+    }
+
+    start() {
+        if (window.EventSource && auth.token) {
+            this.startEventSource();
+        } else {
+            this.startLongPoll();
+        }
+        return this;
+    }
+
+    startEventSource() {
+        const query = new URLSearchParams({ ...this.params, jwt: auth.token });
+        if (this.lastEventId) {
+            query.set('last_event_id', this.lastEventId);
+        }
+        this.source = new EventSource(`${API_BASE}/stream?${query}`);
+        Object.keys(this.handlers).forEach(type => {
+            this.source.addEventListener(type, (e) => this.dispatch(type, e));
+        });
+        this.source.onopen = () => { this.failures = 0; };
+        this.source.onerror = () => {
+            // EventSource retries on its own; give up after repeated failures
+            this.failures += 1;
+            if (this.source.readyState === EventSource.CLOSED || this.failures > 3) {
+                this.source.close();
+                this.source = null;
+                this.startLongPoll();
+            }
+        };
+    }
+
+    async startLongPoll() {
+        if (this.polling) return;
+        this.polling = true;
+        
+        while (this.polling) {
+            try {
+                const query = new URLSearchParams(this.params);
+                if (this.lastEventId) {
+                    query.set('last_event_id', this.lastEventId);
+                }
+                const result = await API.get(`/stream/poll?${query}`);
+                this.lastEventId = result.last_event_id;
+                (result.events || []).forEach(event => {
+                    (this.handlers[event.type] || []).forEach(handler => handler(event.data));
+                });
+            } catch (error) {
+                await new Promise(resolve => setTimeout(resolve, 5000));
+            }
+        }
+    }
+
+    stop() {
+        this.polling = false;
+        if (this.source) {
+            this.source.close();
+            this.source = null;
+        }
+    }
+}
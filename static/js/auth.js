@@ -2,7 +2,9 @@
 class Auth {
     constructor() {
         this.token = localStorage.getItem('token');
+        this.refreshToken = localStorage.getItem('refresh_token');
         this.user = JSON.parse(localStorage.getItem('user') || 'null');
+        this.refreshing = null;
         this.init();
     }
 
@@ -35,7 +37,7 @@ class Auth {
         try {
             const data = await API.post('/auth/login', { email, password });
             
-            this.setAuth(data.token, data.user);
+            this.setAuth(data.token, data.user, data.refresh_token);
             window.location.href = '/dashboard';
         } catch (error) {
             this.showError(error.message || 'Login failed');
@@ -76,7 +78,7 @@ class Auth {
         try {
             const data = await API.post('/auth/register', { name, email, password });
             
-            this.setAuth(data.token, data.user);
+            this.setAuth(data.token, data.user, data.refresh_token);
             window.location.href = '/dashboard';
         } catch (error) {
             this.showError(error.message || 'Registration failed');
@@ -101,17 +103,44 @@ class Auth {
 
 
 
-    setAuth(token, user) {
+    setAuth(token, user, refreshToken) {
         this.token = token;
         this.user = user;
         localStorage.setItem('token', token);
         localStorage.setItem('user', JSON.stringify(user));
+        if (refreshToken) {
+            this.refreshToken = refreshToken;
+            localStorage.setItem('refresh_token', refreshToken);
+        }
+    }
+
+    // Renew the access token without re-entering the password; concurrent
+    // 401s share one refresh request
+    refreshAccessToken() {
+        if (!this.refreshToken) return Promise.resolve(false);
+        if (!this.refreshing) {
+            this.refreshing = fetch(`${API_BASE}/auth/refresh`, {
+                method: 'POST',
+                headers: { 'Authorization': `Bearer ${this.refreshToken}` }
+            }).then(async response => {
+                if (!response.ok) return false;
+                const data = await response.json();
+                this.token = data.token;
+                localStorage.setItem('token', data.token);
+                return true;
+            }).catch(() => false).finally(() => {
+                this.refreshing = null;
+            });
+        }
+        return this.refreshing;
     }
 
     logout() {
         this.token = null;
+        this.refreshToken = null;
         this.user = null;
         localStorage.removeItem('token');
+        localStorage.removeItem('refresh_token');
         localStorage.removeItem('user');
         window.location.href = '/';
     }
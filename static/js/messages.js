@@ -4,6 +4,12 @@ class Messages {
         this.messages = [];
         this.currentProjectId = null;
         this.pollInterval = null;
+        this.stream = null;
+        this.perPage = 50;
+        this.prevCursor = null;
+        this.nextCursor = null;
+        this.hasOlder = false;
+        this.loadingOlder = false;
     }
 
     init() {
@@ -15,22 +21,44 @@ class Messages {
         if (messageForm) {
             messageForm.addEventListener('submit', this.handleSendMessage.bind(this));
         }
+
+        // Load older history when scrolled to the top
+        const messagesList = document.getElementById('messagesList');
+        if (messagesList) {
+            messagesList.addEventListener('scroll', () => {
+                if (messagesList.scrollTop < 50) {
+                    this.loadOlderMessages();
+                }
+            });
+        }
+    }
+
+    messagesUrl(params = {}) {
+        const query = new URLSearchParams({ per_page: this.perPage, ...params });
+        return `/projects/${this.currentProjectId}/messages?${query}`;
+    }
+
+    applyPagination(pagination) {
+        if (!pagination) return;
+        if (pagination.next_cursor) {
+            this.nextCursor = pagination.next_cursor;
+        }
     }
 
     async loadMessages(projectId) {
         this.currentProjectId = projectId;
+        this.nextCursor = null;
         
         try {
-            const response = await fetch(`/api/projects/${projectId}/messages`);
-            const result = await response.json();
-            
-            if (!response.ok) {
-                throw new Error(result.error);
-            }
+            // Newest page first; older pages are fetched on scroll
+            const result = await API.get(this.messagesUrl());
             
             this.messages = result.messages || [];
+            this.applyPagination(result.pagination);
+            this.prevCursor = result.pagination ? result.pagination.prev_cursor : null;
+            this.hasOlder = Boolean(result.pagination && result.pagination.has_older);
             this.renderMessages();
-            this.startPolling();
+            this.startStream();
         } catch (error) {
             console.error('Failed to load messages:', error);
             this.messages = [];
@@ -38,7 +66,65 @@ class Messages {
         }
     }
 
-    renderMessages() {
+    async loadOlderMessages() {
+        if (!this.hasOlder || this.loadingOlder || !this.prevCursor) return;
+        this.loadingOlder = true;
+        
+        try {
+            const result = await API.get(this.messagesUrl({ before: this.prevCursor }));
+            const older = result.messages || [];
+            
+            this.prevCursor = result.pagination.prev_cursor;
+            this.hasOlder = result.pagination.has_older;
+            this.messages = older.concat(this.messages);
+            
+            // Keep the viewport anchored on the message that was at the top
+            const messagesList = document.getElementById('messagesList');
+            const previousHeight = messagesList ? messagesList.scrollHeight : 0;
+            this.renderMessages({ preserveScroll: true });
+            if (messagesList) {
+                messagesList.scrollTop = messagesList.scrollHeight - previousHeight;
+            }
+        } catch (error) {
+            console.error('Failed to load older messages:', error);
+        } finally {
+            this.loadingOlder = false;
+        }
+    }
+
+    appendMessages(newer) {
+        // Pushed and fetched messages may overlap; keep each id once
+        const known = new Set(this.messages.map(m => m.id));
+        const fresh = newer.filter(m => !known.has(m.id));
+        this.messages = this.messages.concat(fresh);
+        return fresh.length;
+    }
+
+    async loadNewerMessages() {
+        if (!this.currentProjectId) return;
+        if (!this.nextCursor) {
+            return this.loadMessages(this.currentProjectId);
+        }
+        
+        try {
+            let hasNewer = true;
+            let received = 0;
+            while (hasNewer) {
+                const result = await API.get(this.messagesUrl({ after: this.nextCursor }));
+                const newer = result.messages || [];
+                this.applyPagination(result.pagination);
+                received += this.appendMessages(newer);
+                hasNewer = Boolean(result.pagination && result.pagination.has_newer);
+            }
+            if (received > 0) {
+                this.renderMessages();
+            }
+        } catch (error) {
+            console.error('Failed to load new messages:', error);
+        }
+    }
+
+    renderMessages(options = {}) {
         const messagesList = document.getElementById('messagesList');
         if (!messagesList) return;
 
@@ -63,8 +149,10 @@ class Messages {
             </div>
         `).join('');
 
-        // Scroll to bottom
-        messagesList.scrollTop = messagesList.scrollHeight;
+        // Scroll to bottom unless older history was prepended
+        if (!options.preserveScroll) {
+            messagesList.scrollTop = messagesList.scrollHeight;
+        }
     }
 
     async handleSendMessage(e) {
@@ -76,29 +164,17 @@ class Messages {
         if (!message) return;
 
         try {
-            const response = await fetch(`/api/projects/${this.currentProjectId}/messages`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({ content: message })
-            });
-            
-            const result = await response.json();
-            
-            if (!response.ok) {
-                throw new Error(result.error);
-            }
+            await API.post(`/projects/${this.currentProjectId}/messages`, { content: message });
             
             messageInput.value = '';
-            this.loadMessages(this.currentProjectId);
+            this.loadNewerMessages();
             
             // Show success notification
             if (window.notifications) {
                 window.notifications.success('Message sent!');
             }
         } catch (error) {
-            const errorMsg = error.message || 'Failed to send message';
+            const errorMsg = error.message || error.error || 'Failed to send message';
             this.showError(errorMsg);
             if (window.notifications) {
                 window.notifications.error(errorMsg);
@@ -106,16 +182,46 @@ class Messages {
         }
     }
 
+    startStream() {
+        this.stopPolling();
+        
+        if (typeof EventStream === 'undefined') {
+            return this.startPolling();
+        }
+        
+        // New messages are pushed by the server instead of polled; reuse the page-wide stream if any
+        const shared = window.notifications && window.notifications.stream;
+        if (shared) {
+            if (!this.boundToShared) {
+                this.bindStreamHandlers(shared);
+                this.boundToShared = true;
+            }
+            return;
+        }
+        this.stream = this.bindStreamHandlers(new EventStream({ project_id: this.currentProjectId })).start();
+    }
+
+    bindStreamHandlers(stream) {
+        return stream
+            .on('message.created', (message) => {
+                if (String(message.project_id) !== String(this.currentProjectId)) return;
+                if (this.appendMessages([message])) {
+                    this.renderMessages();
+                }
+            })
+            .on('reset', () => this.loadNewerMessages());
+    }
+
     startPolling() {
         // Clear existing polling
         if (this.pollInterval) {
             clearInterval(this.pollInterval);
         }
 
-        // Poll for new messages every 10 seconds
+        // Poll for messages newer than the last one we have every 10 seconds
         this.pollInterval = setInterval(() => {
             if (this.currentProjectId) {
-                this.loadMessages(this.currentProjectId);
+                this.loadNewerMessages();
             }
         }, 10000);
     }
@@ -125,6 +231,10 @@ class Messages {
             clearInterval(this.pollInterval);
             this.pollInterval = null;
         }
+        if (this.stream) {
+            this.stream.stop();
+            this.stream = null;
+        }
     }
 
     formatTime(dateString) {
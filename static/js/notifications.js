@@ -3,6 +3,7 @@ class NotificationManager {
     constructor() {
         this.notifications = [];
         this.container = null;
+        this.stream = null;
         this.init();
     }
 
@@ -108,9 +109,21 @@ class NotificationManager {
             setTimeout(() => {
                 this.info(`Welcome back, ${auth.user?.name || 'User'}!`);
             }, 1000);
+            this.startStream();
         }
     }
 
+    startStream() {
+        if (typeof EventStream === 'undefined' || this.stream) return;
+        
+        // New notifications are pushed by the server
+        this.stream = new EventStream()
+            .on('notification.created', (notification) => {
+                this.info(`🔔 ${notification.title}: ${notification.message}`);
+            })
+            .start();
+    }
+
     // Show notification for task updates
     taskUpdated(taskTitle, newStatus) {
         const statusEmojis = {
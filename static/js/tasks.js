@@ -19,14 +19,15 @@ class Tasks {
     async loadTasks(projectId) {
         this.currentProjectId = projectId;
         try {
-            const response = await fetch(`/api/projects/${projectId}/tasks`);
-            const result = await response.json();
-            
-            if (!response.ok) {
-                throw new Error(result.error);
+            // The board shows every task: walk the pages without counting them
+            const tasks = [];
+            for (let page = 1; ; page++) {
+                const result = await API.get(`/projects/${projectId}/tasks?per_page=100&count=none&page=${page}`);
+                tasks.push(...(result.tasks || []));
+                if (!result.pagination || !result.pagination.has_next) break;
             }
             
-            this.tasks = result.tasks || [];
+            this.tasks = tasks;
             this.renderTasks();
             this.updateProgress();
         } catch (error) {
@@ -139,17 +140,7 @@ class Tasks {
 
     async updateTaskStatus(taskId, newStatus) {
         try {
-            const response = await fetch(`/api/tasks/${taskId}`, {
-                method: 'PATCH',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({ status: newStatus })
-            });
-            
-            if (!response.ok) {
-                throw new Error('Failed to update task');
-            }
+            await API.patch(`/tasks/${taskId}`, { status: newStatus });
             
             // Update local task status
             const task = this.tasks.find(t => t.id == taskId);
@@ -211,22 +202,7 @@ class Tasks {
         const description = document.getElementById('taskDescription').value;
 
         try {
-            const response = await fetch(`/api/projects/${this.currentProjectId}/tasks`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({
-                    title,
-                    description
-                })
-            });
-            
-            const result = await response.json();
-            
-            if (!response.ok) {
-                throw new Error(result.error);
-            }
+            await API.post(`/projects/${this.currentProjectId}/tasks`, { title, description });
             
             this.hideCreateModal();
             this.loadTasks(this.currentProjectId);
@@ -236,7 +212,7 @@ class Tasks {
                 window.notifications.success(`Task "${title}" created successfully!`);
             }
         } catch (error) {
-            const errorMsg = error.message || 'Failed to create task';
+            const errorMsg = error.message || error.error || 'Failed to create task';
             this.showError(errorMsg);
             if (window.notifications) {
                 window.notifications.error(errorMsg);